@@ -1,10 +1,12 @@
 # File: app/api/account_router.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import date, timedelta
+from typing import List, Optional
 from app.db.session import get_db
 from app.crud import account_crud
-from app.schemas.account_schema import AccountCreate, AccountOut, AccountUpdate
+from app.schemas.account_schema import AccountCreate, AccountOut, AccountUpdate, BalanceRebuildResult, NetWorthOut
+from app.services import balance_service
 from app.core import deps
 from app.models.user import User
 
@@ -28,6 +30,32 @@ def create_account(
 ):
     return account_crud.create_account(db, account_in=account_in, user_id=current_user.id)
 
+@router.get("/net-worth", response_model=NetWorthOut)
+def read_net_worth(
+    start_date: Optional[date] = Query(None, description="First day (default: 90 days before end_date)"),
+    end_date: Optional[date] = Query(None, description="Last day (default: today)"),
+    db: Session = Depends(deps.get_read_db),
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Daily balance of every account and their sum, read from the daily balance snapshots."""
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=balance_service.NET_WORTH_DEFAULT_DAYS - 1)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date.")
+    if (end_date - start_date).days >= balance_service.NET_WORTH_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"A net-worth series spans at most {balance_service.NET_WORTH_MAX_DAYS} days.")
+    return balance_service.get_net_worth(db, user_id=current_user.id, start_date=start_date, end_date=end_date)
+
+@router.post("/balances/rebuild", response_model=BalanceRebuildResult)
+def rebuild_balances(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Recomputes the user's daily balance snapshots from their transactions."""
+    snapshots = balance_service.rebuild_account_balances(db, user_id=current_user.id)
+    db.commit()
+    return {"snapshots": snapshots}
+
 # Routes with path parameters are fine and do not need changes.
 @router.put("/{account_id}", response_model=AccountOut)
 def update_account(
@@ -1,8 +1,8 @@
 # File: app/api/analytics_router.py
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.db.session import get_db
 from app.services.analytics_service import get_analytics_data
+from app.services import comparison_service, tag_analytics_service
 from app.core import deps
 from app.models.user import User
 
@@ -12,7 +12,7 @@ router = APIRouter()
 #! CHANGE: The path is now "" instead of "/".
 @router.get("")
 def analytics(
-    db: Session = Depends(get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: User = Depends(deps.get_current_active_user),
     time_period: str = Query("6m"), 
     include_capital_transfers: bool = Query(False)
@@ -22,4 +22,50 @@ def analytics(
         time_period=time_period, 
         include_capital_transfers=include_capital_transfers,
         user_id=current_user.id
-    )
\ No newline at end of file
+    )
+
+@router.get("/compare")
+def compare_periods(
+    db: Session = Depends(deps.get_read_db),
+    current_user: User = Depends(deps.get_current_active_user),
+    periods: list[str] = Query(..., description=f"Two or more of {comparison_service.PERIOD_FORMATS}; the first is the baseline."),
+    include_capital_transfers: bool = Query(False)
+):
+    try:
+        return comparison_service.get_period_comparison(
+            db, user_id=current_user.id, periods=periods, include_capital_transfers=include_capital_transfers
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/tags")
+def tag_analytics_summary(
+    db: Session = Depends(deps.get_read_db),
+    current_user: User = Depends(deps.get_current_active_user),
+    time_period: str = Query("all"),
+    include_capital_transfers: bool = Query(False)
+):
+    try:
+        return tag_analytics_service.get_tag_summaries(
+            db, user_id=current_user.id, time_period=time_period, include_capital_transfers=include_capital_transfers
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/tags/{tag_id}")
+def tag_analytics(
+    tag_id: int,
+    db: Session = Depends(deps.get_read_db),
+    current_user: User = Depends(deps.get_current_active_user),
+    time_period: str = Query("all"),
+    include_capital_transfers: bool = Query(False)
+):
+    try:
+        result = tag_analytics_service.get_tag_analytics(
+            db, user_id=current_user.id, tag_id=tag_id, time_period=time_period, include_capital_transfers=include_capital_transfers
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Tag not found")
+    return result
@@ -2,11 +2,12 @@
 from fastapi import APIRouter
 from . import (
     account_router, alert_router, analytics_router, budget_plan_router,
-    category_router, dashboard_router, goal_router, merchant_router,
+    category_router, dashboard_router, goal_router, merchant_router, recurring_payment_router,
     tag_router, transaction_router, transaction_tag_router,
     upload_router, test_router, 
     auth_router,
-    users_router
+    users_router,
+    internal_router
 )
 
 # ###########################################################################
@@ -34,10 +35,12 @@ api_router.include_router(transaction_router.router, prefix="/transactions")
 api_router.include_router(account_router.router, prefix="/accounts")
 api_router.include_router(category_router.router, prefix="/categories")
 api_router.include_router(merchant_router.router, prefix="/merchants")
+api_router.include_router(recurring_payment_router.router, prefix="/recurring-payments")
 api_router.include_router(goal_router.router, prefix="/goals")
 api_router.include_router(tag_router.router, prefix="/tags")
 api_router.include_router(transaction_tag_router.router, prefix="/transaction-tags")
 api_router.include_router(alert_router.router, prefix="/alerts")
 
 # Utility Endpoints
-api_router.include_router(test_router.router, prefix="/test")
\ No newline at end of file
+api_router.include_router(test_router.router, prefix="/test")
+api_router.include_router(internal_router.router, prefix="/internal")
\ No newline at end of file
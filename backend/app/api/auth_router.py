@@ -1,5 +1,6 @@
 # File: app/api/auth_router.py
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta
@@ -8,33 +9,60 @@ from app.db.session import get_db
 from app.schemas.user_schema import UserCreate, UserOut
 from app.schemas.auth_schema import Token
 from app.crud import user_crud
-from app.core.security import verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.password_hashing import verify_password_async, get_password_hash_async, PasswordHashingBusy
+from app.core.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
 
 router = APIRouter(tags=["Authentication"])
 
-@router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
+# These endpoints are async so that bcrypt runs in the dedicated hashing process pool
+# instead of pinning a request worker thread. The (fast) DB calls are pushed to the
+# threadpool explicitly so they never block the event loop.
+
+def _hashing_busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in attempts are being processed. Please try again shortly.",
+        headers={"Retry-After": "1"},
+    )
+
+def _find_conflicting_user(db: Session, user_in: UserCreate):
     user = user_crud.get_user_by_identifier(db, identifier=user_in.username)
     if user:
-        raise HTTPException(status_code=409, detail="Username already registered")
+        return "Username already registered"
     user_by_email = db.query(user_crud.User).filter(user_crud.User.email == user_in.email).first()
     if user_by_email:
-        raise HTTPException(status_code=409, detail="Email already registered")
-        
-    return user_crud.create_user(db, user=user_in)
+        return "Email already registered"
+    return None
+
+@router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
+async def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
+    conflict = await run_in_threadpool(_find_conflicting_user, db, user_in)
+    if conflict:
+        raise HTTPException(status_code=409, detail=conflict)
+
+    try:
+        hashed_password = await get_password_hash_async(user_in.password)
+    except PasswordHashingBusy:
+        raise _hashing_busy_exception()
+    return await run_in_threadpool(user_crud.create_user, db, user_in, hashed_password)
 
 @router.post("/login/password", response_model=Token)
-def login_for_access_token(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()):
-    user = user_crud.get_user_by_identifier(db, identifier=form_data.username)
-    if not user or not user.hashed_password or not verify_password(form_data.password, user.hashed_password):
+async def login_for_access_token(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()):
+    user = await run_in_threadpool(user_crud.get_user_by_identifier, db, form_data.username)
+    try:
+        password_ok = bool(user and user.hashed_password) and await verify_password_async(form_data.password, user.hashed_password)
+    except PasswordHashingBusy:
+        raise _hashing_busy_exception()
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    # Use the user's email as the unique subject for the token
+    # Use the user's email as the unique subject for the token, plus the immutable
+    # user id so that requests can be authenticated from the principal cache.
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": user.id}, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
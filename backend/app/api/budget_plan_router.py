@@ -14,9 +14,12 @@ router = APIRouter()
 def get_user_budget_plan(
     month: str = Query(..., description="Month in YYYY-MM format"), 
     db: Session = Depends(get_db),
+    read_db: Session = Depends(deps.get_read_db),
     current_user: User = Depends(deps.get_current_active_user)
 ):
-    return get_budget_plan(db, month=month, user_id=current_user.id)
+    # The active-plan path creates alerts, so it stays on the primary; only the
+    # read-only "smart empty state" suggestions are served from the replica.
+    return get_budget_plan(db, month=month, user_id=current_user.id, read_db=read_db)
 
 @router.post("/plan")
 def save_user_budget_plan(
@@ -1,10 +1,11 @@
 # File: app/api/category_router.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal
 from app.db.session import get_db
 from app.crud import category_crud
-from app.schemas.category_schema import CategoryCreate, CategoryOut, CategoryUpdate
+from app.schemas.category_schema import CategoryCreate, CategoryOut, CategoryUpdate, RecategorizationResult
+from app.services.recategorization_service import ROWS_PER_REQUEST, recategorize_transactions
 from app.core import deps
 from app.models.user import User
 
@@ -27,6 +28,26 @@ def read_all_categories(
 ):
     return category_crud.get_all_categories(db, user_id=current_user.id)
 
+@router.post("/recategorize", response_model=RecategorizationResult)
+def recategorize(
+    scope: Literal["all", "uncategorized", "miscellaneous"] = Query("all"),
+    cursor: str | None = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Re-applies the current categorization rules and merchants to the user's imported
+    transactions, optionally only to uncategorized or "Miscellaneous" ones. Each call
+    handles up to ROWS_PER_REQUEST of them; while `cursor` in the result is set, call
+    again with it to continue. `remaining` is the number of rows still to scan.
+    """
+    try:
+        return recategorize_transactions(
+            db, user_id=current_user.id, scope=scope, on_progress=None, cursor=cursor, max_rows=ROWS_PER_REQUEST
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # Routes with path parameters like "/{category_id}" do not need changing.
 @router.put("/{category_id}", response_model=CategoryOut)
 def update_category(
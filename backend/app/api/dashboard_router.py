@@ -1,7 +1,6 @@
 # File: app/api/dashboard_router.py
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from app.db.session import get_db
 from app.services.dashboard_service import get_dashboard_data
 from app.core import deps
 from app.models.user import User
@@ -13,7 +12,7 @@ router = APIRouter()
 @router.get("")
 def dashboard(
     month: str, 
-    db: Session = Depends(get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: User = Depends(deps.get_current_active_user)
 ):
     return get_dashboard_data(db, month=month, user_id=current_user.id)
\ No newline at end of file
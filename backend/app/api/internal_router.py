@@ -0,0 +1,82 @@
+# File: app/api/internal_router.py
+from fastapi import APIRouter, Depends, HTTPException, Response
+from app.core import deps
+from app.core.principal_cache import principal_cache
+from app.services.categorizer_service import categorizer_cache
+from app.core.analytics_cache import analytics_cache
+from app.core.password_hashing import hashing_pool
+from app.db.session import engine, replica_engine
+from app.db.pool import get_pool_stats
+from app.core.profiling import profile_store, REQUEST_PROFILING_ENABLED
+from app.core.slow_query_log import slow_query_log, slow_query_log_enabled, SLOW_QUERY_THRESHOLD_MS
+
+# Operational endpoints for sizing and monitoring. Every route requires the internal token.
+router = APIRouter(tags=["Internal"], dependencies=[Depends(deps.require_internal_access)])
+
+@router.get("/principal-cache")
+def principal_cache_stats():
+    """Hit rate and occupancy of this worker's authenticated-user cache."""
+    return principal_cache.stats()
+
+@router.get("/categorizer-cache")
+def categorizer_cache_stats():
+    """Hit rate and occupancy of this worker's per-user categorization models."""
+    return categorizer_cache.stats()
+
+@router.get("/analytics-cache")
+def analytics_cache_stats():
+    """Hit rate and occupancy of this worker's cache of computed analytics (tag analytics)."""
+    return analytics_cache.stats()
+
+@router.get("/password-hashing")
+def password_hashing_stats():
+    """Queue depth and latency of the bcrypt process pool used by login and registration."""
+    return hashing_pool.stats()
+
+@router.get("/db-pool")
+def db_pool_stats():
+    """Live connection pool usage for this worker: checked-out connections, overflow and checkout wait times."""
+    return {
+        "primary": get_pool_stats(engine),
+        # None when no DATABASE_REPLICA_URL is configured (replica reads share the primary pool).
+        "replica": get_pool_stats(replica_engine) if replica_engine is not engine else None,
+    }
+
+@router.get("/slow-queries")
+def list_slow_queries():
+    """Most recent slow statements on this worker (newest first) with redacted parameters and EXPLAIN plans."""
+    return {
+        "enabled": slow_query_log_enabled(),
+        "threshold_ms": SLOW_QUERY_THRESHOLD_MS,
+        "recorded": slow_query_log.recorded,
+        "entries": slow_query_log.entries(),
+    }
+
+@router.delete("/slow-queries")
+def clear_slow_queries():
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared."}
+
+@router.get("/profiles")
+def list_profiles():
+    """Profiles captured on this worker (newest first). Trigger one with `X-Profile: 1` on any request."""
+    return {"enabled": REQUEST_PROFILING_ENABLED, "profiles": profile_store.summaries()}
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return {k: v for k, v in profile.items() if k != "pstats"}
+
+@router.get("/profiles/{profile_id}/pstats")
+def download_profile(profile_id: str):
+    """Raw pstats file for snakeviz, or flameprof for a flame graph."""
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(
+        content=profile["pstats"],
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'},
+    )
@@ -0,0 +1,34 @@
+# File: app/api/recurring_payment_router.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.db.session import get_db
+from app.core import deps
+from app.models.user import User
+from app.schemas.recurring_payment_schema import RecurringPaymentOut
+from app.services import recurring_service
+
+router = APIRouter()
+
+@router.get("", response_model=List[RecurringPaymentOut])
+def read_recurring_payments(
+    include_inactive: bool = Query(False, description="Also list series whose next payment is overdue"),
+    db: Session = Depends(deps.get_read_db),
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Subscriptions, rent and bills detected in the user's statements, soonest next
+    payment first. Detection runs on upload; this only reads the stored results.
+    """
+    return recurring_service.get_recurring_payments(db, user_id=current_user.id, include_inactive=include_inactive)
+
+@router.post("/refresh", response_model=List[RecurringPaymentOut])
+def refresh_recurring_payments(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Re-detects every series from the history, e.g. after transactions were edited or deleted."""
+    recurring_service.refresh_recurring_payments(db, user_id=current_user.id)
+    db.commit()
+    return recurring_service.get_recurring_payments(db, user_id=current_user.id, include_inactive=True)
@@ -1,13 +1,15 @@
 # File: app/api/transaction_router.py
 from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import date
 
 from app.db.session import get_db
-from app.services.transaction_service import get_filtered_transactions
+from app.services.transaction_service import get_filtered_transactions, parse_log_fields
 from app.schemas.transaction_log_schema import TransactionLogOut
-from app.schemas.transaction_schema import TransactionCreate, TransactionOut, TransactionUpdate
+from app.schemas.transaction_schema import TransactionCreate, TransactionOut, TransactionUpdate, TransactionBatchRequest, TransactionBatchResult, TransactionRawOut
 from app.crud import transaction_crud
 from app.core import deps
 from app.models.user import User
@@ -18,7 +20,7 @@ router = APIRouter()
 #! CHANGE: The path is now "" instead of "/".
 @router.get("", response_model=TransactionLogOut)
 def get_transactions_with_filters(
-    db: Session = Depends(get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: User = Depends(deps.get_current_active_user),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1),
@@ -27,7 +29,8 @@ def get_transactions_with_filters(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     type: Optional[str] = Query(None),
-    search_term: Optional[str] = Query(None)
+    search_term: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated projection, e.g. 'txn_date,description,amount,tags'")
 ):
     filters = {
         "page": page, "limit": limit, "account_id": account_id,
@@ -35,7 +38,17 @@ def get_transactions_with_filters(
         "end_date": end_date, "type": type, "search_term": search_term
     }
     active_filters = {k: v for k, v in filters.items() if v is not None and v != ''}
-    return get_filtered_transactions(db, filters=active_filters, user_id=current_user.id)
+    try:
+        selected_fields = parse_log_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = get_filtered_transactions(db, filters=active_filters, user_id=current_user.id, fields=selected_fields)
+    if selected_fields:
+        # A projected page does not match the full TransactionItem shape, so it is
+        # serialized directly instead of being validated against the response model.
+        return JSONResponse(content=jsonable_encoder(result))
+    return result
 
 #! CHANGE: The path is now "" instead of "/".
 @router.post("", response_model=TransactionOut, status_code=status.HTTP_201_CREATED)
@@ -46,6 +59,19 @@ def create_manual_transaction(
 ):
     return transaction_crud.create_transaction(db, txn_in=txn_in, user_id=current_user.id)
 
+@router.post("/batch", response_model=TransactionBatchResult)
+def batch_mutate_transactions_route(
+    batch_in: TransactionBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Applies one bulk action (create, update, delete, tag, untag) to many transactions,
+    selected by a list of ids or by the same filters as the transaction log.
+    Everything runs in one database transaction with a single alert evaluation.
+    """
+    return transaction_crud.batch_mutate_transactions(db, batch_in=batch_in, user_id=current_user.id)
+
 # Routes with path parameters are fine and do not need changes.
 @router.get("/{txn_id}", response_model=TransactionOut)
 def get_transaction_by_id_route(
@@ -58,6 +84,17 @@ def get_transaction_by_id_route(
         raise HTTPException(status_code=404, detail="Transaction not found")
     return txn
 
+@router.get("/{txn_id}/raw", response_model=TransactionRawOut)
+def get_transaction_raw_data_route(
+    txn_id: int,
+    db: Session = Depends(deps.get_read_db),
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    raw = transaction_crud.get_transaction_raw_data(db, txn_id=txn_id, user_id=current_user.id)
+    if raw is None:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return raw
+
 @router.put("/{txn_id}", response_model=TransactionOut)
 def update_transaction_route(
     txn_id: int, 
@@ -46,7 +46,7 @@ def upload_statements(
                 txns = upload_service.parse_generic_statement(
                     file=file, account_id=account_map["HDFC Bank"], source="HDFC",
                     date_col="Date", desc_col="Narration", debit_col="Withdrawal Amt",
-                    credit_col="Deposit Amt", ref_col="Chq/RefNo"
+                    credit_col="Deposit Amt", ref_col="Chq/RefNo", balance_col="Closing Balance"
                 )
                 all_txns.extend(txns)
 
@@ -57,7 +57,7 @@ def upload_statements(
                 txns = upload_service.parse_generic_statement(
                     file=file, account_id=account_map["ICICI Bank"], source="ICICI",
                     date_col="Value Date", desc_col="Transaction Remarks", debit_col="Withdrawal Amount (INR )",
-                    credit_col="Deposit Amount (INR )", ref_col="Cheque Number", unique_id_col="S No."
+                    credit_col="Deposit Amount (INR )", ref_col="Cheque Number", balance_col="Balance (INR )"
                 )
                 all_txns.extend(txns)
 
@@ -79,6 +79,9 @@ def upload_statements(
         raise HTTPException(status_code=400, detail="The uploaded file(s) did not contain any valid transactions to process for your configured accounts.")
 
     # Pass the user_id to the final processing function
-    inserted_count = upload_service.process_and_insert_transactions(db, all_txns, user_id=current_user.id)
-    
-    return {"message": f"Upload successful. Found {len(all_txns)} potential transactions and inserted {inserted_count} new records."}
\ No newline at end of file
+    inserted_count, matches = upload_service.process_and_insert_transactions(db, all_txns, user_id=current_user.id)
+
+    message = f"Upload successful. Found {len(all_txns)} potential transactions and inserted {inserted_count} new records."
+    if matches:
+        message += f" Skipped {len(matches)} already imported from another source (Paytm/bank statement)."
+    return {"message": message, "cross_source_matches": matches}
\ No newline at end of file
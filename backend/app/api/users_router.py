@@ -1,10 +1,11 @@
 # File: app/api/users_router.py
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.schemas.user_schema import UserOut
 from app.crud import user_crud
-from app.core.security import verify_password
+from app.core.password_hashing import verify_password_async, PasswordHashingBusy
 from app.core import deps #! NEW: Import our main dependencies
 from app.models.user import User #! NEW: Import the User model
 
@@ -20,17 +21,26 @@ def read_users_me(current_user: User = Depends(deps.get_current_active_user)):
     return current_user
 
 @router.delete("/me")
-def delete_current_user(
+async def delete_current_user(
     password_form: dict = Body(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(deps.get_current_active_user)
 ):
     """
-    Deletes the currently logged-in user after verifying their password.
+    Deletes the currently logged-in user after verifying their password. Async, like
+    the auth endpoints, so that bcrypt runs in the hashing process pool.
     """
     password = password_form.get("password")
-    if not password or not verify_password(password, current_user.hashed_password):
+    try:
+        password_ok = bool(password) and await verify_password_async(password, current_user.hashed_password)
+    except PasswordHashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many password checks are being processed. Please try again shortly.",
+            headers={"Retry-After": "1"},
+        )
+    if not password_ok:
         raise HTTPException(status_code=401, detail="Incorrect password")
 
-    user_crud.delete_user(db, user_id=current_user.id)
+    await run_in_threadpool(user_crud.delete_user, db, user_id=current_user.id)
     return {"message": "User account deleted successfully."}
\ No newline at end of file
@@ -0,0 +1,37 @@
+# File: app/core/analytics_cache.py
+import os
+import time
+
+from app.core.ttl_cache import TTLCache
+from app.db.session import client_last_write
+
+# Computed analytics payloads, keyed by (user id, query). An entry is served until the
+# TTL passes or the client's last write (the X-Last-Write marker that also keeps its reads
+# on the primary, see app.db.session) is newer than the entry, whichever worker handled
+# that write. The TTL bounds staleness after writes made from the user's other clients
+# (another browser or device), so it is kept short: the hits that matter are a screen's
+# repeated loads and the frontend re-requesting the same view.
+ANALYTICS_CACHE_TTL_SECONDS = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "30"))
+ANALYTICS_CACHE_MAX_SIZE = int(os.getenv("ANALYTICS_CACHE_MAX_SIZE", "1024"))
+
+
+class AnalyticsCache(TTLCache):
+    """A TTL + LRU cache of analytics results, invalidated by the user's writes."""
+
+    # Wall-clock time, to compare with markers stamped by other workers
+    clock = staticmethod(time.time)
+
+    def get_or_compute(self, db, user_id: int, key: tuple, compute):
+        """The cached result for (user_id, key), or compute() stored under it. `db` is the request's read session."""
+        cache_key = (user_id, *key)
+        value = self._lookup(cache_key, invalidated_at=client_last_write(db))
+        if value is not None:
+            return value
+        # Stamped before the queries run: a write committed meanwhile invalidates the result
+        computed_at = self.clock()
+        value = compute()
+        self._store(cache_key, value, stored_at=computed_at)
+        return value
+
+
+analytics_cache = AnalyticsCache(ANALYTICS_CACHE_TTL_SECONDS, ANALYTICS_CACHE_MAX_SIZE)
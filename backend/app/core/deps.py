@@ -1,18 +1,27 @@
 # File: app/core/deps.py
-from fastapi import Depends, HTTPException, status
+import os
+import secrets
+import time
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.session import WRITE_MARKER_HEADER, get_db, get_read_session, parse_write_marker
 from app.models.user import User
 from app.crud import user_crud
 from app.core.security import SECRET_KEY, ALGORITHM
+from app.core.principal_cache import principal_cache
 
 # This is the central definition of our security scheme.
 # It tells FastAPI where to look for the token.
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login/password")
 
+# Shared secret for operational endpoints (cache/pool statistics etc.).
+# When it is not set, those endpoints are disabled entirely.
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+
 #! NEW: The main dependency to get the current user
 def get_current_active_user(
     db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
@@ -29,12 +38,46 @@ def get_current_active_user(
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str | None = payload.get("sub")
+        # `uid` is the immutable user id; tokens issued before it existed only carry `sub`.
+        user_id: int | None = payload.get("uid")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
+
+    # Hot path: resolve the principal from the in-process cache without touching the DB.
+    if user_id is not None:
+        cached_user = principal_cache.get(user_id)
+        if cached_user is not None and cached_user.email == email:
+            return cached_user
+
     user = user_crud.get_user_by_email(db, email=email)
-    if user is None:
+    if user is None or (user_id is not None and user.id != user_id):
         raise credentials_exception
-    return user
\ No newline at end of file
+    principal_cache.put(user)
+    return user
+
+def get_read_db(
+    request: Request,
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_session),
+    current_user: User = Depends(get_current_active_user),
+) -> Session:
+    """
+    Session for read-only screen endpoints. Routed to the read replica, except for clients
+    whose last write (the X-Last-Write marker they send back) is less than
+    DB_REPLICA_STICKY_SECONDS old: they read from the primary so they always see their own
+    changes, whichever worker handled the write.
+    """
+    last_write = parse_write_marker(request.headers.get(WRITE_MARKER_HEADER))
+    session = db if last_write is not None and time.time() - last_write < settings.DB_REPLICA_STICKY_SECONDS else read_db
+    session.info["client_last_write"] = last_write
+    return session
+
+def require_internal_access(x_internal_token: str | None = Header(None)) -> None:
+    """
+    Dependency for operational endpoints that are not tied to an end user.
+    Callers must send the configured INTERNAL_API_TOKEN in the X-Internal-Token header.
+    """
+    if not INTERNAL_API_TOKEN or not x_internal_token or not secrets.compare_digest(x_internal_token, INTERNAL_API_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Internal endpoints are not accessible.")
@@ -0,0 +1,183 @@
+# File: app/core/metrics.py
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+logger = logging.getLogger("app.metrics")
+
+# Requests issuing more statements than this are logged as warnings: the usual
+# signature of an N+1 query pattern slipping into a screen service.
+QUERY_COUNT_WARN_THRESHOLD = int(os.getenv("QUERY_COUNT_WARN_THRESHOLD", "30"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in labels.items()) + "}"
+
+
+class Histogram:
+    """A minimal Prometheus histogram with a fixed label set."""
+
+    def __init__(self, name: str, documentation: str, label_names: tuple, buckets: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # Per-bucket counts (non-cumulative), then sum and count.
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(k, list(v[0]), v[1], v[2]) for k, v in self._series.items()]
+        for label_values, bucket_counts, total, count in snapshot:
+            labels = dict(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': str(bound)})} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.",
+    ("method", "route", "status"), LATENCY_BUCKETS,
+)
+REQUEST_STATEMENTS = Histogram(
+    "db_statements_per_request", "SQL statements executed per HTTP request.",
+    ("method", "route"), STATEMENT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "db_time_seconds_per_request", "Total time spent in SQL statements per HTTP request.",
+    ("method", "route"), LATENCY_BUCKETS,
+)
+
+
+# --- Per-request SQL accounting ---
+@dataclass
+class RequestDbStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+
+# The middleware puts a fresh, mutable RequestDbStats in the context. Sync endpoints
+# run in a worker thread with a *copy* of the context, which still references the
+# same object, so statements executed there are counted for the right request.
+_request_db_stats: ContextVar[RequestDbStats | None] = ContextVar("request_db_stats", default=None)
+
+
+# Start times live on the statement's execution context, not the connection: a statement
+# that raises never reaches after_cursor_execute, and its start time goes with it.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start_time = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_start_time", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        stats = RequestDbStats()
+        token = _request_db_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_db_stats.reset(token)
+            # Label by route template ("/api/v1/transactions/{txn_id}"), never the raw path,
+            # to keep the number of series bounded.
+            route = request.scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            REQUEST_LATENCY.observe(elapsed, request.method, route_path, str(status_code))
+            REQUEST_STATEMENTS.observe(stats.statements, request.method, route_path)
+            REQUEST_DB_TIME.observe(stats.db_seconds, request.method, route_path)
+            if stats.statements > QUERY_COUNT_WARN_THRESHOLD:
+                logger.warning(
+                    "%s %s executed %d SQL statements (%.1f ms in DB, %.1f ms total); threshold is %d",
+                    request.method, route_path, stats.statements, stats.db_seconds * 1000,
+                    elapsed * 1000, QUERY_COUNT_WARN_THRESHOLD,
+                )
+
+
+def _sample_lines(name: str, metric_type: str, documentation: str, samples: list) -> list:
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {metric_type}"]
+    lines.extend(f"{name}{_format_labels(labels)} {value}" for labels, value in samples)
+    return lines
+
+
+def render_metrics() -> str:
+    """Renders every metric of this worker in the Prometheus text exposition format."""
+    # Imported here to keep this module free of app-level imports at load time.
+    from app.core.principal_cache import principal_cache
+    from app.core.password_hashing import hashing_pool
+    from app.db.session import engine, replica_engine
+    from app.db.pool import get_pool_stats
+
+    lines = []
+    for histogram in (REQUEST_LATENCY, REQUEST_STATEMENTS, REQUEST_DB_TIME):
+        lines.extend(histogram.render())
+
+    pools = [("primary", engine)] + ([("replica", replica_engine)] if replica_engine is not engine else [])
+    pool_stats = [({"pool": name}, get_pool_stats(e)) for name, e in pools]
+    lines.extend(_sample_lines("db_pool_checked_out", "gauge", "Connections currently checked out.",
+                               [(labels, s.get("checked_out", 0)) for labels, s in pool_stats]))
+    lines.extend(_sample_lines("db_pool_overflow", "gauge", "Connections opened beyond pool_size.",
+                               [(labels, s.get("overflow", 0)) for labels, s in pool_stats]))
+    lines.extend(_sample_lines("db_pool_checkout_timeouts_total", "counter", "Checkouts that timed out waiting for a connection.",
+                               [(labels, s.get("timeouts", 0)) for labels, s in pool_stats]))
+
+    cache = principal_cache.stats()
+    lines.extend(_sample_lines("principal_cache_lookups_total", "counter", "Principal cache lookups by result.",
+                               [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"])]))
+    hashing = hashing_pool.stats()
+    lines.extend(_sample_lines("password_hashing_queue_depth", "gauge", "bcrypt jobs waiting for a worker process.",
+                               [({}, hashing["queue_depth"])]))
+    lines.extend(_sample_lines("password_hashing_rejected_total", "counter", "bcrypt jobs rejected because the queue was full.",
+                               [({}, hashing["rejected"])]))
+    return "\n".join(lines) + "\n"
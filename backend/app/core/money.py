@@ -0,0 +1,52 @@
+# File: app/core/money.py
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Annotated
+
+from pydantic import AfterValidator, PlainSerializer
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+# --- Money ---
+# Amounts are stored as integer paise (BIGINT), so sums are exact and run on integers in
+# the database. In Python they are always `Decimal` rupees with two places, never floats.
+PAISE_PER_RUPEE = 100
+_TWO_PLACES = Decimal("0.01")
+
+
+def to_rupees(value) -> Decimal:
+    """Normalizes a float, int, str or Decimal amount to Decimal rupees with 2 places."""
+    if not isinstance(value, Decimal):
+        # str() first, so that 0.1 becomes Decimal("0.1") and not its binary expansion.
+        value = Decimal(str(value))
+    return value.quantize(_TWO_PLACES, rounding=ROUND_HALF_UP)
+
+
+def to_paise(value) -> int:
+    return int(to_rupees(value) * PAISE_PER_RUPEE)
+
+
+def from_paise(paise) -> Decimal:
+    """Paise (int, or the numeric a SUM/AVG over BIGINT returns) to Decimal rupees."""
+    # scaleb is exact and keeps two places: 8000 -> Decimal('80.00'), not Decimal('80').
+    return Decimal(paise).scaleb(-2)
+
+
+class Money(TypeDecorator):
+    """
+    A BIGINT column holding paise, exposed as Decimal rupees. Bound parameters are
+    converted too, so `Transaction.amount >= 1000` compares against 100000 paise, and
+    SUM/AVG/COALESCE over the column come back in rupees.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_paise(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_paise(value)
+
+
+# The amount type for request and response schemas: parsed to exact Decimal rupees,
+# serialized as a JSON number so the API contract is unchanged.
+Amount = Annotated[Decimal, AfterValidator(to_rupees), PlainSerializer(float, return_type=float, when_used="json")]
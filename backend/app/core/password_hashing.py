@@ -0,0 +1,114 @@
+# File: app/core/password_hashing.py
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from passlib.context import CryptContext
+
+# --- Password Hashing ---
+# bcrypt is deliberately slow (hundreds of ms per call). Running it inline in a sync
+# endpoint pins one of the limited anyio worker threads, so a burst of logins starves
+# unrelated requests. The async helpers below run it in a small, dedicated process pool.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# Maximum hashing jobs accepted at once (running + queued). Beyond this we shed load
+# with a 503 instead of letting the queue, and every login's latency, grow unbounded.
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing queue is full."""
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+class _HashingPool:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created lazily so importing the app (scripts, tests) never forks processes.
+        # "spawn" avoids forking a process that already runs the server's threads.
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.in_flight >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHashingBusy()
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            try:
+                return await loop.run_in_executor(executor, fn, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed), which breaks the pool for good and fails
+                # every job in it. Replace the pool and retry the job once.
+                self._discard_executor(executor)
+                return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+                self.total_seconds += elapsed
+                self.max_seconds = max(self.max_seconds, elapsed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "in_flight": self.in_flight,
+                "queue_depth": max(0, self.in_flight - self.workers),
+                "peak_in_flight": self.peak_in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_seconds": round(self.total_seconds / self.completed, 4) if self.completed else 0.0,
+                "max_seconds": round(self.max_seconds, 4),
+            }
+
+
+hashing_pool = _HashingPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_pool.run(_verify, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await hashing_pool.run(_hash, password)
@@ -0,0 +1,30 @@
+# File: app/core/principal_cache.py
+import os
+
+from app.core.ttl_cache import TTLCache
+from app.models.user import User
+
+# How long a resolved user stays valid, and how many users one worker keeps in memory.
+# The TTL bounds how stale a cached principal can be on *other* workers after a change;
+# the worker that performs the change invalidates its own entry immediately.
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "1024"))
+
+# Only plain column values are cached, never live ORM instances, so a cached principal
+# can't leak a Session across requests or threads.
+_CACHED_COLUMNS = ("id", "username", "email", "hashed_password", "created_at")
+
+
+class PrincipalCache(TTLCache):
+    """A TTL + LRU cache of authenticated users, keyed by user id."""
+
+    def get(self, user_id: int) -> User | None:
+        """Returns a fresh, session-less User built from the cached values, or None."""
+        values = self._lookup(user_id)
+        return User(**values) if values is not None else None
+
+    def put(self, user: User) -> None:
+        self._store(user.id, {column: getattr(user, column) for column in _CACHED_COLUMNS})
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_SIZE)
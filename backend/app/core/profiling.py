@@ -0,0 +1,177 @@
+# File: app/core/profiling.py
+import asyncio
+import cProfile
+import functools
+import io
+import marshal
+import os
+import pstats
+import secrets
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+# Master switch. When false nothing is installed: no middleware, no endpoint wrappers,
+# so un-profiled requests pay exactly nothing. When true, a request is only profiled if
+# it carries `X-Profile: 1` (or `?__profile=1`) AND a valid X-Internal-Token header.
+REQUEST_PROFILING_ENABLED = os.getenv("REQUEST_PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+REQUEST_PROFILING_MAX_STORED = int(os.getenv("REQUEST_PROFILING_MAX_STORED", "20"))
+_TOP_N = 40
+
+# The cProfile.Profile of the request being profiled, if any. Sync endpoints see it too,
+# because the threadpool runs them in a copy of the request's context.
+_active_profiler: ContextVar[cProfile.Profile | None] = ContextVar("active_profiler", default=None)
+# cProfile and tracemalloc are process-wide; profile one request at a time per worker.
+_profiling_lock = threading.Lock()
+
+
+class ProfileStore:
+    """Bounded in-memory store of finished profiles, keyed by request id."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._profiles: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile_id: str, profile: dict) -> None:
+        with self._lock:
+            self._profiles[profile_id] = profile
+            while len(self._profiles) > self.max_entries:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> dict | None:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def summaries(self) -> list:
+        with self._lock:
+            return [
+                {k: v for k, v in p.items() if k not in ("pstats", "report", "top_allocations")}
+                for p in reversed(self._profiles.values())
+            ]
+
+
+profile_store = ProfileStore(REQUEST_PROFILING_MAX_STORED)
+
+
+def _profile_requested(request: Request) -> bool:
+    flagged = request.headers.get("x-profile") == "1" or request.query_params.get("__profile") == "1"
+    if not flagged:
+        return False
+    # Imported lazily so the token is read from the same place as the other internal endpoints.
+    from app.core.deps import INTERNAL_API_TOKEN
+    token = request.headers.get("x-internal-token")
+    return bool(INTERNAL_API_TOKEN and token and secrets.compare_digest(token, INTERNAL_API_TOKEN))
+
+
+def _wrap_endpoint(call):
+    """Runs the endpoint under the request's profiler, in whichever thread it executes."""
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def async_wrapper(*args, **kwargs):
+            profiler = _active_profiler.get()
+            if profiler is None:
+                return await call(*args, **kwargs)
+            profiler.enable()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                profiler.disable()
+        return async_wrapper
+
+    @functools.wraps(call)
+    def sync_wrapper(*args, **kwargs):
+        profiler = _active_profiler.get()
+        if profiler is None:
+            return call(*args, **kwargs)
+        profiler.enable()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            profiler.disable()
+    return sync_wrapper
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        if not _profile_requested(request):
+            return await call_next(request)
+        if not _profiling_lock.acquire(blocking=False):
+            response = await call_next(request)
+            response.headers["X-Profile-Status"] = "busy"
+            return response
+
+        profile_id = uuid.uuid4().hex
+        profiler = cProfile.Profile()
+        token = _active_profiler.set(profiler)
+        # tracemalloc is global: allocations of concurrent requests on this worker are included.
+        started_tracemalloc = not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start(25)
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.take_snapshot()
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            elapsed = time.perf_counter() - started
+            _active_profiler.reset(token)
+            try:
+                snapshot = tracemalloc.take_snapshot()
+                _, peak_bytes = tracemalloc.get_traced_memory()
+                if started_tracemalloc:
+                    tracemalloc.stop()
+                self._store(profile_id, request, profiler, elapsed, baseline, snapshot, peak_bytes)
+            finally:
+                _profiling_lock.release()
+        response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    @staticmethod
+    def _store(profile_id, request, profiler, elapsed, baseline, snapshot, peak_bytes):
+        profiler.create_stats()
+        # Serialize first: pstats.Stats(profiler) takes ownership of, and clears, profiler.stats.
+        raw_stats = marshal.dumps(profiler.stats)
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(_TOP_N)
+        route = request.scope.get("route")
+        allocation_diff = snapshot.compare_to(baseline, "lineno")[:20]
+        profile_store.add(profile_id, {
+            "id": profile_id,
+            "recorded_at": datetime.utcnow().isoformat(),
+            "method": request.method,
+            "route": getattr(route, "path", request.url.path),
+            "duration_ms": round(elapsed * 1000, 3),
+            "peak_traced_memory_bytes": peak_bytes,
+            "report": report.getvalue(),
+            "top_allocations": [
+                {"location": str(stat.traceback[0]), "size_diff_bytes": stat.size_diff, "count_diff": stat.count_diff}
+                for stat in allocation_diff
+            ],
+            # marshal'd pstats, byte-identical to `cProfile -o` output. Open with snakeviz,
+            # or render a flame graph with `flameprof profile.pstats > profile.svg`.
+            "pstats": raw_stats,
+        })
+
+
+def install_request_profiling(app: FastAPI) -> bool:
+    """
+    Wraps every API endpoint so it can run under a per-request profiler, and adds the
+    middleware that triggers it. Must be called after all routers are included.
+    """
+    if not REQUEST_PROFILING_ENABLED:
+        return False
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.dependant.call is not None:
+            route.dependant.call = _wrap_endpoint(route.dependant.call)
+    app.add_middleware(ProfilingMiddleware)
+    return True
@@ -1,16 +1,19 @@
 # File: app/core/security.py
 import os
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from typing import Optional
 from dotenv import load_dotenv
 
+from app.core.password_hashing import pwd_context
+
 # Load environment variables from the .env file
 load_dotenv()
 
 # --- Password Hashing ---
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# The shared context lives in password_hashing so the hashing worker processes can
+# import it without needing the JWT settings below. Request handlers use the async
+# variants from app.core.password_hashing; these sync versions block the calling thread.
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
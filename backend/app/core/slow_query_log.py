@@ -0,0 +1,143 @@
+# File: app/core/slow_query_log.py
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("app.slow_query_log")
+
+# Opt-in: statements slower than this many milliseconds are recorded. 0 disables the recorder
+# entirely (no event hooks are installed, so there is no overhead).
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "0"))
+SLOW_QUERY_BUFFER_SIZE = int(os.getenv("SLOW_QUERY_BUFFER_SIZE", "100"))
+# EXPLAIN ANALYZE re-executes the statement, so it is only ever used for SELECTs (and
+# rolled back), and only when explicitly enabled. Otherwise a plain EXPLAIN is captured.
+SLOW_QUERY_EXPLAIN_ANALYZE = os.getenv("SLOW_QUERY_EXPLAIN_ANALYZE", "false").lower() in ("1", "true", "yes")
+
+_EXPLAINABLE_PREFIXES = ("select", "with", "insert", "update", "delete")
+_SENSITIVE_PARAM_HINTS = ("password", "token", "secret", "email", "username")
+
+
+def _redact_value(name: str, value):
+    """Keeps values that help reproduce a plan (numbers, dates, sizes) and hides anything personal."""
+    if any(hint in str(name).lower() for hint in _SENSITIVE_PARAM_HINTS):
+        return "<redacted>"
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (Decimal, date, datetime)):
+        return str(value)
+    if isinstance(value, (list, tuple, set)):
+        return f"<{len(value)} items>"
+    if isinstance(value, str):
+        # Descriptions, search terms and the like are user financial data.
+        return f"<str len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters):
+    if isinstance(parameters, dict):
+        return {k: _redact_value(k, v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(i, v) for i, v in enumerate(parameters)]
+    return None
+
+
+class SlowQueryLog:
+    """A bounded, thread-safe ring buffer of slow statements and their plans."""
+
+    def __init__(self, max_entries: int):
+        self._entries: deque = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def add(self, entry: dict) -> None:
+        with self._lock:
+            self.recorded += 1
+            self._entries.append(entry)
+
+    def entries(self) -> list:
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog(SLOW_QUERY_BUFFER_SIZE)
+
+
+def _explain(cursor, statement: str, parameters) -> tuple:
+    """
+    Runs EXPLAIN for `statement` on the same DBAPI connection, inside a savepoint that is
+    always rolled back: a failing EXPLAIN can't abort the caller's transaction, and
+    whatever EXPLAIN ANALYZE executed is undone. Uses a raw DBAPI cursor, which bypasses
+    SQLAlchemy events (and therefore this recorder and the metrics).
+    """
+    # Only plain SELECTs are re-executed: a WITH may hold a data-modifying CTE
+    analyze = SLOW_QUERY_EXPLAIN_ANALYZE and statement.lstrip().lower().startswith("select")
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    raw_cursor = cursor.connection.cursor()
+    try:
+        raw_cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            raw_cursor.execute(f"EXPLAIN ({options}) {statement}", parameters)
+            plan = raw_cursor.fetchone()[0]
+        except Exception as e:
+            plan = {"error": str(e).strip()}
+        raw_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+        raw_cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan, analyze
+    finally:
+        raw_cursor.close()
+
+
+# Timed on the statement's execution context (see app.core.metrics), so a failed
+# statement leaves nothing behind on the connection
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._slow_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_slow_query_start", None)
+    if started is None:
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    if duration_ms < SLOW_QUERY_THRESHOLD_MS:
+        return
+    plan, analyzed = None, False
+    if not executemany and statement.lstrip().lower().startswith(_EXPLAINABLE_PREFIXES):
+        try:
+            plan, analyzed = _explain(cursor, statement, parameters)
+        except Exception as e:  # e.g. the connection is already in a failed transaction
+            plan = {"error": str(e).strip()}
+    slow_query_log.add({
+        "recorded_at": datetime.utcnow().isoformat(),
+        "duration_ms": round(duration_ms, 3),
+        "statement": statement,
+        "parameters": redact_parameters(parameters) if not executemany else f"<executemany: {len(parameters)} rows>",
+        "explain_analyze": analyzed,
+        "plan": plan,
+    })
+    logger.warning("Slow query (%.1f ms): %s", duration_ms, " ".join(statement.split())[:200])
+
+
+def install_slow_query_log() -> bool:
+    """Installs the engine hooks if SLOW_QUERY_THRESHOLD_MS is set. Returns whether it is enabled."""
+    if SLOW_QUERY_THRESHOLD_MS <= 0:
+        return False
+    if not event.contains(Engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    return True
+
+
+def slow_query_log_enabled() -> bool:
+    return event.contains(Engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,88 @@
+# File: app/core/ttl_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    A thread-safe TTL + LRU map with hit, miss, eviction and invalidation counters: the
+    shared core of this worker's caches. Subclasses decide what is stored under which key
+    and when it is computed; None is never a cached value.
+    """
+
+    # What entries are stamped with. Subclasses comparing stamps with times taken on other
+    # workers use wall-clock time instead.
+    clock = staticmethod(time.monotonic)
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()  # key -> (stored at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _live(self, key, invalidated_at: float | None = None):
+        """The value under `key` if it is neither expired nor older than `invalidated_at`; call with the lock held."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if stored_at + self.ttl_seconds < self.clock():
+            del self._entries[key]
+            return None
+        if invalidated_at is not None and invalidated_at >= stored_at:
+            del self._entries[key]
+            self.invalidations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _lookup(self, key, invalidated_at: float | None = None):
+        """Like _live, counted as a hit or a miss."""
+        with self._lock:
+            value = self._live(key, invalidated_at)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def _peek(self, key):
+        """Like _live, without counting a lookup."""
+        with self._lock:
+            return self._live(key)
+
+    def _store(self, key, value, stored_at: float | None = None) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock() if stored_at is None else stored_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
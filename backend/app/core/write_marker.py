@@ -0,0 +1,19 @@
+# File: app/core/write_marker.py
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.db.session import WRITE_MARKER_HEADER
+
+
+class WriteMarkerMiddleware(BaseHTTPMiddleware):
+    """
+    Adds WRITE_MARKER_HEADER (the commit time) to responses of requests that committed
+    writes. The session stamps `request.state.last_write_at` on commit (app.db.session).
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        last_write_at = getattr(request.state, "last_write_at", None)
+        if last_write_at is not None:
+            response.headers[WRITE_MARKER_HEADER] = f"{last_write_at:.3f}"
+        return response
@@ -2,6 +2,7 @@
 from sqlalchemy.orm import Session
 from app.models.account import Account
 from app.schemas.account_schema import AccountCreate, AccountUpdate
+from app.services.balance_service import shift_account_balances
 
 #! CHANGE: All functions now require a user_id
 def get_all_accounts(db: Session, user_id: int):
@@ -21,6 +22,9 @@ def update_account(db: Session, account_id: int, account_in: AccountUpdate, user
     if not account:
         return None
     account_data = account_in.model_dump(exclude_unset=True)
+    if "opening_balance" in account_data:
+        # Every daily balance snapshot moves with the opening balance
+        shift_account_balances(db, account.id, account.opening_balance, account_data["opening_balance"])
     for key, value in account_data.items():
         setattr(account, key, value)
     db.commit()
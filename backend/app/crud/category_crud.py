@@ -1,8 +1,10 @@
 # File: app/crud/category_crud.py
 from sqlalchemy.orm import Session
 from app.models.category import Category
+from app.models.merchant import Merchant
 from app.models.transaction import Transaction
 from app.schemas.category_schema import CategoryCreate, CategoryUpdate
+from app.services.categorizer_service import categorizer_cache
 from fastapi import HTTPException
 
 #! CHANGE: All functions now require a user_id
@@ -60,7 +62,13 @@ def delete_category(db: Session, category_id: int, user_id: int):
         db.query(Transaction).filter(
             Transaction.category_id == category_id, 
             Transaction.user_id == user_id
-        ).update({Transaction.category_id: None}, synchronize_session=False)
+        ).update({Transaction.category_id: None, Transaction.category_predicted: False}, synchronize_session=False)
+        # ...and merchants that default to it (imports auto-create categorized merchants)
+        db.query(Merchant).filter(
+            Merchant.category_id == category_id,
+            Merchant.user_id == user_id
+        ).update({Merchant.category_id: None}, synchronize_session=False)
         db.delete(category)
         db.commit()
+        categorizer_cache.invalidate(user_id)
     return category
\ No newline at end of file
@@ -1,4 +1,5 @@
 # File: app/crud/goal_crud.py
+from decimal import Decimal
 from sqlalchemy.orm import Session
 from app.models.goal import Goal
 from app.models.category import Category
@@ -6,7 +7,7 @@ from app.schemas.goal_schema import GoalCreate, GoalUpdate
 from fastapi import HTTPException
 
 #! CHANGE: All functions now require a user_id for scoping
-def upsert_budget_for_category(db: Session, category_id: int, month: str, limit_amount: float, user_id: int):
+def upsert_budget_for_category(db: Session, category_id: int, month: str, limit_amount: Decimal, user_id: int):
     """
     Finds a goal for a given category and month FOR A SPECIFIC USER.
     - If it exists, it updates the limit_amount.
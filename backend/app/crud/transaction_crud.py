@@ -1,11 +1,18 @@
 # File: app/crud/transaction_crud.py
 from sqlalchemy.orm import Session
+from sqlalchemy import select, func, literal, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.models.transaction import Transaction
 from app.models.tag import Tag
 from app.models.account import Account
 from app.models.transaction_tag import TransactionTag
-from app.schemas.transaction_schema import TransactionCreate, TransactionUpdate
-from app.services.alert_service import check_and_create_budget_alerts # ✅ 1. Import the service
+from app.models.transaction_raw_record import TransactionRawRecord
+from app.db.partitions import create_missing_partitions
+from app.schemas.transaction_schema import TransactionCreate, TransactionUpdate, TransactionBatchRequest
+from app.services.alert_service import check_and_create_budget_alerts, check_budget_alerts_for_batch # ✅ 1. Import the service
+from app.services.transaction_service import apply_transaction_filters
+from app.services.categorizer_service import categorizer_cache
+from app.services.balance_service import apply_balance_deltas, balance_deltas, balance_change, stored_balance_deltas
 from fastapi import HTTPException
 
 def create_transaction(db: Session, txn_in: TransactionCreate, user_id: int):
@@ -24,8 +31,11 @@ def create_transaction(db: Session, txn_in: TransactionCreate, user_id: int):
             txn.tags_association.append(TransactionTag(tag=tag, user_id=user_id))
             
     db.add(txn)
+    apply_balance_deltas(db, user_id, balance_deltas([(txn.account_id, txn.txn_date, txn.type, txn.amount)]))
     db.commit()
     db.refresh(txn)
+    # A category picked by hand is training data for the user's categorizer
+    categorizer_cache.record_correction(user_id, txn.description, None, txn.category_id)
 
     # ✅ 2. After saving, check for alerts
     check_and_create_budget_alerts(db, user_id, txn)
@@ -39,6 +49,12 @@ def update_transaction(db: Session, txn_id: int, txn_in: TransactionUpdate, user
         return None
 
     update_data = txn_in.model_dump(exclude_unset=True)
+    old_category_id = txn.category_id
+    was_predicted = txn.category_predicted
+    if "category_id" in update_data:
+        # Set or kept by the user: no longer the model's guess
+        txn.category_predicted = False
+    old_balance_row = (txn.account_id, txn.txn_date, txn.type, txn.amount)
     
     for field, value in update_data.items():
         if field != "tag_ids":
@@ -54,8 +70,17 @@ def update_transaction(db: Session, txn_id: int, txn_in: TransactionUpdate, user
             for tag in tags:
                 txn.tags_association.append(TransactionTag(tag=tag, user_id=user_id))
 
+    new_balance_row = (txn.account_id, txn.txn_date, txn.type, txn.amount)
+    if new_balance_row != old_balance_row:
+        apply_balance_deltas(db, user_id, balance_change(balance_deltas([new_balance_row]), balance_deltas([old_balance_row])))
     db.commit()
     db.refresh(txn)
+    if txn.category_id != old_category_id or (was_predicted and not txn.category_predicted):
+        # The user corrected or confirmed the category: teach the categorizer right away.
+        # A predicted category was never learned, so there is nothing to unlearn.
+        categorizer_cache.record_correction(
+            user_id, txn.description, None if was_predicted else old_category_id, txn.category_id
+        )
 
     # ✅ 3. Also check for alerts after an update
     check_and_create_budget_alerts(db, user_id, txn)
@@ -67,9 +92,170 @@ def update_transaction(db: Session, txn_id: int, txn_in: TransactionUpdate, user
 def get_transaction_by_id(db: Session, txn_id: int, user_id: int):
     return db.query(Transaction).filter(Transaction.id == txn_id, Transaction.user_id == user_id).first()
 
+def get_transaction_raw_data(db: Session, txn_id: int, user_id: int):
+    """The source row of one transaction, or None if the user has no such transaction."""
+    row = db.query(Transaction.id, TransactionRawRecord.data).outerjoin(
+        TransactionRawRecord, TransactionRawRecord.transaction_id == Transaction.id
+    ).filter(Transaction.id == txn_id, Transaction.user_id == user_id).first()
+    if row is None:
+        return None
+    return {"transaction_id": row.id, "raw_data": row.data}
+
 def delete_transaction(db: Session, txn_id: int, user_id: int):
     txn = db.query(Transaction).filter(Transaction.id == txn_id, Transaction.user_id == user_id).first()
     if txn:
+        apply_balance_deltas(db, user_id, balance_change({}, balance_deltas([(txn.account_id, txn.txn_date, txn.type, txn.amount)])))
         db.delete(txn)
         db.commit()
-    return txn
\ No newline at end of file
+    return txn
+
+# --- BATCH MUTATIONS ---
+# Bulk actions from the transaction log run as a handful of set-based statements in a
+# single database transaction, followed by ONE budget alert evaluation, instead of
+# one lookup/commit/alert-check round trip per row.
+
+# Changing any of these moves the accounts' daily balances (balance_service)
+BALANCE_FIELDS = {"account_id", "txn_date", "type", "amount"}
+
+def _validate_user_tag_ids(db: Session, tag_ids: list, user_id: int) -> set:
+    unique_tag_ids = set(tag_ids)
+    found = {row[0] for row in db.query(Tag.id).filter(Tag.id.in_(unique_tag_ids), Tag.user_id == user_id).all()}
+    if len(found) != len(unique_tag_ids):
+        raise HTTPException(status_code=400, detail="One or more tags are invalid or do not belong to the user.")
+    return found
+
+def _validate_user_account_ids(db: Session, account_ids: set, user_id: int):
+    found = {row[0] for row in db.query(Account.id).filter(Account.id.in_(account_ids), Account.user_id == user_id).all()}
+    if len(found) != len(account_ids):
+        raise HTTPException(status_code=404, detail="Account not found for the current user.")
+
+def _resolve_batch_target_ids(db: Session, batch_in: TransactionBatchRequest, user_id: int) -> list:
+    """Returns the ids of the user's transactions selected by `ids` and/or `filter`."""
+    if batch_in.ids is None and batch_in.filter is None:
+        raise HTTPException(status_code=400, detail="Provide either 'ids' or a 'filter' to select transactions.")
+
+    query = db.query(Transaction.id).filter(Transaction.user_id == user_id)
+    if batch_in.ids is not None:
+        query = query.filter(Transaction.id.in_(batch_in.ids))
+    if batch_in.filter is not None:
+        filters = {k: v for k, v in batch_in.filter.model_dump().items() if v is not None and v != ''}
+        # An empty filter would silently target the user's entire history.
+        if not filters:
+            raise HTTPException(status_code=400, detail="A filter must specify at least one criterion.")
+        query = apply_transaction_filters(query, filters)
+    return [row[0] for row in query.all()]
+
+def _bulk_attach_tags(db: Session, txn_ids: list, tag_ids: set, user_id: int) -> None:
+    """INSERT ... SELECT of every (transaction, tag) pair, skipping pairs that already exist."""
+    pairs = (
+        select(Transaction.id, Tag.id, literal(user_id))
+        .select_from(Transaction)
+        .join(Tag, true())
+        .where(
+            Transaction.user_id == user_id,
+            Transaction.id.in_(txn_ids),
+            Tag.user_id == user_id,
+            Tag.id.in_(tag_ids)
+        )
+    )
+    stmt = pg_insert(TransactionTag).from_select(["transaction_id", "tag_id", "user_id"], pairs)
+    db.execute(stmt.on_conflict_do_nothing(index_elements=["transaction_id", "tag_id"]))
+
+def _bulk_create_transactions(db: Session, txns_in: list, user_id: int) -> list:
+    _validate_user_account_ids(db, {t.account_id for t in txns_in}, user_id)
+    all_tag_ids = [tag_id for t in txns_in for tag_id in (t.tag_ids or [])]
+    if all_tag_ids:
+        _validate_user_tag_ids(db, all_tag_ids, user_id)
+
+    create_missing_partitions(db, {t.txn_date for t in txns_in})
+    txns = [Transaction(**t.model_dump(exclude={"tag_ids"}), user_id=user_id) for t in txns_in]
+    db.add_all(txns)
+    db.flush() # One multi-row INSERT ... RETURNING to obtain the new ids
+    apply_balance_deltas(db, user_id, balance_deltas((t.account_id, t.txn_date, t.type, t.amount) for t in txns))
+
+    associations = [
+        {"transaction_id": txn.id, "tag_id": tag_id, "user_id": user_id}
+        for txn, t in zip(txns, txns_in) for tag_id in set(t.tag_ids or [])
+    ]
+    if associations:
+        db.execute(pg_insert(TransactionTag), associations)
+    return [txn.id for txn in txns]
+
+def batch_mutate_transactions(db: Session, batch_in: TransactionBatchRequest, user_id: int) -> dict:
+    created_ids = []
+    if batch_in.action == "create":
+        if not batch_in.transactions:
+            raise HTTPException(status_code=400, detail="No transactions supplied for batch create.")
+        created_ids = _bulk_create_transactions(db, batch_in.transactions, user_id)
+        target_ids = created_ids
+        affected_count = len(created_ids)
+    else:
+        if batch_in.action in ("tag", "untag") and not batch_in.tag_ids:
+            raise HTTPException(status_code=400, detail="'tag_ids' is required for tag and untag actions.")
+        if batch_in.action == "update" and batch_in.changes is None:
+            raise HTTPException(status_code=400, detail="'changes' is required for the update action.")
+
+        target_ids = _resolve_batch_target_ids(db, batch_in, user_id)
+        affected_count = len(target_ids)
+        if not target_ids:
+            return {"action": batch_in.action, "affected_count": 0, "created_ids": []}
+
+        if batch_in.action == "update":
+            update_data = batch_in.changes.model_dump(exclude_unset=True)
+            new_tag_ids = update_data.pop("tag_ids", None)
+            if "category_id" in update_data:
+                update_data["category_predicted"] = False
+            if update_data.get("account_id") is not None:
+                _validate_user_account_ids(db, {update_data["account_id"]}, user_id)
+            if update_data:
+                moves_balances = bool(BALANCE_FIELDS & update_data.keys())
+                old_deltas = stored_balance_deltas(db, user_id, target_ids) if moves_balances else {}
+                db.query(Transaction).filter(
+                    Transaction.user_id == user_id, Transaction.id.in_(target_ids)
+                ).update(update_data, synchronize_session=False)
+                if moves_balances:
+                    apply_balance_deltas(db, user_id, balance_change(stored_balance_deltas(db, user_id, target_ids), old_deltas))
+            if "category_id" in update_data:
+                # Too many rows to replay one by one: retrain on next use
+                categorizer_cache.invalidate(user_id)
+            if "tag_ids" in batch_in.changes.model_fields_set:
+                valid_tag_ids = _validate_user_tag_ids(db, new_tag_ids, user_id) if new_tag_ids else set()
+                db.query(TransactionTag).filter(
+                    TransactionTag.user_id == user_id, TransactionTag.transaction_id.in_(target_ids)
+                ).delete(synchronize_session=False)
+                if valid_tag_ids:
+                    _bulk_attach_tags(db, target_ids, valid_tag_ids, user_id)
+
+        elif batch_in.action == "tag":
+            _bulk_attach_tags(db, target_ids, _validate_user_tag_ids(db, batch_in.tag_ids, user_id), user_id)
+
+        elif batch_in.action == "untag":
+            db.query(TransactionTag).filter(
+                TransactionTag.user_id == user_id,
+                TransactionTag.transaction_id.in_(target_ids),
+                TransactionTag.tag_id.in_(batch_in.tag_ids)
+            ).delete(synchronize_session=False)
+
+        elif batch_in.action == "delete":
+            db.query(TransactionTag).filter(
+                TransactionTag.user_id == user_id, TransactionTag.transaction_id.in_(target_ids)
+            ).delete(synchronize_session=False)
+            apply_balance_deltas(db, user_id, balance_change({}, stored_balance_deltas(db, user_id, target_ids)))
+            affected_count = db.query(Transaction).filter(
+                Transaction.user_id == user_id, Transaction.id.in_(target_ids)
+            ).delete(synchronize_session=False)
+
+    # One alert evaluation for every (category, month) the batch touched.
+    # Deleting spend can never cross a budget threshold, so deletes skip this step.
+    if batch_in.action != "delete":
+        category_months = db.query(
+            Transaction.category_id, func.to_char(Transaction.txn_date, 'YYYY-MM')
+        ).filter(
+            Transaction.user_id == user_id,
+            Transaction.id.in_(target_ids),
+            Transaction.category_id.isnot(None)
+        ).distinct().all()
+        check_budget_alerts_for_batch(db, user_id, set(category_months))
+
+    db.commit()
+    return {"action": batch_in.action, "affected_count": affected_count, "created_ids": created_ids}
@@ -4,6 +4,7 @@ from sqlalchemy import or_
 from app.models.user import User
 from app.schemas.user_schema import UserCreate
 from app.core.security import get_password_hash
+from app.core.principal_cache import principal_cache
 
 def get_user_by_identifier(db: Session, identifier: str):
     """Finds a user by their username OR their email."""
@@ -16,9 +17,11 @@ def get_user_by_email(db: Session, email: str) -> User | None:
     """Finds a user specifically by their email."""
     return db.query(User).filter(User.email == email).first()
 
-def create_user(db: Session, user: UserCreate):
+def create_user(db: Session, user: UserCreate, hashed_password: str | None = None):
     # We have removed the data seeding as you requested.
-    hashed_password = get_password_hash(user.password)
+    # Async callers hash the password off-thread and pass the result in.
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -34,4 +37,6 @@ def delete_user(db: Session, user_id: int):
     if user:
         db.delete(user)
         db.commit()
+        # The deleted user's tokens must stop authenticating immediately on this worker.
+        principal_cache.invalidate(user_id)
     return user
\ No newline at end of file
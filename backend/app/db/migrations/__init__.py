@@ -0,0 +1,63 @@
+# File: app/db/migrations/__init__.py
+"""
+Ordered, idempotent schema migrations for existing databases.
+
+Each migration is a module in this package exposing `upgrade(connection)`. Applied
+versions are recorded in `schema_migrations`; run pending ones with:
+
+    python -m app.db.migrations
+
+An applied migration must keep doing what it did when it was written, so migrations
+don't import application code that later changes (models, services, app.db.partitions):
+their DDL and logic are copied in as of their version.
+"""
+import importlib
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+# Append new migrations here; never reorder or rename applied ones.
+MIGRATIONS = [
+    "m0001_amounts_in_paise",
+    "m0002_partition_transactions",
+    "m0003_transaction_raw_records",
+    "m0004_transaction_fingerprints",
+    "m0005_transaction_amount_index",
+    "m0006_recurring_payments",
+    "m0007_account_balances",
+    "m0008_transaction_tag_index",
+    "m0009_raw_record_key_sequence",
+    "m0010_transaction_category_predicted",
+    "m0011_transaction_series_indexes",
+    "m0012_daily_spending",
+]
+
+
+def column_type(connection: Connection, table: str, column: str) -> str | None:
+    return connection.execute(text("""
+        SELECT data_type FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = :table AND column_name = :column
+    """), {"table": table, "column": column}).scalar()
+
+
+def run_migrations(engine: Engine) -> list:
+    """Applies every pending migration, each in its own transaction. Returns the versions applied."""
+    with engine.begin() as connection:
+        connection.execute(text("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version VARCHAR PRIMARY KEY,
+                applied_at TIMESTAMP NOT NULL DEFAULT now()
+            )
+        """))
+        applied = {row[0] for row in connection.execute(text("SELECT version FROM schema_migrations"))}
+
+    newly_applied = []
+    for version in MIGRATIONS:
+        if version in applied:
+            continue
+        module = importlib.import_module(f"{__name__}.{version}")
+        with engine.begin() as connection:
+            module.upgrade(connection)
+            connection.execute(text("INSERT INTO schema_migrations (version) VALUES (:version)"), {"version": version})
+        newly_applied.append(version)
+    return newly_applied
@@ -0,0 +1,7 @@
+# File: app/db/migrations/__main__.py
+from app.db.migrations import run_migrations
+from app.db.session import engine
+
+if __name__ == "__main__":
+    applied = run_migrations(engine)
+    print(f"Applied {len(applied)} migration(s): {', '.join(applied)}" if applied else "Database is up to date.")
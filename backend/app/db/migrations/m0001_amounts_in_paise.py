@@ -0,0 +1,21 @@
+# File: app/db/migrations/m0001_amounts_in_paise.py
+"""
+Stores money as integer paise: transactions.amount (was double precision) and
+goals.limit_amount (was numeric(12,2)) become BIGINT. Values are rounded half away
+from zero, matching app.core.money.to_paise for the positive amounts we store.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db.migrations import column_type
+
+
+def upgrade(connection: Connection) -> None:
+    for table, column in (("transactions", "amount"), ("goals", "limit_amount")):
+        current = column_type(connection, table, column)
+        # Missing (fresh database, created from the models) or already converted.
+        if current is None or current == "bigint":
+            continue
+        connection.execute(text(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE BIGINT USING round({column}::numeric * 100)::bigint"
+        ))
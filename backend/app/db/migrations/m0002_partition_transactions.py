@@ -0,0 +1,117 @@
+# File: app/db/migrations/m0002_partition_transactions.py
+"""
+Converts `transactions` into a table range-partitioned by month of txn_date.
+
+The existing heap is renamed, a partitioned table with the same columns is created, one
+partition per month present in the data (plus the months ahead and a default partition)
+is created, rows are copied over, and the old heap is dropped. The id sequence is kept.
+
+Constraints change as Postgres requires for partitioned tables: the primary key becomes
+(id, txn_date), unique_key is unique per txn_date, and the transaction_tags foreign key
+is replaced by a delete trigger. Runs in one transaction and takes an exclusive lock on
+`transactions` for the duration of the copy.
+
+The DDL is frozen as of this version rather than imported from app.db.partitions, which
+later migrations change (m0003 extends the delete trigger).
+"""
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+LEGACY_TABLE = "transactions_unpartitioned"
+COLUMNS = "id, txn_date, description, amount, type, source, account_id, category_id, merchant_id, user_id, upi_ref, unique_key, raw_data, created_at"
+PARTITIONS_AHEAD = 3
+
+DELETE_CASCADE_DDL = """
+CREATE OR REPLACE FUNCTION transactions_delete_cascade() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM transaction_tags
+    WHERE transaction_id = OLD.id AND NOT EXISTS (SELECT 1 FROM transactions WHERE id = OLD.id);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS transactions_delete_cascade ON transactions;
+CREATE TRIGGER transactions_delete_cascade AFTER DELETE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION transactions_delete_cascade();
+"""
+
+
+def _is_partitioned(connection: Connection) -> bool:
+    return connection.execute(text("""
+        SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid
+                       WHERE c.relname = 'transactions' AND c.relnamespace = current_schema()::regnamespace)
+    """)).scalar()
+
+
+def _create_month_partition(connection: Connection, month_start: date) -> None:
+    """An empty partition for one month (the default partition is still empty here)."""
+    month_end = month_start + relativedelta(months=1)
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS transactions_y{month_start.year:04d}m{month_start.month:02d} PARTITION OF transactions "
+        f"FOR VALUES FROM ('{month_start.isoformat()}') TO ('{month_end.isoformat()}')"
+    ))
+
+
+def upgrade(connection: Connection) -> None:
+    exists = connection.execute(text("SELECT to_regclass('transactions') IS NOT NULL")).scalar()
+    if not exists or _is_partitioned(connection):
+        return
+
+    connection.execute(text("LOCK TABLE transactions IN ACCESS EXCLUSIVE MODE"))
+    # Drop the tag foreign key (named by Postgres) before the referenced table goes away.
+    fk_names = connection.execute(text("""
+        SELECT conname FROM pg_constraint
+        WHERE conrelid = 'transaction_tags'::regclass AND confrelid = 'transactions'::regclass AND contype = 'f'
+    """)).scalars().all() if connection.execute(text("SELECT to_regclass('transaction_tags') IS NOT NULL")).scalar() else []
+    for name in fk_names:
+        connection.execute(text(f'ALTER TABLE transaction_tags DROP CONSTRAINT "{name}"'))
+
+    connection.execute(text(f"ALTER TABLE transactions RENAME TO {LEGACY_TABLE}"))
+    connection.execute(text(f"ALTER SEQUENCE transactions_id_seq OWNED BY NONE"))
+    # Free the index and constraint names (transactions_pkey, ix_transactions_id, ...) for the new table.
+    for index_name in connection.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table"
+    ), {"table": LEGACY_TABLE}).scalars().all():
+        connection.execute(text(f'ALTER INDEX "{index_name}" RENAME TO "{index_name}_unpartitioned"'))
+
+    connection.execute(text("""
+        CREATE TABLE transactions (
+            id INTEGER NOT NULL DEFAULT nextval('transactions_id_seq'),
+            txn_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            description VARCHAR NOT NULL,
+            amount BIGINT NOT NULL,
+            type VARCHAR NOT NULL,
+            source VARCHAR NOT NULL,
+            account_id INTEGER NOT NULL REFERENCES accounts (id),
+            category_id INTEGER REFERENCES categories (id),
+            merchant_id INTEGER REFERENCES merchants (id),
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            upi_ref VARCHAR,
+            unique_key VARCHAR,
+            raw_data JSON,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT transactions_pkey PRIMARY KEY (id, txn_date),
+            CONSTRAINT uq_transactions_unique_key_txn_date UNIQUE (unique_key, txn_date)
+        ) PARTITION BY RANGE (txn_date)
+    """))
+    connection.execute(text("ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id"))
+    connection.execute(text("CREATE INDEX ix_transactions_id ON transactions (id)"))
+    connection.execute(text("CREATE INDEX ix_transactions_user_id_txn_date ON transactions (user_id, txn_date)"))
+    connection.execute(text("CREATE TABLE IF NOT EXISTS transactions_default PARTITION OF transactions DEFAULT"))
+
+    # Create the monthly partitions while they are still empty (cheap), then copy once:
+    # every month with data, plus this month and PARTITIONS_AHEAD after it.
+    this_month = date.today().replace(day=1)
+    months = set(connection.execute(text(
+        f"SELECT DISTINCT date_trunc('month', txn_date)::date FROM {LEGACY_TABLE}"
+    )).scalars().all())
+    months |= {this_month + relativedelta(months=i) for i in range(PARTITIONS_AHEAD + 1)}
+    for month_start in sorted(months):
+        _create_month_partition(connection, month_start)
+
+    connection.execute(text(f"INSERT INTO transactions ({COLUMNS}) SELECT {COLUMNS} FROM {LEGACY_TABLE}"))
+    connection.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+    connection.execute(text(DELETE_CASCADE_DDL))
+    connection.execute(text("ANALYZE transactions"))
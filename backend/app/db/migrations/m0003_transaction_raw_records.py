@@ -0,0 +1,83 @@
+# File: app/db/migrations/m0003_transaction_raw_records.py
+"""
+Moves transactions.raw_data into the transaction_raw_records side table (JSONB) and
+drops the column.
+
+Dropping a column only hides it; the old values stay in every heap page until the rows
+are rewritten. Each partition is therefore rewritten with CLUSTER on its (user_id,
+txn_date) index, which also stores a user's month contiguously for the screen scans.
+Takes an exclusive lock on `transactions` for the duration.
+
+The delete trigger and compression DDL are frozen as of this version, not imported from
+app.db.partitions and the model.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db.migrations import column_type
+
+CLUSTER_INDEX = "ix_transactions_user_id_txn_date"
+
+# The delete trigger of m0002, now also removing the transaction's raw record.
+DELETE_CASCADE_DDL = """
+CREATE OR REPLACE FUNCTION transactions_delete_cascade() RETURNS trigger AS $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM transactions WHERE id = OLD.id) THEN
+        DELETE FROM transaction_tags WHERE transaction_id = OLD.id;
+        DELETE FROM transaction_raw_records WHERE transaction_id = OLD.id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS transactions_delete_cascade ON transactions;
+CREATE TRIGGER transactions_delete_cascade AFTER DELETE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION transactions_delete_cascade();
+"""
+RAW_RECORD_COMPRESSION_DDL = """
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_settings WHERE name = 'default_toast_compression' AND 'lz4' = ANY(enumvals)) THEN
+        ALTER TABLE transaction_raw_records ALTER COLUMN data SET COMPRESSION lz4;
+    END IF;
+END
+$$;
+"""
+
+
+def upgrade(connection: Connection) -> None:
+    if not connection.execute(text("SELECT to_regclass('transactions') IS NOT NULL")).scalar():
+        return
+
+    connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS transaction_raw_records (
+            transaction_id INTEGER PRIMARY KEY,
+            data JSONB NOT NULL
+        )
+    """))
+    connection.execute(text(RAW_RECORD_COMPRESSION_DDL))
+    connection.execute(text(DELETE_CASCADE_DDL))
+
+    if column_type(connection, "transactions", "raw_data") is None:
+        return
+    connection.execute(text("LOCK TABLE transactions IN ACCESS EXCLUSIVE MODE"))
+    connection.execute(text("""
+        INSERT INTO transaction_raw_records (transaction_id, data)
+        SELECT id, raw_data::jsonb FROM transactions
+        WHERE raw_data IS NOT NULL AND json_typeof(raw_data) <> 'null'
+        ON CONFLICT (transaction_id) DO NOTHING
+    """))
+    connection.execute(text("ALTER TABLE transactions DROP COLUMN raw_data"))
+
+    # CLUSTER can't target the partitioned parent inside a transaction, but each
+    # partition can be clustered on its own copy of the index.
+    leaves = connection.execute(text("""
+        SELECT tbl.relname, idx.relname FROM pg_inherits i
+        JOIN pg_class idx ON idx.oid = i.inhrelid
+        JOIN pg_index x ON x.indexrelid = idx.oid
+        JOIN pg_class tbl ON tbl.oid = x.indrelid
+        WHERE i.inhparent = to_regclass(:index)
+    """), {"index": CLUSTER_INDEX}).all()
+    for table, index in leaves:
+        connection.execute(text(f'CLUSTER "{table}" USING "{index}"'))
+    connection.execute(text("ANALYZE transactions"))
+    connection.execute(text("ANALYZE transaction_raw_records"))
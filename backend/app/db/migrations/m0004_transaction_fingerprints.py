@@ -0,0 +1,89 @@
+# File: app/db/migrations/m0004_transaction_fingerprints.py
+"""
+Adds transactions.fingerprint with its (user_id, fingerprint) index, plus a
+(user_id, upi_ref) index, and backfills fingerprints for every imported transaction
+(everything but MANUAL- entries) so that re-uploading an old statement is deduplicated.
+
+The backfill computes fingerprints in Python, reading the running balance from
+transaction_raw_records. Identical rows are numbered in id order within their (account,
+timestamp) group, matching the per-file counter. The fingerprint format is frozen here as
+of this version (app/services/dedup_service.py computed the same at the time).
+"""
+import hashlib
+from collections import Counter
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db.migrations import column_type
+
+BATCH_SIZE = 5000
+# Raw-record keys holding the running balance, per bank export.
+BALANCE_COLUMNS = ("Closing Balance", "Balance (INR )")
+
+
+def _balance_paise(value) -> str:
+    """Paise as text, or '' when the export has no usable balance for the row."""
+    if value is None:
+        return ""
+    text_value = str(value).replace(",", "").strip()
+    if text_value.lower() in ("", "nan", "none", "-"):
+        return ""
+    try:
+        return str(int(Decimal(text_value).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) * 100))
+    except (ArithmeticError, InvalidOperation):
+        return ""
+
+
+def _fingerprint_base(account_id, txn_date, amount_paise, txn_type, description, balance) -> str:
+    return "|".join((
+        str(account_id), txn_date.strftime("%Y-%m-%dT%H:%M:%S"), str(amount_paise), txn_type,
+        " ".join(str(description).lower().split()), _balance_paise(balance),
+    ))
+
+
+def _flush(connection: Connection, batch: list) -> None:
+    if batch:
+        connection.execute(text("""
+            UPDATE transactions t SET fingerprint = v.fingerprint
+            FROM unnest(CAST(:ids AS INTEGER[]), CAST(:fingerprints AS VARCHAR[])) AS v(id, fingerprint)
+            WHERE t.id = v.id
+        """), {"ids": [row[0] for row in batch], "fingerprints": [row[1] for row in batch]})
+
+
+def upgrade(connection: Connection) -> None:
+    if not connection.execute(text("SELECT to_regclass('transactions') IS NOT NULL")).scalar():
+        return
+    if column_type(connection, "transactions", "fingerprint") is None:
+        connection.execute(text("ALTER TABLE transactions ADD COLUMN fingerprint VARCHAR(64)"))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_user_id_fingerprint ON transactions (user_id, fingerprint)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_user_id_upi_ref ON transactions (user_id, upi_ref)"
+    ))
+
+    balance = "COALESCE(" + ", ".join(f"r.data ->> '{column}'" for column in BALANCE_COLUMNS) + ")"
+    rows = connection.execute(text(f"""
+        SELECT t.id, t.account_id, t.txn_date, t.amount, t.type, t.description, {balance}
+        FROM transactions t
+        LEFT JOIN transaction_raw_records r ON r.transaction_id = t.id
+        WHERE t.fingerprint IS NULL AND (t.unique_key IS NULL OR t.unique_key NOT LIKE 'MANUAL-%')
+        ORDER BY t.account_id, t.txn_date, t.id
+    """).execution_options(stream_results=True, yield_per=BATCH_SIZE))
+
+    batch, group, seen = [], None, None
+    for txn_id, account_id, txn_date, amount_paise, txn_type, description, balance_value in rows:
+        # Identical rows share account and timestamp, so the counter can restart per group.
+        if (account_id, txn_date) != group:
+            group, seen = (account_id, txn_date), Counter()
+        base = _fingerprint_base(account_id, txn_date, amount_paise, txn_type, description, balance_value)
+        seen[base] += 1
+        fingerprint = hashlib.sha256(f"{base}|{seen[base]}".encode("utf-8")).hexdigest()
+        batch.append((txn_id, fingerprint))
+        if len(batch) >= BATCH_SIZE:
+            _flush(connection, batch)
+            batch = []
+    _flush(connection, batch)
+    connection.execute(text("ANALYZE transactions"))
@@ -0,0 +1,15 @@
+# File: app/db/migrations/m0005_transaction_amount_index.py
+"""
+Adds the (user_id, amount, txn_date) index cross-source reconciliation reads its
+candidates through (app/services/dedup_service.py).
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def upgrade(connection: Connection) -> None:
+    if not connection.execute(text("SELECT to_regclass('transactions') IS NOT NULL")).scalar():
+        return
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_user_id_amount_txn_date ON transactions (user_id, amount, txn_date)"
+    ))
@@ -0,0 +1,34 @@
+# File: app/db/migrations/m0006_recurring_payments.py
+"""
+Creates the recurring_payments table (app/models/recurring_payment.py). It starts empty:
+series are detected on the next upload, or for the whole history with
+`python -m app.services.recurring_service`.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def upgrade(connection: Connection) -> None:
+    if not connection.execute(text("SELECT to_regclass('transactions') IS NOT NULL")).scalar():
+        return
+    connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS recurring_payments (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            series_key VARCHAR NOT NULL,
+            name VARCHAR NOT NULL,
+            merchant_id INTEGER REFERENCES merchants (id) ON DELETE SET NULL,
+            category_id INTEGER REFERENCES categories (id) ON DELETE SET NULL,
+            account_id INTEGER REFERENCES accounts (id) ON DELETE SET NULL,
+            cadence VARCHAR NOT NULL,
+            interval_days DOUBLE PRECISION NOT NULL,
+            typical_amount BIGINT NOT NULL,
+            occurrences INTEGER NOT NULL,
+            first_date DATE NOT NULL,
+            last_date DATE NOT NULL,
+            next_expected_date DATE NOT NULL,
+            updated_at TIMESTAMP NOT NULL DEFAULT now(),
+            CONSTRAINT _user_id_series_key_uc UNIQUE (user_id, series_key)
+        )
+    """))
+    connection.execute(text("CREATE INDEX IF NOT EXISTS ix_recurring_payments_id ON recurring_payments (id)"))
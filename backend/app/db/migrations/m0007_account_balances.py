@@ -0,0 +1,45 @@
+# File: app/db/migrations/m0007_account_balances.py
+"""
+Adds accounts.opening_balance and the account_balances daily snapshot table
+(app/models/account_balance.py), and fills the table from the transaction history with
+the window-function rebuild the repair job (balance_service.rebuild_account_balances)
+used at this version, frozen here. Opening balances start unknown (treated as 0) until
+the user sets one or a statement with a balance column is uploaded.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db.migrations import column_type
+
+
+def upgrade(connection: Connection) -> None:
+    if not connection.execute(text("SELECT to_regclass('transactions') IS NOT NULL")).scalar():
+        return
+    if column_type(connection, "accounts", "opening_balance") is None:
+        connection.execute(text("ALTER TABLE accounts ADD COLUMN opening_balance BIGINT"))
+    connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS account_balances (
+            account_id INTEGER NOT NULL REFERENCES accounts (id) ON DELETE CASCADE,
+            balance_date DATE NOT NULL,
+            user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            net_change BIGINT NOT NULL,
+            balance BIGINT NOT NULL,
+            PRIMARY KEY (account_id, balance_date)
+        )
+    """))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_account_balances_user_id_balance_date ON account_balances (user_id, balance_date)"
+    ))
+    connection.execute(text("DELETE FROM account_balances"))
+    connection.execute(text("""
+        INSERT INTO account_balances (account_id, user_id, balance_date, net_change, balance)
+        SELECT d.account_id, a.user_id, d.day, d.net_change,
+               COALESCE(a.opening_balance, 0) + SUM(d.net_change) OVER (PARTITION BY d.account_id ORDER BY d.day)
+        FROM (
+            SELECT account_id, txn_date::date AS day, SUM(CASE WHEN type = 'credit' THEN amount ELSE -amount END) AS net_change
+            FROM transactions
+            GROUP BY 1, 2
+        ) d
+        JOIN accounts a ON a.id = d.account_id
+    """))
+    connection.execute(text("ANALYZE account_balances"))
@@ -0,0 +1,16 @@
+# File: app/db/migrations/m0008_transaction_tag_index.py
+"""
+Adds the (user_id, tag_id, transaction_id) index on transaction_tags that tag analytics
+and the "Exclude from Analytics" lookup read through (app/services/tag_analytics_service.py).
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def upgrade(connection: Connection) -> None:
+    if not connection.execute(text("SELECT to_regclass('transaction_tags') IS NOT NULL")).scalar():
+        return
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_transaction_tags_user_id_tag_id ON transaction_tags (user_id, tag_id, transaction_id)"
+    ))
+    connection.execute(text("ANALYZE transaction_tags"))
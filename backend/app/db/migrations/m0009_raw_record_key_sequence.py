@@ -0,0 +1,15 @@
+# File: app/db/migrations/m0009_raw_record_key_sequence.py
+"""
+Drops the SERIAL default and sequence that create_all gave transaction_raw_records.transaction_id
+before the model set autoincrement=False. The key is always the transaction's id; a stray
+default would silently hand out ids that match no transaction.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def upgrade(connection: Connection) -> None:
+    if not connection.execute(text("SELECT to_regclass('transaction_raw_records') IS NOT NULL")).scalar():
+        return
+    connection.execute(text("ALTER TABLE transaction_raw_records ALTER COLUMN transaction_id DROP DEFAULT"))
+    connection.execute(text("DROP SEQUENCE IF EXISTS transaction_raw_records_transaction_id_seq"))
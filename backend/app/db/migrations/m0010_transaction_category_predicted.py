@@ -0,0 +1,17 @@
+# File: app/db/migrations/m0010_transaction_category_predicted.py
+"""
+Adds transactions.category_predicted: the category was guessed by the learned model, and
+the row is left out of the model's training data. Rows categorized before this migration
+can't be told apart and stay FALSE; a constant default adds the column without rewriting
+the table.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def upgrade(connection: Connection) -> None:
+    if not connection.execute(text("SELECT to_regclass('transactions') IS NOT NULL")).scalar():
+        return
+    connection.execute(text(
+        "ALTER TABLE transactions ADD COLUMN IF NOT EXISTS category_predicted BOOLEAN NOT NULL DEFAULT false"
+    ))
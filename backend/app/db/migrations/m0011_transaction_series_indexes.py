@@ -0,0 +1,33 @@
+# File: app/db/migrations/m0011_transaction_series_indexes.py
+"""
+Adds the partial indexes recurring detection counts and reads a user's debit series
+through (app/services/recurring_service.py): (user_id, merchant_id, txn_date) for
+merchant series, and (user_id, narration_key(description), txn_date) for merchant-less
+ones, with the narration_key() SQL function it needs.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+NARRATION_KEY_DDL = """
+CREATE OR REPLACE FUNCTION narration_key(description text) RETURNS text AS $$
+    SELECT coalesce(string_agg(word[1], ' ' ORDER BY n), '')
+    FROM regexp_matches(lower(description), '[a-z0-9]+', 'g') WITH ORDINALITY AS words(word, n)
+    WHERE length(word[1]) >= 2 AND length(word[1]) - length(translate(word[1], '0123456789', '')) < 3
+$$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+"""
+
+
+def upgrade(connection: Connection) -> None:
+    if not connection.execute(text("SELECT to_regclass('transactions') IS NOT NULL")).scalar():
+        return
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_user_id_merchant_id_txn_date ON transactions "
+        "(user_id, merchant_id, txn_date) WHERE merchant_id IS NOT NULL AND type = 'debit'"
+    ))
+    connection.execute(text(NARRATION_KEY_DDL))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_user_id_narration_key ON transactions "
+        "(user_id, narration_key(description), txn_date) WHERE merchant_id IS NULL AND type = 'debit'"
+    ))
+    # The planner's estimates for the key come from statistics on the index expression
+    connection.execute(text("ANALYZE transactions"))
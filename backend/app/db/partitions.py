@@ -0,0 +1,166 @@
+# File: app/db/partitions.py
+"""
+Monthly range partitions of `transactions` (partitioned by `txn_date`).
+
+Every month gets its own partition, `transactions_yYYYYmMM`; rows for a month without one
+land in `transactions_default`, so an insert never fails. Partitions are created ahead of
+time by `python -m app.db.partitions` (run it from cron, e.g. daily) and on demand by the
+upload/batch-create paths for the months they are about to write (create_missing_partitions,
+in a short transaction of its own before the request writes anything).
+"""
+import re
+from datetime import date, datetime
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+PARENT_TABLE = "transactions"
+DEFAULT_PARTITION = "transactions_default"
+PARTITIONS_AHEAD = 3
+# How long on-demand creation waits for the table locks before leaving the rows to the
+# default partition (and the cron run).
+PARTITION_LOCK_TIMEOUT = "2s"
+_PARTITION_NAME = re.compile(r"^transactions_y(\d{4})m(\d{2})$")
+
+# transaction_tags and transaction_raw_records can't have a foreign key to a partitioned
+# table whose primary key is (id, txn_date), so ON DELETE CASCADE is emulated. The NOT
+# EXISTS keeps them when an UPDATE of txn_date moves a row to another partition (a delete
+# plus an insert).
+DELETE_CASCADE_DDL = """
+CREATE OR REPLACE FUNCTION transactions_delete_cascade() RETURNS trigger AS $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM transactions WHERE id = OLD.id) THEN
+        DELETE FROM transaction_tags WHERE transaction_id = OLD.id;
+        DELETE FROM transaction_raw_records WHERE transaction_id = OLD.id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS transactions_delete_cascade ON transactions;
+CREATE TRIGGER transactions_delete_cascade AFTER DELETE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION transactions_delete_cascade();
+"""
+DEFAULT_PARTITION_DDL = f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"
+
+
+def partition_name(month_start: date) -> str:
+    return f"{PARENT_TABLE}_y{month_start.year:04d}m{month_start.month:02d}"
+
+
+def month_start_of(value: date | datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def is_partitioned(connection: Connection) -> bool:
+    return connection.execute(text("""
+        SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid
+                       WHERE c.relname = :table AND c.relnamespace = current_schema()::regnamespace)
+    """), {"table": PARENT_TABLE}).scalar()
+
+
+def existing_partition_months(connection: Connection) -> set:
+    rows = connection.execute(text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = :table AND p.relnamespace = current_schema()::regnamespace
+    """), {"table": PARENT_TABLE}).scalars()
+    months = set()
+    for name in rows:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months.add(date(int(match.group(1)), int(match.group(2)), 1))
+    return months
+
+
+def create_month_partition(connection: Connection, month_start: date) -> None:
+    """
+    Creates the partition for one month. Rows of that month already sitting in the default
+    partition are moved into it first: attaching a range the default partition still holds
+    rows for would fail.
+    """
+    name = partition_name(month_start)
+    month_end = month_start + relativedelta(months=1)
+    bounds = {"start": month_start, "end": month_end}
+    connection.execute(text(
+        f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    ))
+    # The new table isn't attached yet, so the delete trigger would not see the moved rows
+    # and would drop their tags and raw records; it is off for the move (transactional).
+    connection.execute(text(f"ALTER TABLE {DEFAULT_PARTITION} DISABLE TRIGGER USER"))
+    connection.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {DEFAULT_PARTITION} WHERE txn_date >= :start AND txn_date < :end RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """), bounds)
+    connection.execute(text(f"ALTER TABLE {DEFAULT_PARTITION} ENABLE TRIGGER USER"))
+    # Bounds are literals in DDL; dates are safe to inline.
+    connection.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{month_start.isoformat()}') TO ('{month_end.isoformat()}')"
+    ))
+
+
+def ensure_monthly_partitions(connection: Connection, months) -> list:
+    """
+    Makes sure a partition exists for every month in `months` (dates or datetimes; any
+    day of the month). Returns the partition names created. No-op if the table is not
+    partitioned, so callers don't need to know how the database was set up.
+    """
+    wanted = {month_start_of(m) for m in months}
+    if not wanted or not is_partitioned(connection):
+        return []
+    missing = sorted(wanted - existing_partition_months(connection))
+    for month_start in missing:
+        # Serializes concurrent creators; a second caller re-checks after the lock.
+        connection.execute(text(f"LOCK TABLE {PARENT_TABLE} IN SHARE ROW EXCLUSIVE MODE"))
+        if month_start in existing_partition_months(connection):
+            continue
+        create_month_partition(connection, month_start)
+    return [partition_name(m) for m in missing]
+
+
+def create_missing_partitions(db: Session, months) -> list:
+    """
+    ensure_monthly_partitions on a connection of its own (from `db`'s engine), committed
+    before it returns, so a request's transaction never holds the partition locks (they
+    block every tenant's writes). Called before the request writes anything. If the locks
+    aren't granted within PARTITION_LOCK_TIMEOUT nothing is created: the rows land in the
+    default partition and the cron run moves them into their partition later.
+    """
+    wanted = {month_start_of(m) for m in months}
+    if not wanted:
+        return []
+    try:
+        with db.get_bind().engine.begin() as connection:
+            connection.execute(text(f"SET LOCAL lock_timeout = '{PARTITION_LOCK_TIMEOUT}'"))
+            return ensure_monthly_partitions(connection, wanted)
+    except OperationalError as e:
+        print(f"⚠️ Partitions for {sorted(wanted)} not created, rows go to {DEFAULT_PARTITION}: {str(e.orig).strip()}")
+        return []
+
+
+def maintain_partitions(connection: Connection, months_ahead: int = PARTITIONS_AHEAD, today: date | None = None) -> list:
+    """
+    Creates partitions for the current month and `months_ahead` months after it, plus one
+    for every month that has rows stranded in the default partition.
+    """
+    this_month = month_start_of(today or date.today())
+    months = {this_month + relativedelta(months=i) for i in range(months_ahead + 1)}
+    if is_partitioned(connection):
+        months |= set(connection.execute(text(
+            f"SELECT DISTINCT date_trunc('month', txn_date)::date FROM {DEFAULT_PARTITION}"
+        )).scalars())
+    return ensure_monthly_partitions(connection, months)
+
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    with engine.begin() as connection:
+        created = maintain_partitions(connection)
+    print(f"Created {len(created)} partition(s): {', '.join(created)}" if created else "All partitions exist.")
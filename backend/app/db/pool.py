@@ -0,0 +1,80 @@
+# File: app/db/pool.py
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class PoolWaitStats:
+    """Aggregates how long requests wait to check a connection out of the pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, wait_seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_seconds / attempts * 1000, 3) if attempts else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """A QueuePool that records the time spent waiting for a connection."""
+
+    def __init__(self, *args, max_overflow: int = 10, **kwargs):
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        # QueuePool keeps this private; stored for get_pool_stats
+        self.max_overflow = max_overflow
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # Keep the accumulated statistics across pool recreation (e.g. engine.dispose()).
+        new_pool = super().recreate()
+        new_pool.wait_stats = self.wait_stats
+        return new_pool
+
+
+def get_pool_stats(engine) -> dict:
+    """Live statistics for an engine's connection pool."""
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            # Negative while the pool has not yet opened `size` connections.
+            "overflow": pool.overflow(),
+            "timeout_seconds": pool.timeout(),
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        stats["max_overflow"] = pool.max_overflow
+        stats.update(pool.wait_stats.snapshot())
+    return stats
@@ -1,8 +1,15 @@
 # File: app/main.py
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.api.api_router import api_router
+from app.core import deps
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.write_marker import WriteMarkerMiddleware
+from app.db.session import WRITE_MARKER_HEADER
+from app.core.slow_query_log import install_slow_query_log
+from app.core.profiling import install_request_profiling
 from dotenv import load_dotenv
 
 # Load a standard .env file for consistency. Render will use its own environment variables.
@@ -29,10 +36,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],    # Allows all standard methods (GET, POST, etc.)
     allow_headers=["*"],    # Allows all standard headers
+    expose_headers=[WRITE_MARKER_HEADER],  # read by the frontend, see app.db.session
 )
 
+# Opt-in slow-query recorder (SLOW_QUERY_THRESHOLD_MS); readable at /api/v1/internal/slow-queries.
+install_slow_query_log()
+
+# Per-route latency, SQL statement counts and DB time, exported on /metrics.
+app.add_middleware(MetricsMiddleware)
+
+# Tells the client when its request committed writes, for read-your-writes across workers.
+app.add_middleware(WriteMarkerMiddleware)
+
 app.include_router(api_router, prefix="/api/v1")
 
+# Opt-in (REQUEST_PROFILING_ENABLED) per-request cProfile + tracemalloc, triggered by an
+# admin with `X-Profile: 1`. Disabled, it installs nothing. Must run after the routers are included.
+install_request_profiling(app)
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False, dependencies=[Depends(deps.require_internal_access)])
+def metrics():
+    """Prometheus scrape endpoint (per worker). Requires the X-Internal-Token header."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/")
 def root():
     return {"message": "Welcome to the Personal Finance Tracker API"}
\ No newline at end of file
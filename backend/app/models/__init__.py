@@ -1,8 +1,12 @@
 from .account import Account
+from .account_balance import AccountBalance
+from .daily_spending import DailySpending
 from .category import Category
 from .transaction import Transaction
 from .transaction_tag import TransactionTag
+from .transaction_raw_record import TransactionRawRecord
 from .merchant import Merchant
 from .goal import Goal
 from .tag import Tag
 from .alert import Alert
+from .recurring_payment import RecurringPayment
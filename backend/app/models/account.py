@@ -2,6 +2,7 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base 
+from app.core.money import Money
 
 class Account(Base):
     __tablename__ = "accounts"
@@ -11,6 +12,9 @@ class Account(Base):
     type = Column(String, nullable=False)
     provider = Column(String, nullable=False)
     account_number = Column(String, nullable=True)
+    # Balance before the first transaction (paise). Set by the user, or derived from the
+    # running balance of the first statement uploaded for the account; None means unknown.
+    opening_balance = Column(Money, nullable=True)
     
     #! CHANGE: Add user_id column and relationship
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,22 @@
+# File: app/models/account_balance.py
+from sqlalchemy import Column, Integer, Date, ForeignKey, Index
+from app.db.base_class import Base
+from app.core.money import Money
+
+class AccountBalance(Base):
+    """
+    An account's closing balance at the end of one day, stored for the days it has
+    transactions; the balance on any other day is the last snapshot before it. Kept up
+    to date by app/services/balance_service.py as transactions are written.
+    """
+    __tablename__ = "account_balances"
+    __table_args__ = (
+        # Net-worth series read every account of a user over a date range
+        Index("ix_account_balances_user_id_balance_date", "user_id", "balance_date"),
+    )
+
+    account_id = Column(Integer, ForeignKey("accounts.id", ondelete="CASCADE"), primary_key=True)
+    balance_date = Column(Date, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    net_change = Column(Money, nullable=False)  # paise; credits minus debits of the day
+    balance = Column(Money, nullable=False)  # paise; opening balance plus every change up to the day
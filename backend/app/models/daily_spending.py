@@ -0,0 +1,117 @@
+# File: app/models/daily_spending.py
+from sqlalchemy import Column, Integer, Date, ForeignKey, DDL, event
+from app.db.base_class import Base
+from app.core.money import Money
+
+class DailySpending(Base):
+    """
+    A user's debits on one day: all of them, and the part tagged "Exclude from
+    Analytics". Lets all-history figures (monthly overview, spending heatmap, velocity
+    history) read one row per day instead of every transaction. Kept up to date by the
+    database triggers below, so no write path has to know about it.
+    """
+    __tablename__ = "daily_spending"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    debit_total = Column(Money, nullable=False)  # paise
+    debit_count = Column(Integer, nullable=False)
+    excluded_total = Column(Money, nullable=False)  # paise; the tagged part of debit_total
+    excluded_count = Column(Integer, nullable=False)
+
+
+# Row triggers on transactions, transaction_tags and tags add each change to the day it
+# falls on. A transaction's trigger must see its tags before transactions_delete_cascade
+# removes them; row triggers fire in name order, hence "analytics" < "delete".
+DAILY_SPENDING_DDL = """
+CREATE OR REPLACE FUNCTION daily_spending_add(
+    p_user_id integer, p_txn_date timestamp, p_total bigint, p_count integer, p_excluded_total bigint, p_excluded_count integer
+) RETURNS void AS $$
+    INSERT INTO daily_spending AS s (user_id, day, debit_total, debit_count, excluded_total, excluded_count)
+    VALUES (p_user_id, p_txn_date::date, p_total, p_count, p_excluded_total, p_excluded_count)
+    ON CONFLICT (user_id, day) DO UPDATE SET
+        debit_total = s.debit_total + EXCLUDED.debit_total,
+        debit_count = s.debit_count + EXCLUDED.debit_count,
+        excluded_total = s.excluded_total + EXCLUDED.excluded_total,
+        excluded_count = s.excluded_count + EXCLUDED.excluded_count
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION transaction_excluded_from_analytics(p_id integer, p_user_id integer) RETURNS boolean AS $$
+    SELECT EXISTS (
+        SELECT 1 FROM transaction_tags tt JOIN tags t ON t.id = tt.tag_id
+        WHERE tt.transaction_id = p_id AND t.user_id = p_user_id AND t.name = 'Exclude from Analytics'
+    )
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION transactions_analytics_spending() RETURNS trigger AS $$
+DECLARE
+    excluded integer;
+BEGIN
+    IF TG_OP <> 'INSERT' AND OLD.type = 'debit' THEN
+        excluded := transaction_excluded_from_analytics(OLD.id, OLD.user_id)::integer;
+        PERFORM daily_spending_add(OLD.user_id, OLD.txn_date, -OLD.amount, -1, -OLD.amount * excluded, -excluded);
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.type = 'debit' THEN
+        excluded := transaction_excluded_from_analytics(NEW.id, NEW.user_id)::integer;
+        PERFORM daily_spending_add(NEW.user_id, NEW.txn_date, NEW.amount, 1, NEW.amount * excluded, excluded);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS transactions_analytics_spending ON transactions;
+CREATE TRIGGER transactions_analytics_spending
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, type, amount, txn_date ON transactions
+    FOR EACH ROW EXECUTE FUNCTION transactions_analytics_spending();
+
+CREATE OR REPLACE FUNCTION transaction_tags_analytics_spending() RETURNS trigger AS $$
+DECLARE
+    txn record;
+BEGIN
+    IF TG_OP <> 'INSERT' AND EXISTS (SELECT 1 FROM tags WHERE id = OLD.tag_id AND name = 'Exclude from Analytics') THEN
+        FOR txn IN SELECT txn_date, amount FROM transactions WHERE id = OLD.transaction_id AND user_id = OLD.user_id AND type = 'debit' LOOP
+            PERFORM daily_spending_add(OLD.user_id, txn.txn_date, 0, 0, -txn.amount, -1);
+        END LOOP;
+    END IF;
+    IF TG_OP <> 'DELETE' AND EXISTS (SELECT 1 FROM tags WHERE id = NEW.tag_id AND name = 'Exclude from Analytics') THEN
+        FOR txn IN SELECT txn_date, amount FROM transactions WHERE id = NEW.transaction_id AND user_id = NEW.user_id AND type = 'debit' LOOP
+            PERFORM daily_spending_add(NEW.user_id, txn.txn_date, 0, 0, txn.amount, 1);
+        END LOOP;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS transaction_tags_analytics_spending ON transaction_tags;
+CREATE TRIGGER transaction_tags_analytics_spending
+    AFTER INSERT OR DELETE OR UPDATE ON transaction_tags
+    FOR EACH ROW EXECUTE FUNCTION transaction_tags_analytics_spending();
+
+-- Deleting or renaming the exclusion tag excludes nothing any more (its transaction_tags
+-- rows are gone, or no longer count, by the time this runs); naming a tag so re-counts it.
+CREATE OR REPLACE FUNCTION tags_analytics_spending() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.name = NEW.name THEN
+        RETURN NULL;
+    END IF;
+    IF OLD.name = 'Exclude from Analytics' OR (TG_OP = 'UPDATE' AND NEW.name = 'Exclude from Analytics') THEN
+        UPDATE daily_spending SET excluded_total = 0, excluded_count = 0 WHERE user_id = OLD.user_id;
+    END IF;
+    IF TG_OP = 'UPDATE' AND NEW.name = 'Exclude from Analytics' THEN
+        UPDATE daily_spending s SET excluded_total = e.total, excluded_count = e.payments
+        FROM (
+            SELECT t.txn_date::date AS day, SUM(t.amount) AS total, COUNT(*) AS payments
+            FROM transaction_tags tt JOIN transactions t ON t.id = tt.transaction_id AND t.user_id = tt.user_id
+            WHERE tt.tag_id = NEW.id AND t.type = 'debit'
+            GROUP BY 1
+        ) e
+        WHERE s.user_id = NEW.user_id AND s.day = e.day;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS tags_analytics_spending ON tags;
+CREATE TRIGGER tags_analytics_spending
+    AFTER DELETE OR UPDATE OF name ON tags
+    FOR EACH ROW EXECUTE FUNCTION tags_analytics_spending();
+"""
+# A fresh schema (create_all) gets the functions and triggers once every table they read exists
+event.listen(Base.metadata, "after_create", DDL(DAILY_SPENDING_DDL))
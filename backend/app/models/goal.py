@@ -1,8 +1,9 @@
 # File: app/models/goal.py
-from sqlalchemy import Column, Integer, ForeignKey, String, Numeric, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, String, DateTime
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
+from app.core.money import Money
 
 class Goal(Base):
     __tablename__ = "goals"
@@ -10,7 +11,7 @@ class Goal(Base):
     id = Column(Integer, primary_key=True, index=True)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     month = Column(String, nullable=False, index=True)
-    limit_amount = Column(Numeric(12, 2), nullable=False)
+    limit_amount = Column(Money, nullable=False)  # paise
 
     #! CHANGE: Add user_id column and relationship
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
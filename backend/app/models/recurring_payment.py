@@ -0,0 +1,51 @@
+# File: app/models/recurring_payment.py
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.db.base_class import Base
+from app.core.money import Money
+from datetime import date, timedelta
+
+# cadence -> (shortest, longest median interval in days, tolerance in days). A payment
+# is "active" until its next expected date plus the tolerance has passed.
+CADENCES = {
+    "weekly": (6, 8, 2),
+    "monthly": (26, 35, 5),
+    "quarterly": (84, 98, 10),
+    "yearly": (350, 380, 20),
+}
+
+class RecurringPayment(Base):
+    """
+    A detected recurring debit (subscription, rent, bill) of one user. Rows are written by
+    app/services/recurring_service.py when statements are uploaded, so reading them never
+    rescans the transaction history.
+    """
+    __tablename__ = "recurring_payments"
+    __table_args__ = (UniqueConstraint("user_id", "series_key", name="_user_id_series_key_uc"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # "m:<merchant id>" or "d:<normalized narration>": how the transactions were grouped
+    series_key = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    merchant_id = Column(Integer, ForeignKey("merchants.id", ondelete="SET NULL"), nullable=True)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True)
+    account_id = Column(Integer, ForeignKey("accounts.id", ondelete="SET NULL"), nullable=True)
+
+    cadence = Column(String, nullable=False)  # weekly, monthly, quarterly, yearly
+    interval_days = Column(Float, nullable=False)  # median days between payments
+    typical_amount = Column(Money, nullable=False)  # paise; median of the payments
+    occurrences = Column(Integer, nullable=False)
+    first_date = Column(Date, nullable=False)
+    last_date = Column(Date, nullable=False)
+    next_expected_date = Column(Date, nullable=False)
+
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    merchant = relationship("Merchant")
+    category = relationship("Category")
+
+    @property
+    def is_active(self) -> bool:
+        return self.next_expected_date + timedelta(days=CADENCES[self.cadence][2]) >= date.today()
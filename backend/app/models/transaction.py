@@ -1,30 +1,58 @@
 # File: app/models/transaction.py
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint, DDL, event, false, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
-from sqlalchemy.dialects.postgresql import JSON
+from app.core.money import Money
+from app.db.partitions import DEFAULT_PARTITION_DDL, DELETE_CASCADE_DDL
+from app.models.transaction_raw_record import TransactionRawRecord
 # ✅ 1. Import the association_proxy
 from sqlalchemy.ext.associationproxy import association_proxy
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    # Range-partitioned by month of txn_date (see app/db/partitions.py). Postgres requires
+    # the partition key in every unique constraint, hence (id, txn_date) and
+    # (unique_key, txn_date); the ORM still identifies rows by `id` alone.
+    __table_args__ = (
+        UniqueConstraint("unique_key", "txn_date", name="uq_transactions_unique_key_txn_date"),
+        Index("ix_transactions_user_id_txn_date", "user_id", "txn_date"),
+        # Upload deduplication looks up an upload's refs and fingerprints per user
+        Index("ix_transactions_user_id_upi_ref", "user_id", "upi_ref"),
+        Index("ix_transactions_user_id_fingerprint", "user_id", "fingerprint"),
+        # Cross-source reconciliation reads candidates by amount within a date window
+        Index("ix_transactions_user_id_amount_txn_date", "user_id", "amount", "txn_date"),
+        # Recurring detection looks up debit series by merchant, or by narration key
+        Index(
+            "ix_transactions_user_id_merchant_id_txn_date", "user_id", "merchant_id", "txn_date",
+            postgresql_where=text("merchant_id IS NOT NULL AND type = 'debit'"),
+        ),
+        Index(
+            "ix_transactions_user_id_narration_key", "user_id", text("narration_key(description)"), "txn_date",
+            postgresql_where=text("merchant_id IS NULL AND type = 'debit'"),
+        ),
+        {"postgresql_partition_by": "RANGE (txn_date)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    txn_date = Column(DateTime, nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    txn_date = Column(DateTime, primary_key=True, nullable=False)
     description = Column(String, nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)  # paise
     type = Column(String, nullable=False)
     source = Column(String, nullable=False)
 
     account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    # The category was guessed by the learned model (app/services/categorizer_service.py),
+    # not set by a rule, a merchant or the user. Such rows are never training data.
+    category_predicted = Column(Boolean, nullable=False, default=False, server_default=false())
     merchant_id = Column(Integer, ForeignKey("merchants.id"), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     upi_ref = Column(String, nullable=True)
-    unique_key = Column(String, unique=True, nullable=True)
-    raw_data = Column(JSON, nullable=True)
+    unique_key = Column(String, nullable=True)
+    # sha256 of the statement row's content (app/services/dedup_service.py); None for manual entries
+    fingerprint = Column(String(64), nullable=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     # --- Relationships ---
@@ -32,14 +60,58 @@ class Transaction(Base):
     account = relationship("Account")
     category = relationship("Category")
     merchant = relationship("Merchant", back_populates="transactions")
+    # The imported statement row, stored apart from the hot table. Deletes are left to
+    # the database trigger (passive_deletes), so deleting a transaction doesn't load it.
+    raw_record = relationship(
+        "TransactionRawRecord", uselist=False, cascade="all, delete-orphan", passive_deletes=True,
+        primaryjoin="Transaction.id == foreign(TransactionRawRecord.transaction_id)",
+    )
 
     # ✅ 2. THIS IS THE FIX
     # Step A: Define the relationship to the association table.
     # We rename the old 'tags' relationship to be more specific.
-    tags_association = relationship("TransactionTag", back_populates="transaction", cascade="all, delete-orphan")
+    tags_association = relationship(
+        "TransactionTag", back_populates="transaction", cascade="all, delete-orphan",
+        primaryjoin="Transaction.id == foreign(TransactionTag.transaction_id)",
+    )
 
     # Step B: Create a clean, direct proxy to the 'Tag' model.
     # This creates a `transaction.tags` attribute that acts like a simple list of Tag objects.
     # It reads through `tags_association` and pulls out the `tag` attribute from each object.
     # This is what our Pydantic schemas will use for reading data.
-    tags = association_proxy("tags_association", "tag")
\ No newline at end of file
+    tags = association_proxy("tags_association", "tag")
+
+    __mapper_args__ = {"primary_key": [id]}
+
+    # `raw_data` reads and writes through `raw_record`, so creating or updating a
+    # transaction with raw_data=... keeps working. Reading it costs one query.
+    @property
+    def raw_data(self):
+        return self.raw_record.data if self.raw_record is not None else None
+
+    @raw_data.setter
+    def raw_data(self, value):
+        if value is None:
+            self.raw_record = None
+        elif self.raw_record is not None:
+            self.raw_record.data = value
+        else:
+            self.raw_record = TransactionRawRecord(data=value)
+
+
+# narration_words (app/services/categorizer_service.py) in SQL, joined by spaces: the key
+# of a merchant-less recurring series, without its "d:" prefix.
+NARRATION_KEY_DDL = """
+CREATE OR REPLACE FUNCTION narration_key(description text) RETURNS text AS $$
+    SELECT coalesce(string_agg(word[1], ' ' ORDER BY n), '')
+    FROM regexp_matches(lower(description), '[a-z0-9]+', 'g') WITH ORDINALITY AS words(word, n)
+    WHERE length(word[1]) >= 2 AND length(word[1]) - length(translate(word[1], '0123456789', '')) < 3
+$$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
+"""
+
+# A fresh schema (create_all) gets the narration key function its index needs, the
+# catch-all partition and the tag clean-up trigger; monthly partitions are added by
+# app.db.partitions.
+event.listen(Transaction.__table__, "before_create", DDL(NARRATION_KEY_DDL))
+event.listen(Transaction.__table__, "after_create", DDL(DEFAULT_PARTITION_DDL))
+event.listen(Transaction.__table__, "after_create", DDL(DELETE_CASCADE_DDL))
@@ -0,0 +1,32 @@
+# File: app/models/transaction_raw_record.py
+from sqlalchemy import Column, Integer, DDL, event
+from sqlalchemy.dialects.postgresql import JSONB
+from app.db.base_class import Base
+
+class TransactionRawRecord(Base):
+    """
+    The source statement row a transaction was imported from. Kept out of `transactions`
+    so the aggregate scans of dashboard and analytics read narrow rows; it is only loaded
+    when one transaction is opened (GET /transactions/{id}/raw).
+    """
+    __tablename__ = "transaction_raw_records"
+
+    # No foreign key: `transactions` is partitioned (primary key (id, txn_date)).
+    # Rows are removed by the transactions_delete_cascade trigger. The key is the
+    # transaction's id, never generated here, so no SERIAL sequence.
+    transaction_id = Column(Integer, primary_key=True, autoincrement=False)
+    data = Column(JSONB, nullable=False)
+
+
+# Postgres compresses a value once its row passes ~2 kB (wide Paytm/ICICI exports do);
+# lz4 is faster and usually smaller than the default pglz, where the server has it.
+RAW_RECORD_COMPRESSION_DDL = """
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_settings WHERE name = 'default_toast_compression' AND 'lz4' = ANY(enumvals)) THEN
+        ALTER TABLE transaction_raw_records ALTER COLUMN data SET COMPRESSION lz4;
+    END IF;
+END
+$$;
+"""
+event.listen(TransactionRawRecord.__table__, "after_create", DDL(RAW_RECORD_COMPRESSION_DDL))
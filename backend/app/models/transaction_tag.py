@@ -1,18 +1,28 @@
 # File: app/models/transaction_tag.py
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
 class TransactionTag(Base):
     __tablename__ = "transaction_tags"
+    __table_args__ = (
+        # Tag analytics and the exclusion tag start from a tag's rows; the primary key
+        # leads with transaction_id. transaction_id is included for index-only scans.
+        Index("ix_transaction_tags_user_id_tag_id", "user_id", "tag_id", "transaction_id"),
+    )
 
-    transaction_id = Column(Integer, ForeignKey("transactions.id", ondelete="CASCADE"), primary_key=True)
+    # No foreign key: `transactions` is partitioned and its primary key is (id, txn_date).
+    # Deletes cascade through the transactions_delete_cascade trigger instead.
+    transaction_id = Column(Integer, primary_key=True)
     tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     # ✅ THIS IS THE FIX
     # It now correctly points back to the `tags_association` property on the Transaction model.
-    transaction = relationship("Transaction", back_populates="tags_association")
+    transaction = relationship(
+        "Transaction", back_populates="tags_association",
+        primaryjoin="foreign(TransactionTag.transaction_id) == Transaction.id",
+    )
     
     # This relationship remains the same.
     tag = relationship("Tag", back_populates="transactions")
\ No newline at end of file
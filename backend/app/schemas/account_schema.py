@@ -1,12 +1,15 @@
 # File: app/schemas/account_schema.py
 from pydantic import BaseModel
-from typing import Optional
+from datetime import date
+from typing import List, Optional
+from app.core.money import Amount
 
 class AccountBase(BaseModel):
     name: str
     type: str
     provider: str
     account_number: Optional[str] = None
+    opening_balance: Optional[Amount] = None
 
 class AccountCreate(AccountBase):
     pass
@@ -16,10 +19,30 @@ class AccountUpdate(BaseModel):
     type: Optional[str] = None
     provider: Optional[str] = None
     account_number: Optional[str] = None
+    opening_balance: Optional[Amount] = None
 
 class AccountOut(AccountBase):
     id: int
     user_id: int #! CHANGE: Add user_id to output schema
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# --- Net worth ---
+class NetWorthPoint(BaseModel):
+    date: date
+    net_worth: Amount
+
+class AccountBalanceSeries(BaseModel):
+    account_id: int
+    name: str
+    balances: List[Amount]  # one closing balance per day of the range, like `series`
+
+class NetWorthOut(BaseModel):
+    start_date: date
+    end_date: date
+    series: List[NetWorthPoint]
+    accounts: List[AccountBalanceSeries]
+
+class BalanceRebuildResult(BaseModel):
+    snapshots: int
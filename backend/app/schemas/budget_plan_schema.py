@@ -1,9 +1,10 @@
 from pydantic import BaseModel
 from typing import List
+from app.core.money import Amount
 
 class BudgetItem(BaseModel):
     category_id: int
-    limit_amount: float
+    limit_amount: Amount
 
 class BudgetPlanUpdate(BaseModel):
     month: str  # Format: YYYY-MM
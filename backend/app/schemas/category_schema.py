@@ -20,4 +20,11 @@ class CategoryOut(CategoryBase):
     user_id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class RecategorizationResult(BaseModel):
+    scope: str
+    scanned: int
+    updated: int
+    remaining: int
+    cursor: Optional[str] = None
@@ -1,18 +1,19 @@
 # File: app/schemas/goal_schema.py
 from pydantic import BaseModel
 from typing import Optional
+from app.core.money import Amount
 from .category_schema import CategoryOut # ✅ 1. Import CategoryOut
 
 class GoalBase(BaseModel):
     category_id: int
     month: str  # YYYY-MM format
-    limit_amount: float
+    limit_amount: Amount
 
 class GoalCreate(GoalBase):
     pass
 
 class GoalUpdate(BaseModel):
-    limit_amount: float
+    limit_amount: Amount
 
 class GoalOut(GoalBase):
     id: int
@@ -0,0 +1,25 @@
+# File: app/schemas/recurring_payment_schema.py
+from datetime import date
+from pydantic import BaseModel
+from typing import Optional
+from app.core.money import Amount
+from .category_schema import CategoryOut
+
+class RecurringPaymentOut(BaseModel):
+    id: int
+    name: str
+    merchant_id: Optional[int] = None
+    category_id: Optional[int] = None
+    account_id: Optional[int] = None
+    cadence: str
+    interval_days: float
+    typical_amount: Amount
+    occurrences: int
+    first_date: date
+    last_date: date
+    next_expected_date: date
+    is_active: bool
+    category: Optional[CategoryOut] = None
+
+    class Config:
+        from_attributes = True
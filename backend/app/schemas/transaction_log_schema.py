@@ -3,13 +3,14 @@
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
+from app.core.money import Amount
 from .tag_schema import TagOut 
 
 class TransactionItem(BaseModel):
     id: int
     txn_date: datetime
     description: str
-    amount: float
+    amount: Amount
     type: str
     source: str
     account_id: int
@@ -1,8 +1,9 @@
 # File: app/schemas/transaction_schema.py
 from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import Optional, Dict, Any, List
+from datetime import datetime, date
+from typing import Optional, Dict, Any, List, Literal
 import uuid
+from app.core.money import Amount
 from .tag_schema import TagOut
 
 def default_unique_key():
@@ -11,7 +12,7 @@ def default_unique_key():
 class TransactionBase(BaseModel):
     txn_date: datetime
     description: str
-    amount: float
+    amount: Amount
     type: str
     source: str
     account_id: int
@@ -19,16 +20,15 @@ class TransactionBase(BaseModel):
     merchant_id: Optional[int] = None
     upi_ref: Optional[str] = None
     unique_key: Optional[str] = Field(default_factory=default_unique_key)
-    raw_data: Optional[Dict[str, Any]] = None
     tag_ids: Optional[List[int]] = []
 
 class TransactionCreate(TransactionBase):
-    pass
+    raw_data: Optional[Dict[str, Any]] = None
 
 class TransactionUpdate(BaseModel):
     txn_date: Optional[datetime] = None
     description: Optional[str] = None
-    amount: Optional[float] = None
+    amount: Optional[Amount] = None
     type: Optional[str] = None
     source: Optional[str] = None
     account_id: Optional[int] = None
@@ -49,4 +49,38 @@ class TransactionOut(TransactionBase):
     tags: List[TagOut] = []
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# The imported statement row, served on its own (GET /transactions/{id}/raw) so that
+# transaction responses never load it.
+class TransactionRawOut(BaseModel):
+    transaction_id: int
+    raw_data: Optional[Dict[str, Any]] = None
+
+# --- Batch mutation schemas ---
+# The filter mirrors the query parameters of the transaction log, so a bulk action
+# can target "everything matching the current view" instead of a list of ids.
+class TransactionFilter(BaseModel):
+    account_id: Optional[int] = None
+    category_id: Optional[int] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    type: Optional[str] = None
+    search_term: Optional[str] = None
+
+class TransactionBatchRequest(BaseModel):
+    action: Literal["create", "update", "delete", "tag", "untag"]
+    # Used by "create"
+    transactions: List[TransactionCreate] = []
+    # Target selection for every other action: explicit ids OR a filter expression
+    ids: Optional[List[int]] = None
+    filter: Optional[TransactionFilter] = None
+    # Used by "update"
+    changes: Optional[TransactionUpdate] = None
+    # Used by "tag" and "untag"
+    tag_ids: List[int] = []
+
+class TransactionBatchResult(BaseModel):
+    action: str
+    affected_count: int
+    created_ids: List[int] = []
@@ -3,7 +3,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.models import Transaction, Goal, Alert, Category, Tag, TransactionTag
 from app.crud import alert_crud
-from datetime import date
+from datetime import date, datetime
+from dateutil.relativedelta import relativedelta
 from decimal import Decimal
 
 # Define the thresholds at which we want to create alerts
@@ -22,16 +23,18 @@ def get_total_spend_for_category_in_month(db: Session, user_id: int, category_id
             .all()
         ]
 
-    # Calculate the sum
+    # Calculate the sum. A range on txn_date (not to_char) lets Postgres prune to one partition.
+    month_start = datetime.strptime(month, "%Y-%m")
     total_spend = db.query(func.sum(Transaction.amount)).filter(
         Transaction.user_id == user_id,
         Transaction.category_id == category_id,
         Transaction.type == 'debit',
-        func.to_char(Transaction.txn_date, 'YYYY-MM') == month,
+        Transaction.txn_date >= month_start,
+        Transaction.txn_date < month_start + relativedelta(months=1),
         Transaction.id.notin_(transactions_to_exclude)
     ).scalar()
 
-    return Decimal(total_spend or 0)
+    return total_spend or Decimal(0)
 
 def check_and_create_budget_alerts(db: Session, user_id: int, transaction: Transaction):
     """
@@ -55,8 +58,8 @@ def check_and_create_budget_alerts(db: Session, user_id: int, transaction: Trans
     # Get the new total spend for this category
     total_spend = get_total_spend_for_category_in_month(db, user_id, transaction.category_id, month_str)
     
-    # Calculate the percentage of the budget spent
-    spent_percentage = (total_spend / Decimal(goal.limit_amount)) * 100
+    # Calculate the percentage of the budget spent (both are exact Decimal rupees)
+    spent_percentage = (total_spend / goal.limit_amount) * 100
 
     # Check against each threshold
     for threshold in BUDGET_THRESHOLDS:
@@ -77,4 +80,70 @@ def check_and_create_budget_alerts(db: Session, user_id: int, transaction: Trans
                 })
                 # We only create one alert at a time to avoid spamming.
                 # The next transaction will trigger the check for the next threshold.
-                break
\ No newline at end of file
+                break
+
+def check_budget_alerts_for_batch(db: Session, user_id: int, category_months: set):
+    """
+    Evaluates budget alerts once for every (category_id, 'YYYY-MM') pair touched by a
+    batch mutation. Goals, spend totals and existing alerts are each fetched with a
+    single query instead of running `check_and_create_budget_alerts` per transaction.
+    """
+    category_months = {(cat_id, month) for cat_id, month in category_months if cat_id}
+    if not category_months:
+        return
+
+    category_ids = {cat_id for cat_id, _ in category_months}
+    months = {month for _, month in category_months}
+
+    goals = [
+        goal for goal in db.query(Goal).filter(
+            Goal.user_id == user_id,
+            Goal.category_id.in_(category_ids),
+            Goal.month.in_(months)
+        ).all()
+        if (goal.category_id, goal.month) in category_months and goal.limit_amount > 0
+    ]
+    if not goals:
+        return
+
+    exclude_tag = db.query(Tag).filter(Tag.name == "Exclude from Analytics", Tag.user_id == user_id).first()
+    month_expr = func.to_char(Transaction.txn_date, 'YYYY-MM')
+    month_starts = [datetime.strptime(month, "%Y-%m") for month in months]
+    spend_query = db.query(
+        Transaction.category_id, month_expr.label("month"), func.sum(Transaction.amount)
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.type == 'debit',
+        Transaction.category_id.in_(category_ids),
+        # The date range prunes partitions; the to_char filter drops months in between.
+        Transaction.txn_date >= min(month_starts),
+        Transaction.txn_date < max(month_starts) + relativedelta(months=1),
+        month_expr.in_(months)
+    )
+    if exclude_tag:
+        excluded_ids = db.query(TransactionTag.transaction_id).filter(
+            TransactionTag.tag_id == exclude_tag.id, TransactionTag.user_id == user_id
+        )
+        spend_query = spend_query.filter(Transaction.id.notin_(excluded_ids))
+    spend_map = {(cat_id, month): total for cat_id, month, total in spend_query.group_by(Transaction.category_id, "month").all()}
+
+    existing_alerts = {
+        (goal_id, threshold) for goal_id, threshold in db.query(Alert.goal_id, Alert.threshold_percentage).filter(
+            Alert.user_id == user_id,
+            Alert.goal_id.in_([goal.id for goal in goals])
+        ).all()
+    }
+
+    for goal in goals:
+        total_spend = spend_map.get((goal.category_id, goal.month), Decimal(0))
+        spent_percentage = (total_spend / goal.limit_amount) * 100
+        for threshold in BUDGET_THRESHOLDS:
+            if spent_percentage >= threshold:
+                if (goal.id, threshold) not in existing_alerts:
+                    alert_crud.create_alert(db, user_id=user_id, alert_in={
+                        "goal_id": goal.id,
+                        "threshold_percentage": threshold,
+                        "is_acknowledged": False
+                    })
+                    # Same policy as the single-transaction check: one new alert per goal.
+                    break
@@ -1,13 +1,14 @@
 # File: app/services/analytics_service.py
-from sqlalchemy.orm import Session
-from sqlalchemy import func, text, case, Integer
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, case, Integer, any_, exists, select, true, type_coerce
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
 import calendar
-import pandas as pd
 import math
 
+from app.core.money import Money
 from app.models.transaction import Transaction
+from app.models.daily_spending import DailySpending
 from app.models.category import Category
 from app.models.tag import Tag
 from app.models.transaction_tag import TransactionTag
@@ -15,78 +16,157 @@ from app.models.transaction_tag import TransactionTag
 def clean_nan_values(data):
     if isinstance(data, dict): return {k: clean_nan_values(v) for k, v in data.items()}
     if isinstance(data, list): return [clean_nan_values(i) for i in data]
-    if pd.isna(data) or (isinstance(data, float) and math.isnan(data)): return None
+    if data is None or (isinstance(data, float) and math.isnan(data)): return None
     return data
 
-def get_cumulative_spend_for_period(db: Session, start_date: date, end_date: date, excluded_ids: list, user_id: int) -> pd.DataFrame:
-    query_text = """
-        WITH daily_totals AS (
-            SELECT EXTRACT(DAY FROM txn_date)::integer AS day, SUM(amount) AS total
-            FROM transactions 
-            WHERE user_id = :user_id AND type = 'debit' AND txn_date >= :start_date AND txn_date < :end_date
-            AND id NOT IN :excluded_ids
-            GROUP BY 1
-        ),
-        all_days AS (SELECT generate_series(1, 31) AS day)
-        SELECT d.day, COALESCE(SUM(t.total) OVER (ORDER BY d.day), 0) AS cumulative_spend
-        FROM all_days d LEFT JOIN daily_totals t ON d.day = t.day
-    """
-    result = db.execute(text(query_text), {
-        "user_id": user_id, "start_date": start_date, "end_date": end_date, 
-        "excluded_ids": tuple(excluded_ids) if excluded_ids else (0,)
-    }).fetchall()
-    df = pd.DataFrame(result, columns=['day', 'cumulative_spend']).ffill()
-    return df
+def get_cumulative_spend_for_period(db: Session, start_date: date, end_date: date, not_excluded, user_id: int) -> dict:
+    """Cumulative debit spend by day of month (1-31) for the period, of the rows matching `not_excluded`."""
+    daily_totals = dict(db.query(
+        func.extract('day', Transaction.txn_date).cast(Integer).label('day'),
+        func.sum(Transaction.amount).label('total'),
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.type == 'debit',
+        Transaction.txn_date >= start_date,
+        Transaction.txn_date < end_date,
+        not_excluded,
+    ).group_by('day').all())
+    cumulative, running_total = {}, 0.0
+    for day in range(1, 32):
+        running_total += float(daily_totals.get(day, 0))
+        cumulative[day] = running_total
+    return cumulative
 
-def get_analytics_data(db: Session, time_period: str, include_capital_transfers: bool, user_id: int):
-    today = date.today()
+def get_period_bounds(time_period: str, today: date) -> tuple:
+    """
+    (start date, end date exclusive, is monthly view) of "YYYY-MM", "3m", "6m", "1y" or "all".
+    Raises ValueError for anything else that doesn't end in "m" or "y".
+    """
     is_monthly_view = not (time_period.endswith('m') or time_period.endswith('y') or time_period == "all")
-
     if is_monthly_view:
-        start_date = datetime.strptime(time_period, "%Y-%m").date().replace(day=1)
-        end_date = start_date + relativedelta(months=1)
-    else: 
-        if time_period == "all":
-            start_date = date(2000, 1, 1)
+        try:
+            start_date = datetime.strptime(time_period, "%Y-%m").date().replace(day=1)
+        except ValueError:
+            raise ValueError(f"Invalid time_period '{time_period}'. Use YYYY-MM, 3m, 6m, 1y or all.") from None
+        return start_date, start_date + relativedelta(months=1), True
+    if time_period == "all":
+        start_date = date(2000, 1, 1)
+    else:
+        months_map = {"3m": 3, "6m": 6, "1y": 12}
+        num_months = months_map.get(time_period, 6)
+        start_date = today.replace(day=1) - relativedelta(months=num_months - 1)
+    return start_date, today + relativedelta(days=1), False
+
+def excluded_from_analytics(user_id: int):
+    """Condition true for the user's transactions tagged "Exclude from Analytics", probed per row."""
+    excluded = aliased(TransactionTag)  # the outer query may read transaction_tags too
+    return exists().where(
+        excluded.transaction_id == Transaction.id,
+        excluded.user_id == user_id,
+        excluded.tag_id.in_(select(Tag.id).where(Tag.user_id == user_id, Tag.name == "Exclude from Analytics")),
+    )
+
+def get_period_totals(db: Session, start_date: date, end_date: date, excluded_ids: list | None, user_id: int, tag_id: int | None = None) -> list:
+    """
+    The period's debits and credits (only those tagged `tag_id`, if given) summed per
+    (month, type, category) in one scan. The monthly, category, cash-flow and tag views
+    are all folded from these rows in Python. `excluded_ids` None probes the exclude tag
+    per row instead of binding an id list: cheaper when only a tag's rows are read.
+    """
+    query = db.query(
+        func.to_char(Transaction.txn_date, 'YYYY-MM').label('month'),
+        Transaction.type,
+        Category.name.label('category'),
+        Category.icon_name,
+        Category.is_income,
+        func.count(Transaction.id).label('transaction_count'),
+        func.sum(Transaction.amount).label('total'),
+    ).outerjoin(Category, Transaction.category_id == Category.id).filter(
+        Transaction.user_id == user_id,
+        Transaction.txn_date >= start_date,
+        Transaction.txn_date < end_date,
+        ~excluded_from_analytics(user_id) if excluded_ids is None else Transaction.id.notin_(excluded_ids)
+    )
+    if tag_id is not None:
+        # The tag's ids come from the (user_id, tag_id) index as an array, so each monthly
+        # partition is read by primary key instead of hash-joined in full.
+        tagged_ids = select(TransactionTag.transaction_id).where(
+            TransactionTag.user_id == user_id, TransactionTag.tag_id == tag_id
+        ).scalar_subquery()
+        query = query.filter(Transaction.id == any_(func.array(tagged_ids)))
+    return query.group_by('month', Transaction.type, Category.id, Category.name, Category.icon_name, Category.is_income).all()
+
+def get_cash_flow(period_rows: list) -> tuple:
+    """
+    (cash flow per month, period summary, income by category) from get_period_totals rows.
+    Income is credits filed under an is_income category; other credits (refunds, transfers
+    in, uncategorized) count towards net cash flow but not the savings rate.
+    """
+    months = {}
+    income_by_category = {}
+    for row in period_rows:
+        month = months.setdefault(row.month, {"month": row.month, "income": 0, "otherCredits": 0, "spend": 0})
+        if row.type == 'debit':
+            month["spend"] += row.total
+        elif row.is_income:
+            month["income"] += row.total
+            income_by_category[(row.category, row.icon_name)] = income_by_category.get((row.category, row.icon_name), 0) + row.total
         else:
-            months_map = {"3m": 3, "6m": 6, "1y": 12}
-            num_months = months_map.get(time_period, 6)
-            start_date = today.replace(day=1) - relativedelta(months=num_months - 1)
-        end_date = today + relativedelta(days=1)
+            month["otherCredits"] += row.total
 
-    transactions_to_exclude = []
-    if not include_capital_transfers:
-        exclude_tag = db.query(Tag).filter(Tag.name == "Exclude from Analytics", Tag.user_id == user_id).first()
-        if exclude_tag:
-            transactions_to_exclude = [t.transaction_id for t in db.query(TransactionTag.transaction_id).filter(TransactionTag.tag_id == exclude_tag.id).all()]
+    def _with_rates(totals: dict) -> dict:
+        income, other_credits, spend = totals["income"], totals["otherCredits"], totals["spend"]
+        return {
+            **totals, "income": float(income), "otherCredits": float(other_credits), "spend": float(spend),
+            "net": float(income + other_credits - spend),
+            "savingsRate": round(float((income - spend) / income) * 100, 2) if income > 0 else None,
+        }
+
+    summary = _with_rates({key: sum(m[key] for m in months.values()) for key in ("income", "otherCredits", "spend")})
+    monthly = [_with_rates(months[month]) for month in sorted(months)]
+    total_income = float(sum(income_by_category.values())) or 1
+    by_category = [
+        {"category": category, "total": float(total), "percentage": round((float(total) / total_income) * 100, 2), "icon_name": icon_name}
+        for (category, icon_name), total in sorted(income_by_category.items(), key=lambda item: (item[0][0], item[0][1] or ""))
+    ]
+    return monthly, summary, by_category
+
+def get_analytics_data(db: Session, time_period: str, include_capital_transfers: bool, user_id: int):
+    today = date.today()
+    start_date, end_date, is_monthly_view = get_period_bounds(time_period, today)
+
+    # Tagged rows are probed per row rather than bound as an id list: the list can run to
+    # hundreds of thousands of ids, re-sent and re-planned in every statement below.
+    not_excluded = true() if include_capital_transfers else ~excluded_from_analytics(user_id)
 
     base_query = db.query(Transaction).filter(
         Transaction.user_id == user_id,
         Transaction.type == 'debit',
         Transaction.txn_date >= start_date,
         Transaction.txn_date < end_date,
-        Transaction.id.notin_(transactions_to_exclude)
+        not_excluded
     )
+    period_rows = get_period_totals(db, start_date, end_date, [] if include_capital_transfers else None, user_id)
+    debit_rows = [row for row in period_rows if row.type == 'debit']
     
-    all_time_query = db.query(Transaction).filter(
-        Transaction.user_id == user_id,
-        Transaction.type == 'debit',
-        Transaction.id.notin_(transactions_to_exclude)
-    )
-    monthly_spending_rows = all_time_query.with_entities(
-        func.to_char(Transaction.txn_date, 'YYYY-MM').label('month'),
-        func.sum(Transaction.amount).label('total')
+    # Whole-history figures (highest and average month, velocity history, heatmap) read the
+    # daily rollup, so no view scans more than its own period's partitions
+    spent, payments = DailySpending.debit_total, DailySpending.debit_count
+    if not include_capital_transfers:
+        spent = type_coerce(spent - DailySpending.excluded_total, Money)
+        payments = payments - DailySpending.excluded_count
+    daily_spending = db.query(DailySpending).filter(DailySpending.user_id == user_id, payments > 0)
+    monthly_spending_rows = daily_spending.with_entities(
+        func.to_char(DailySpending.day, 'YYYY-MM').label('month'),
+        func.sum(spent).label('total')
     ).group_by('month').all()
 
     highest_spend_month_data = None
     average_spend_per_month = 0
     if monthly_spending_rows:
-        df_monthly = pd.DataFrame(monthly_spending_rows, columns=['month', 'total'])
-        df_monthly['total'] = pd.to_numeric(df_monthly['total'])
-        if not df_monthly.empty:
-            highest_month_row = df_monthly.loc[df_monthly['total'].idxmax()]
-            highest_spend_month_data = {"month": highest_month_row['month'], "actual": float(highest_month_row['total'])}
-            average_spend_per_month = float(df_monthly['total'].mean())
+        highest_month_row = max(monthly_spending_rows, key=lambda row: float(row.total))
+        highest_spend_month_data = {"month": highest_month_row.month, "actual": float(highest_month_row.total)}
+        average_spend_per_month = sum(float(row.total) for row in monthly_spending_rows) / len(monthly_spending_rows)
 
     overview_data = {"highestSpendMonth": highest_spend_month_data, "averageSpendPerMonth": average_spend_per_month}
     
@@ -101,43 +181,66 @@ def get_analytics_data(db: Session, time_period: str, include_capital_transfers:
             func.sum(case((Transaction.amount < 1000, Transaction.amount), else_=0)).label('small_total'),
             func.sum(case((Transaction.amount >= 1000, Transaction.amount), else_=0)).label('large_total')
         ).group_by('day').order_by('day').all()
-        df_composition = pd.DataFrame(composition_rows, columns=['day', 'small_total', 'large_total'])
-        df_all_days = pd.DataFrame({'day': range(1, calendar.monthrange(start_date.year, start_date.month)[1] + 1)})
-        df_merged = pd.merge(df_all_days, df_composition, on='day', how='left').fillna(0)
-        df_merged['cumulative_small'] = df_merged['small_total'].cumsum()
-        df_merged['cumulative_large'] = df_merged['large_total'].cumsum()
-        spending_composition = df_merged[['day', 'cumulative_small', 'cumulative_large']].to_dict(orient='records')
+        totals_by_day = {row.day: (float(row.small_total), float(row.large_total)) for row in composition_rows}
+        cumulative_small, cumulative_large = 0.0, 0.0
+        for day in range(1, calendar.monthrange(start_date.year, start_date.month)[1] + 1):
+            small_total, large_total = totals_by_day.get(day, (0.0, 0.0))
+            cumulative_small += small_total
+            cumulative_large += large_total
+            spending_composition.append({"day": day, "cumulative_small": cumulative_small, "cumulative_large": cumulative_large})
     else:
         current_month_start_for_velocity = today.replace(day=1)
         current_month_end_for_velocity = current_month_start_for_velocity + relativedelta(months=1)
-        df_current = get_cumulative_spend_for_period(db, current_month_start_for_velocity, current_month_end_for_velocity, transactions_to_exclude, user_id)
-        df_current.rename(columns={'cumulative_spend': 'current'}, inplace=True)
-        df_current.loc[df_current['day'] > today.day, 'current'] = None
+        current_by_day = get_cumulative_spend_for_period(db, current_month_start_for_velocity, current_month_end_for_velocity, not_excluded, user_id)
         prev_month_start = current_month_start_for_velocity - relativedelta(months=1)
-        df_prev = get_cumulative_spend_for_period(db, prev_month_start, current_month_start_for_velocity, transactions_to_exclude, user_id)
-        df_prev.rename(columns={'cumulative_spend': 'previous'}, inplace=True)
+        previous_by_day = get_cumulative_spend_for_period(db, prev_month_start, current_month_start_for_velocity, not_excluded, user_id)
         historical_period_start = start_date
         historical_period_end = current_month_start_for_velocity
-        all_months_query = db.query(func.extract('day', Transaction.txn_date).cast(Integer).label('day'), func.to_char(Transaction.txn_date, 'YYYY-MM').label('month'), func.sum(Transaction.amount).label('daily_total')).filter(Transaction.user_id == user_id, Transaction.type == 'debit', Transaction.txn_date >= historical_period_start, Transaction.txn_date < historical_period_end, Transaction.id.notin_(transactions_to_exclude)).group_by('day', 'month').all()
+        all_months_query = daily_spending.with_entities(
+            func.extract('day', DailySpending.day).cast(Integer).label('day'),
+            func.to_char(DailySpending.day, 'YYYY-MM').label('month'),
+            spent.label('daily_total')
+        ).filter(DailySpending.day >= historical_period_start, DailySpending.day < historical_period_end).all()
         if all_months_query:
-            df_pivot = pd.DataFrame(all_months_query, columns=['day', 'month', 'daily_total']).pivot_table(index='day', columns='month', values='daily_total', fill_value=0)
-            num_historical_months = len(df_pivot.columns)
-            df_avg = pd.DataFrame(df_pivot.cumsum(axis=0).sum(axis=1) / num_historical_months, columns=['average']).reset_index() if num_historical_months > 0 else pd.DataFrame({'day': range(1, 32), 'average': [0]*31})
+            # Average cumulative spend across the historical months, for each day that has spend in any of them.
+            num_historical_months = len({row.month for row in all_months_query})
+            daily_totals = {}
+            for row in all_months_query:
+                daily_totals[row.day] = daily_totals.get(row.day, 0.0) + float(row.daily_total)
+            average_by_day, running_total = {}, 0.0
+            for day in sorted(daily_totals):
+                running_total += daily_totals[day]
+                average_by_day[day] = running_total / num_historical_months
         else:
-            df_avg = pd.DataFrame({'day': range(1, 32), 'average': [0]*31})
-        df_merged = pd.merge(pd.DataFrame({'day': range(1, 32)}), df_current, on='day', how='left').merge(df_prev, on='day', how='left').merge(df_avg, on='day', how='left')
-        spending_velocity = df_merged.to_dict(orient='records')
-        monthly_rows = base_query.with_entities(func.to_char(Transaction.txn_date, 'YYYY-MM').label('month'), func.sum(Transaction.amount).label('total')).group_by('month').order_by('month').all()
-        monthly_breakdown = [{"month": row.month, "spend": float(row.total)} for row in monthly_rows]
-
-    habit_identifier_rows = base_query.join(Category).with_entities(Category.name.label("category"), func.count(Transaction.id).label("transaction_count"), func.sum(Transaction.amount).label("total_spend"), func.avg(Transaction.amount).label("average_spend")).group_by(Category.name).having(func.count(Transaction.id) > 0).all()
-    habit_identifier_data = [{"category": r.category, "transaction_count": int(r.transaction_count), "total_spend": float(r.total_spend), "average_spend": float(r.average_spend)} for r in habit_identifier_rows]
+            average_by_day = {day: 0 for day in range(1, 32)}
+        spending_velocity = [
+            {
+                "day": day,
+                "current": current_by_day.get(day) if day <= today.day else None,
+                "previous": previous_by_day.get(day),
+                "average": average_by_day.get(day),
+            }
+            for day in range(1, 32)
+        ]
+        monthly_totals = {}
+        for row in debit_rows:
+            monthly_totals[row.month] = monthly_totals.get(row.month, 0) + row.total
+        monthly_breakdown = [{"month": month, "spend": float(monthly_totals[month])} for month in sorted(monthly_totals)]
+
+    habit_totals, category_totals = {}, {}
+    for row in debit_rows:
+        if row.category is not None:
+            count, total = habit_totals.get(row.category, (0, 0))
+            habit_totals[row.category] = (count + row.transaction_count, total + row.total)
+            category_totals[(row.category, row.icon_name)] = category_totals.get((row.category, row.icon_name), 0) + row.total
+    habit_identifier_data = [{"category": category, "transaction_count": int(count), "total_spend": float(total), "average_spend": float(total / count)} for category, (count, total) in sorted(habit_totals.items())]
     
-    category_distribution_rows = base_query.join(Category).with_entities(Category.name.label("category"), func.coalesce(func.sum(Transaction.amount), 0).label("total"), Category.icon_name.label("icon_name")).group_by(Category.name, Category.icon_name).all()
-    total_overall = sum(float(row.total) for row in category_distribution_rows) or 1
-    category_distribution = [{"category": row.category, "total": float(row.total), "percentage": round((float(row.total) / total_overall) * 100, 2), "icon_name": row.icon_name} for row in category_distribution_rows]
+    total_overall = sum(float(total) for total in category_totals.values()) or 1
+    category_distribution = [{"category": category, "total": float(total), "percentage": round((float(total) / total_overall) * 100, 2), "icon_name": icon_name} for (category, icon_name), total in sorted(category_totals.items(), key=lambda item: (item[0][0], item[0][1] or ""))]
+
+    cash_flow, cash_flow_summary, income_by_category = get_cash_flow(period_rows)
 
-    heatmap_query = base_query.with_entities(func.date(Transaction.txn_date).label('date'), func.sum(Transaction.amount).label('spend')).group_by(func.date(Transaction.txn_date)).all()
+    heatmap_query = daily_spending.with_entities(DailySpending.day.label('date'), spent.label('spend')).filter(DailySpending.day >= start_date, DailySpending.day < end_date).order_by(DailySpending.day).all()
     transaction_heatmap = [{"date": res.date.isoformat(), "spend": float(res.spend)} for res in heatmap_query]
 
     final_payload = {
@@ -147,6 +250,9 @@ def get_analytics_data(db: Session, time_period: str, include_capital_transfers:
         "habitIdentifier": habit_identifier_data,
         "categoryDistribution": category_distribution,
         "transactionHeatmap": transaction_heatmap,
-        "monthlyBreakdown": monthly_breakdown
+        "monthlyBreakdown": monthly_breakdown,
+        "cashFlow": cash_flow,
+        "cashFlowSummary": cash_flow_summary,
+        "incomeByCategory": income_by_category
     }
     return clean_nan_values(final_payload)
\ No newline at end of file
@@ -0,0 +1,233 @@
+# File: app/services/balance_service.py
+import argparse
+import sys
+from collections import defaultdict
+from datetime import date, timedelta
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.core.money import from_paise, to_paise
+from app.models.account import Account
+from app.models.account_balance import AccountBalance
+from app.services.dedup_service import normalize_balance
+
+# --- ACCOUNT BALANCES ---
+# account_balances holds one row per (account, day with transactions): the day's net
+# change and the closing balance. Every write path passes the change it makes as deltas
+# {(account_id, day): paise}; apply_balance_deltas adds them to the affected day and to
+# every later snapshot of the account, so no request replays an account's history.
+# rebuild_account_balances recomputes the table from the transactions (repair, migration).
+NET_WORTH_DEFAULT_DAYS = 90
+NET_WORTH_MAX_DAYS = 3660
+
+
+def signed_paise(txn_type: str, amount) -> int:
+    return to_paise(amount) if txn_type == 'credit' else -to_paise(amount)
+
+
+def balance_deltas(rows) -> dict:
+    """{(account_id, day): paise} of (account_id, txn_date, type, amount) rows."""
+    deltas = defaultdict(int)
+    for account_id, txn_date, txn_type, amount in rows:
+        deltas[(account_id, txn_date.date())] += signed_paise(txn_type, amount)
+    return deltas
+
+
+def stored_balance_deltas(db: Session, user_id: int, txn_ids: list) -> dict:
+    """balance_deltas of saved transactions, summed per account and day by the database."""
+    if not txn_ids:
+        return {}
+    rows = db.execute(text("""
+        SELECT account_id, txn_date::date, SUM(CASE WHEN type = 'credit' THEN amount ELSE -amount END)
+        FROM transactions WHERE user_id = :user_id AND id = ANY(:ids)
+        GROUP BY 1, 2
+    """), {"user_id": user_id, "ids": list(txn_ids)}).all()
+    return {(account_id, day): int(total) for account_id, day, total in rows}
+
+
+def balance_change(added: dict, removed: dict) -> dict:
+    """The deltas of replacing the `removed` rows with the `added` ones."""
+    change = defaultdict(int, added)
+    for key, paise in removed.items():
+        change[key] -= paise
+    return change
+
+
+def apply_balance_deltas(db: Session, user_id: int, deltas: dict) -> None:
+    """
+    Adds {(account_id, day): paise} to the snapshots: missing days are created with the
+    closing balance of the day before them, then every snapshot on or after a changed day
+    gets the sum of the changes up to it. Two statements whatever the number of days.
+    Does not commit.
+    """
+    deltas = {key: paise for key, paise in deltas.items() if paise}
+    if not deltas:
+        return
+    params = {
+        "user_id": user_id,
+        "account_ids": [account_id for account_id, _ in deltas],
+        "days": [day for _, day in deltas],
+        "deltas": list(deltas.values()),
+    }
+    db.execute(text("""
+        INSERT INTO account_balances (account_id, user_id, balance_date, net_change, balance)
+        SELECT d.account_id, :user_id, d.day, 0, COALESCE((
+            SELECT b.balance FROM account_balances b
+            WHERE b.account_id = d.account_id AND b.balance_date < d.day
+            ORDER BY b.balance_date DESC LIMIT 1
+        ), a.opening_balance, 0)
+        FROM unnest(CAST(:account_ids AS INTEGER[]), CAST(:days AS DATE[])) AS d(account_id, day)
+        JOIN accounts a ON a.id = d.account_id
+        ON CONFLICT (account_id, balance_date) DO NOTHING
+    """), params)
+    db.execute(text("""
+        UPDATE account_balances b
+        SET net_change = b.net_change + c.day_change, balance = b.balance + c.cumulative_change
+        FROM (
+            SELECT s.account_id, s.balance_date,
+                   COALESCE(SUM(d.delta) FILTER (WHERE d.day = s.balance_date), 0) AS day_change,
+                   SUM(d.delta) AS cumulative_change
+            FROM unnest(CAST(:account_ids AS INTEGER[]), CAST(:days AS DATE[]), CAST(:deltas AS BIGINT[])) AS d(account_id, day, delta)
+            JOIN account_balances s ON s.account_id = d.account_id AND s.balance_date >= d.day
+            GROUP BY s.account_id, s.balance_date
+        ) c
+        WHERE b.account_id = c.account_id AND b.balance_date = c.balance_date
+    """), params)
+
+
+def shift_account_balances(db: Session, account_id: int, old_opening, new_opening) -> None:
+    """Moves every snapshot of the account by the change of its opening balance. Does not commit."""
+    shift = to_paise(new_opening or 0) - to_paise(old_opening or 0)
+    if shift:
+        db.execute(text("UPDATE account_balances SET balance = balance + :shift WHERE account_id = :account_id"),
+                   {"shift": shift, "account_id": account_id})
+
+
+def seed_opening_balances(db: Session, user_id: int, transactions: list) -> list:
+    """
+    Derives the opening balance of accounts that have none from the running balance
+    ('balance') of parsed statement rows: the statement's closing balance on its last day,
+    minus every change up to that day. Call after the upload's deltas are applied.
+    Returns the ids of the accounts seeded. Does not commit.
+    """
+    statements = defaultdict(list)
+    for txn in transactions:
+        balance = normalize_balance(txn.get('balance'))
+        if balance:
+            statements[txn['account_id']].append((txn['txn_date'].date(), int(balance)))
+    if not statements:
+        return []
+    accounts = db.query(Account).filter(
+        Account.user_id == user_id, Account.id.in_(statements), Account.opening_balance.is_(None)
+    ).all()
+
+    seeded = []
+    for account in accounts:
+        rows = statements[account.id]
+        if rows[0][0] > rows[-1][0]:
+            rows.reverse()  # newest-first export
+        last_day = max(day for day, _ in rows)
+        closing = [balance for day, balance in rows if day == last_day][-1]
+        changes = db.query(AccountBalance.balance).filter(
+            AccountBalance.account_id == account.id, AccountBalance.balance_date <= last_day
+        ).order_by(AccountBalance.balance_date.desc()).limit(1).scalar()
+        # Snapshots were built on an opening balance of 0, so they hold the changes alone
+        opening = from_paise(closing) - (changes or 0)
+        shift_account_balances(db, account.id, None, opening)
+        account.opening_balance = opening
+        seeded.append(account.id)
+    return seeded
+
+
+def rebuild_account_balances(db, user_id: int | None = None, account_ids: list | None = None) -> int:
+    """
+    Recomputes the snapshots from the transactions with one window-function INSERT, for
+    one user (and optionally some of their accounts) or everyone. Takes a Session or a
+    Connection. Returns the number of snapshots written. Does not commit.
+    """
+    conditions, params = [], {}
+    if user_id is not None:
+        conditions.append("user_id = :user_id")
+        params["user_id"] = user_id
+    if account_ids is not None:
+        conditions.append("account_id = ANY(:account_ids)")
+        params["account_ids"] = list(account_ids)
+    where = " AND ".join(conditions) or "TRUE"
+    db.execute(text(f"DELETE FROM account_balances WHERE {where}"), params)
+    return db.execute(text(f"""
+        INSERT INTO account_balances (account_id, user_id, balance_date, net_change, balance)
+        SELECT d.account_id, a.user_id, d.day, d.net_change,
+               COALESCE(a.opening_balance, 0) + SUM(d.net_change) OVER (PARTITION BY d.account_id ORDER BY d.day)
+        FROM (
+            SELECT account_id, txn_date::date AS day, SUM(CASE WHEN type = 'credit' THEN amount ELSE -amount END) AS net_change
+            FROM transactions WHERE {where}
+            GROUP BY 1, 2
+        ) d
+        JOIN accounts a ON a.id = d.account_id
+    """), params).rowcount
+
+
+def get_net_worth(db: Session, user_id: int, start_date: date, end_date: date) -> dict:
+    """
+    Daily balance of every account and their sum over [start_date, end_date]: one index
+    lookup per account for the balance carried into the range, plus the snapshots inside it.
+    """
+    carried = select(AccountBalance.balance).where(
+        AccountBalance.account_id == Account.id, AccountBalance.balance_date < start_date
+    ).order_by(AccountBalance.balance_date.desc()).limit(1).correlate(Account).scalar_subquery()
+    accounts = db.query(Account.id, Account.name, Account.opening_balance, carried.label("carried")).filter(
+        Account.user_id == user_id
+    ).order_by(Account.id).all()
+    snapshots = defaultdict(dict)
+    for account_id, balance_date, balance in db.query(
+        AccountBalance.account_id, AccountBalance.balance_date, AccountBalance.balance
+    ).filter(
+        AccountBalance.user_id == user_id,
+        AccountBalance.balance_date >= start_date,
+        AccountBalance.balance_date <= end_date,
+    ):
+        snapshots[account_id][balance_date] = balance
+
+    days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    series = []
+    for account in accounts:
+        balance = account.carried if account.carried is not None else (account.opening_balance or from_paise(0))
+        balances = []
+        for day in days:
+            balance = snapshots[account.id].get(day, balance)
+            balances.append(balance)
+        series.append({"account_id": account.id, "name": account.name, "balances": balances})
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "series": [
+            {"date": day, "net_worth": sum((account["balances"][i] for account in series), from_paise(0))}
+            for i, day in enumerate(days)
+        ],
+        "accounts": series,
+    }
+
+
+def main(argv=None):
+    from app.db.session import SessionLocal
+    import app.models  # noqa: F401
+    from app.models.user import User
+
+    parser = argparse.ArgumentParser(description="Rebuild the daily account balance snapshots from the transactions.")
+    parser.add_argument("--user-id", type=int, default=None, help="Only this user (default: every user).")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        user_ids = [args.user_id] if args.user_id else [user_id for (user_id,) in db.query(User.id).order_by(User.id)]
+        for user_id in user_ids:
+            written = rebuild_account_balances(db, user_id)
+            db.commit()
+            print(f"✅ User {user_id}: {written} balance snapshots.", file=sys.stderr)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
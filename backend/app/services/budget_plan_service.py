@@ -8,10 +8,10 @@ from app.models.tag import Tag
 from app.models.transaction_tag import TransactionTag
 from app.models.alert import Alert
 from app.crud import goal_crud, alert_crud
+from app.core.money import Money
 from app.schemas.budget_plan_schema import BudgetPlanUpdate
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
-import pandas as pd
 import math
 from decimal import Decimal
 
@@ -20,7 +20,7 @@ BUDGET_THRESHOLDS = [Decimal("100.0"), Decimal("90.0"), Decimal("75.0")]
 def clean_nan_values(data):
     if isinstance(data, dict): return {k: clean_nan_values(v) for k, v in data.items()}
     if isinstance(data, list): return [clean_nan_values(i) for i in data]
-    if pd.isna(data) or (isinstance(data, float) and math.isnan(data)): return None
+    if data is None or (isinstance(data, float) and math.isnan(data)): return None
     return data
 
 def update_budget_plan(db: Session, plan_data: BudgetPlanUpdate, user_id: int):
@@ -32,8 +32,14 @@ def update_budget_plan(db: Session, plan_data: BudgetPlanUpdate, user_id: int):
 def delete_budget_plan(db: Session, month: str, user_id: int):
     return goal_crud.delete_goals_by_month(db, month, user_id)
 
-def get_budget_plan(db: Session, month: str, user_id: int):
+def get_budget_plan(db: Session, month: str, user_id: int, read_db: Session | None = None):
+    """
+    `db` must be a primary session (the active-plan path writes alerts). The read-only
+    smart empty state runs on `read_db` when given, e.g. a read-replica session.
+    """
+    read_db = read_db or db
     month_start = datetime.strptime(month, "%Y-%m").date()
+    next_month_start = month_start + relativedelta(months=1)
     today = date.today()
     
     exclude_tag = db.query(Tag).filter(Tag.name == "Exclude from Analytics", Tag.user_id == user_id).first()
@@ -44,15 +50,17 @@ def get_budget_plan(db: Session, month: str, user_id: int):
     existing_goals = db.query(Goal).filter(Goal.month == month, Goal.user_id == user_id).all()
 
     if existing_goals:
-        spent_subq = db.query(
-            Transaction.category_id.label("category_id"),
-            func.coalesce(func.sum(Transaction.amount), 0).label("spent")
+        # One grouped SUM over the BIGINT paise column; values come back as exact Decimal rupees.
+        spent_map = dict(db.query(
+            Transaction.category_id,
+            func.sum(Transaction.amount)
         ).filter(
             Transaction.user_id == user_id,
             Transaction.type == "debit", 
-            func.to_char(Transaction.txn_date, "YYYY-MM") == month,
+            Transaction.txn_date >= month_start,
+            Transaction.txn_date < next_month_start,
             Transaction.id.notin_(transactions_to_exclude)
-        ).group_by(Transaction.category_id).subquery()
+        ).group_by(Transaction.category_id).all())
         
         goal_map = {goal.category_id: goal for goal in existing_goals}
         all_categories = db.query(Category).filter(Category.is_income == False, Category.user_id == user_id).all()
@@ -64,16 +72,14 @@ def get_budget_plan(db: Session, month: str, user_id: int):
         for cat in all_categories:
             goal = goal_map.get(cat.id)
             # If a goal exists, use its budget. Otherwise, the budget is 0.
-            budget = Decimal(goal.limit_amount) if goal else Decimal(0)
-            
-            spent_row = db.query(spent_subq.c.spent).filter(spent_subq.c.category_id == cat.id).first()
-            spent = Decimal(spent_row[0]) if spent_row else Decimal(0)
+            budget = goal.limit_amount if goal else Decimal(0)
+            spent = spent_map.get(cat.id) or Decimal(0)
             remaining = budget - spent
             
             # Perform calculations, which will work correctly even if the budget is 0.
-            daily_burn_rate = (spent / Decimal(day_of_month)) if day_of_month > 0 else Decimal(0)
-            days_left = (remaining / daily_burn_rate) if daily_burn_rate > 0 and remaining > 0 else Decimal(0)
-            if daily_burn_rate == 0 and remaining > 0: days_left = Decimal(999)
+            daily_burn_rate = spent / day_of_month
+            days_left = (remaining / daily_burn_rate) if daily_burn_rate > 0 and remaining > 0 else 0
+            if daily_burn_rate == 0 and remaining > 0: days_left = 999
             
             # Append EVERY category to the response plan.
             response_plan.append({
@@ -106,20 +112,19 @@ def get_budget_plan(db: Session, month: str, user_id: int):
         pacing_query = text("""
             WITH daily_sums AS (
                 SELECT date(txn_date) as day, SUM(amount) as daily_total FROM transactions
-                WHERE user_id = :user_id AND type = 'debit' AND to_char(txn_date, 'YYYY-MM') = :month AND id NOT IN :excluded_ids GROUP BY 1
+                WHERE user_id = :user_id AND type = 'debit' AND txn_date >= :month_start AND txn_date < :next_month_start AND id NOT IN :excluded_ids GROUP BY 1
             ), all_days AS (
                 SELECT generate_series(date_trunc('month', CAST(:month_start AS date)), 
                 date_trunc('month', CAST(:month_start AS date)) + interval '1 month - 1 day', '1 day'::interval)::date AS day
             )
             SELECT d.day, COALESCE(SUM(ds.daily_total) OVER (ORDER BY d.day), 0) as cumulative_spend
             FROM all_days d LEFT JOIN daily_sums ds ON d.day = ds.day
-        """)
+        """).columns(cumulative_spend=Money)
         pacing_result = db.execute(pacing_query, {
-            "user_id": user_id, "month": month, "month_start": month_start, 
+            "user_id": user_id, "month_start": month_start, "next_month_start": next_month_start, 
             "excluded_ids": tuple(transactions_to_exclude) if transactions_to_exclude else (0,)
         }).fetchall()
-        df = pd.DataFrame(pacing_result, columns=['day', 'cumulative_spend']).ffill()
-        pacing_data = [{"day": row.day.day, "actualSpend": float(row.cumulative_spend)} for index, row in df.iterrows()]
+        pacing_data = [{"day": row.day.day, "actualSpend": float(row.cumulative_spend)} for row in pacing_result]
         
         # Sort the final list by the amount spent
         final_payload = {"plan": sorted(response_plan, key=lambda x: x['spent'], reverse=True), "historicalData": None, "pacingData": pacing_data}
@@ -129,7 +134,7 @@ def get_budget_plan(db: Session, month: str, user_id: int):
         avg_period_end = month_start
         avg_period_start = avg_period_end - relativedelta(months=3)
         
-        historical_base_query = db.query(Transaction).filter(
+        historical_base_query = read_db.query(Transaction).filter(
             Transaction.user_id == user_id,
             Transaction.type == "debit",
             Transaction.txn_date >= avg_period_start,
@@ -141,18 +146,19 @@ def get_budget_plan(db: Session, month: str, user_id: int):
         historical_spend = [{"month": row.month, "totalSpend": float(row.total_spend)} for row in historical_spend_rows]
         average_total_spend = sum(h['totalSpend'] for h in historical_spend) / 3 if historical_spend else 0
         
-        avg_spend_rows = historical_base_query.with_entities(Transaction.category_id, (func.sum(Transaction.amount) / 3).label("average_spend")).group_by(Transaction.category_id).all()
-        suggested_budgets_map = {row[0]: float(row[1]) for row in avg_spend_rows}
+        avg_spend_rows = historical_base_query.with_entities(Transaction.category_id, func.sum(Transaction.amount).label("total_spend")).group_by(Transaction.category_id).all()
+        suggested_budgets_map = {row[0]: float(row[1]) / 3 for row in avg_spend_rows}
         
-        current_month_spend_rows = db.query(Transaction.category_id, func.sum(Transaction.amount).label("current_spend")).filter(
+        current_month_spend_rows = read_db.query(Transaction.category_id, func.sum(Transaction.amount).label("current_spend")).filter(
             Transaction.user_id == user_id,
             Transaction.type == "debit", 
-            func.to_char(Transaction.txn_date, "YYYY-MM") == month, 
+            Transaction.txn_date >= month_start,
+            Transaction.txn_date < next_month_start,
             Transaction.id.notin_(transactions_to_exclude)
         ).group_by(Transaction.category_id).all()
         current_spend_map = {row[0]: float(row[1]) for row in current_month_spend_rows}
         
-        all_categories = db.query(Category).filter(Category.is_income == False, Category.user_id == user_id).all()
+        all_categories = read_db.query(Category).filter(Category.is_income == False, Category.user_id == user_id).all()
         suggested_budgets = []
         for cat in all_categories:
             suggested_budgets.append({
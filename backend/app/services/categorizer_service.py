@@ -0,0 +1,202 @@
+# File: app/services/categorizer_service.py
+import math
+import os
+import re
+import threading
+from collections import Counter
+
+from sqlalchemy.orm import Session
+
+from app.core.ttl_cache import TTLCache
+from app.models.category import Category
+from app.models.transaction import Transaction
+
+# --- LEARNED CATEGORIZATION ---
+# A per-user multinomial naive Bayes model over narration tokens, trained on the user's
+# categorized history (corrections included). The upload pipeline asks it only for rows
+# no keyword rule or merchant categorized; a prediction is used when it is confident,
+# otherwise the row stays in "Miscellaneous". "Miscellaneous" itself is never learned:
+# it is the "don't know" label, not a category anyone picks for a narration.
+CATEGORIZER_CACHE_TTL_SECONDS = float(os.getenv("CATEGORIZER_CACHE_TTL_SECONDS", "900"))
+CATEGORIZER_CACHE_MAX_SIZE = int(os.getenv("CATEGORIZER_CACHE_MAX_SIZE", "256"))
+TRAINING_ROWS = 20000       # most recent categorized transactions a model is trained on
+MIN_TRAINING_ROWS = 20      # below this a model never predicts
+MIN_CONFIDENCE = 0.8        # posterior probability a prediction needs to be used
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STRIP_DIGITS = str.maketrans("", "", "0123456789")
+
+
+def narration_words(description: str) -> list:
+    """
+    Lower-cased words of a narration without the ones carrying 3+ digits (UPI refs, card
+    numbers, IFSC codes): those never repeat between transactions.
+    """
+    return [
+        word for word in _WORD.findall(description.lower())
+        if len(word) >= 2 and len(word) - len(word.translate(_STRIP_DIGITS)) < 3
+    ]
+
+
+def tokenize(description: str) -> list:
+    """
+    narration_words plus the character 4-grams of longer words, so that "zomato",
+    "zomatoltd" and "zomato.payu" share features.
+    """
+    tokens = []
+    for word in narration_words(description):
+        tokens.append(word)
+        if len(word) > 5:
+            tokens.extend(f"#{word[i:i + 4]}" for i in range(len(word) - 3))
+    return tokens
+
+
+class NaiveBayesCategorizer:
+    """
+    Token counts per category, updated incrementally. Prediction compiles them into a
+    (vocabulary x categories) log-likelihood matrix, rebuilt only after the counts
+    change, and scores a whole batch of narrations with one gather-and-sum.
+    """
+
+    def __init__(self, excluded_category_ids=()):
+        self.excluded = set(excluded_category_ids)
+        self.documents = Counter()        # category_id -> training rows
+        self.token_counts = {}            # category_id -> Counter of tokens
+        self._compiled = None
+        self._lock = threading.Lock()
+
+    def _update(self, description: str, category_id, sign: int) -> None:
+        if category_id is None or category_id in self.excluded:
+            return
+        counts = self.token_counts.setdefault(category_id, Counter())
+        tokens = Counter(tokenize(description))
+        if sign > 0:
+            self.documents[category_id] += 1
+            counts.update(tokens)
+        else:
+            # Clamped at zero: the row may not have been part of the training set.
+            self.documents[category_id] = max(self.documents[category_id] - 1, 0)
+            for token, n in tokens.items():
+                counts[token] = max(counts[token] - n, 0)
+        self._compiled = None
+
+    def learn(self, description: str, category_id) -> None:
+        with self._lock:
+            self._update(description, category_id, 1)
+
+    def correct(self, description: str, old_category_id, new_category_id) -> None:
+        """Moves one row from the category it was filed under to the one the user chose."""
+        with self._lock:
+            self._update(description, old_category_id, -1)
+            self._update(description, new_category_id, 1)
+
+    @property
+    def trained_rows(self) -> int:
+        return sum(self.documents.values())
+
+    def _compile(self):
+        import numpy as np  # on first use, not at module load (see parse_generic_statement)
+
+        classes = [c for c in sorted(self.documents) if self.documents[c] > 0]
+        vocabulary = sorted({token for c in classes for token, n in self.token_counts[c].items() if n > 0})
+        index = {token: i for i, token in enumerate(vocabulary)}
+        # Laplace-smoothed log P(token | category); the extra last row (all zeros) stands
+        # for tokens never seen in training, which don't move the scores.
+        log_likelihood = np.zeros((len(vocabulary) + 1, len(classes)))
+        for j, category_id in enumerate(classes):
+            counts = self.token_counts[category_id]
+            column = np.fromiter((counts.get(token, 0) for token in vocabulary), dtype=float, count=len(vocabulary))
+            log_likelihood[:-1, j] = np.log(column + 1.0) - math.log(column.sum() + len(vocabulary))
+        total = sum(self.documents[c] for c in classes)
+        log_prior = np.log(np.array([self.documents[c] / total for c in classes]))
+        return classes, index, log_likelihood, log_prior
+
+    def predict(self, descriptions: list, allowed_category_ids=None) -> list:
+        """
+        (category_id, probability) for each narration, or None where the model has too
+        little data or knows none of the narration's tokens. Only categories in
+        `allowed_category_ids` (if given) are predicted.
+        """
+        with self._lock:
+            if self.trained_rows < MIN_TRAINING_ROWS:
+                return [None] * len(descriptions)
+            if self._compiled is None:
+                self._compiled = self._compile()
+            classes, index, log_likelihood, log_prior = self._compiled
+        if not classes or not descriptions:
+            return [None] * len(descriptions)
+
+        import numpy as np
+
+        # Every narration gets the unknown-token row first, so no segment is empty.
+        unknown = len(index)
+        token_ids, starts, known = [], [], []
+        for description in descriptions:
+            starts.append(len(token_ids))
+            token_ids.append(unknown)
+            ids = [index.get(token, unknown) for token in tokenize(description)]
+            token_ids.extend(ids)
+            # Without a single known token the score is the prior alone, not evidence
+            known.append(any(i != unknown for i in ids))
+        scores = np.add.reduceat(log_likelihood[np.asarray(token_ids)], np.asarray(starts), axis=0) + log_prior
+        if allowed_category_ids is not None:
+            scores[:, [c not in allowed_category_ids for c in classes]] = -np.inf
+        best = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(descriptions)), best]
+        # Posterior of the winner: 1 / sum(exp(score - best score))
+        with np.errstate(invalid="ignore"):
+            probabilities = 1.0 / np.exp(scores - best_scores[:, None]).sum(axis=1)
+        return [
+            (classes[j], float(p)) if has_known and np.isfinite(s) else None
+            for j, p, s, has_known in zip(best.tolist(), probabilities.tolist(), best_scores.tolist(), known)
+        ]
+
+
+def train_categorizer(db: Session, user_id: int) -> NaiveBayesCategorizer:
+    """
+    A model trained on the user's TRAINING_ROWS most recent categorized transactions,
+    leaving out the ones whose category the model itself predicted.
+    """
+    misc_ids = {row[0] for row in db.query(Category.id).filter(Category.user_id == user_id, Category.name == 'Miscellaneous')}
+    model = NaiveBayesCategorizer(excluded_category_ids=misc_ids)
+    rows = db.query(Transaction.description, Transaction.category_id).filter(
+        Transaction.user_id == user_id, Transaction.category_id.isnot(None), Transaction.category_predicted.is_(False)
+    ).order_by(Transaction.txn_date.desc()).limit(TRAINING_ROWS).all()
+    for description, category_id in rows:
+        model.learn(description, category_id)
+    return model
+
+
+class CategorizerCache(TTLCache):
+    """
+    This worker's trained models, keyed by user id (TTL + LRU, thread-safe). Edits made
+    on this worker update the cached model directly; the TTL bounds how long edits made
+    on other workers take to show up.
+    """
+
+    def get(self, db: Session, user_id: int) -> NaiveBayesCategorizer:
+        model = self._lookup(user_id)
+        if model is None:
+            # Trained outside the lock; two concurrent misses for one user both train.
+            model = train_categorizer(db, user_id)
+            self._store(user_id, model)
+        return model
+
+    def record_categorized(self, user_id: int, rows: list) -> None:
+        """
+        Feeds newly saved (description, category_id) rows to the user's cached model, if
+        any. Only rule, merchant or user categories: never the model's own predictions.
+        """
+        model = self._peek(user_id)
+        if model is not None:
+            for description, category_id in rows:
+                model.learn(description, category_id)
+
+    def record_correction(self, user_id: int, description: str, old_category_id, new_category_id) -> None:
+        """Feeds one category edit to the user's cached model, if there is one."""
+        model = self._peek(user_id)
+        if model is not None:
+            model.correct(description, old_category_id, new_category_id)
+
+
+categorizer_cache = CategorizerCache(CATEGORIZER_CACHE_TTL_SECONDS, CATEGORIZER_CACHE_MAX_SIZE)
@@ -0,0 +1,132 @@
+# File: app/services/comparison_service.py
+import re
+from datetime import date, datetime, timedelta
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.core.analytics_cache import analytics_cache
+from app.core.money import from_paise
+from app.models.category import Category
+from app.models.transaction import Transaction
+from app.services.analytics_service import excluded_from_analytics
+
+# --- PERIOD COMPARISON ---
+# Compares any periods side by side ("2026-10" vs "2025-10", "2026-Q1" vs "2026-Q2"). The
+# first period is the baseline every other one is compared to. All periods are summed in
+# one scan: a FILTER clause per period and type, with the periods' date ranges ORed in
+# the WHERE clause so only their monthly partitions are read.
+MAX_COMPARISON_PERIODS = 6
+PERIOD_FORMATS = "YYYY-MM, YYYY-Qn, YYYY or YYYY-MM-DD..YYYY-MM-DD"
+
+_QUARTER = re.compile(r"^(\d{4})-Q([1-4])$")
+
+
+def parse_period(spec: str) -> tuple:
+    """(start date, end date exclusive) of a period spec, see PERIOD_FORMATS. Raises ValueError."""
+    spec = spec.strip()
+    try:
+        if ".." in spec:
+            first, last = (datetime.strptime(part.strip(), "%Y-%m-%d").date() for part in spec.split("..", 1))
+            if last < first:
+                raise ValueError
+            return first, last + timedelta(days=1)
+        quarter = _QUARTER.match(spec.upper())
+        if quarter:
+            start = date(int(quarter.group(1)), 3 * int(quarter.group(2)) - 2, 1)
+            return start, start + relativedelta(months=3)
+        if re.fullmatch(r"\d{4}", spec):
+            start = date(int(spec), 1, 1)
+            return start, start + relativedelta(years=1)
+        start = datetime.strptime(spec, "%Y-%m").date()
+        return start, start + relativedelta(months=1)
+    except ValueError:
+        raise ValueError(f"Invalid period '{spec}'. Use {PERIOD_FORMATS}.") from None
+
+
+def percent_change(current: float, baseline: float) -> float:
+    """Same convention as the dashboard's change from last month."""
+    if baseline > 0:
+        return round((current - baseline) / baseline * 100, 2)
+    return 100.0 if current > 0 else 0.0
+
+
+def _compare(db: Session, user_id: int, periods: list, include_capital_transfers: bool) -> dict:
+    bounds = [parse_period(spec) for spec in periods]
+    in_period = [and_(Transaction.txn_date >= start, Transaction.txn_date < end) for start, end in bounds]
+    columns = []
+    for i, condition in enumerate(in_period):
+        columns += [
+            func.coalesce(func.sum(Transaction.amount).filter(condition, Transaction.type == 'debit'), 0).label(f"spend_{i}"),
+            func.coalesce(func.sum(Transaction.amount).filter(condition, Transaction.type == 'credit'), 0).label(f"credits_{i}"),
+            func.count(Transaction.id).filter(condition).label(f"count_{i}"),
+        ]
+    query = db.query(Category.name, Category.icon_name, Category.is_income, *columns).select_from(Transaction).outerjoin(
+        Category, Transaction.category_id == Category.id
+    ).filter(Transaction.user_id == user_id, or_(*in_period))
+    if not include_capital_transfers:
+        query = query.filter(~excluded_from_analytics(user_id))
+    rows = query.group_by(Category.id, Category.name, Category.icon_name, Category.is_income).all()
+
+    zero = from_paise(0)
+    summaries = [{"spend": zero, "income": zero, "credits": zero, "transaction_count": 0} for _ in periods]
+    categories = {}
+    for row in rows:
+        for i, summary in enumerate(summaries):
+            spend, credits = getattr(row, f"spend_{i}"), getattr(row, f"credits_{i}")
+            summary["spend"] += spend
+            summary["credits"] += credits
+            summary["transaction_count"] += getattr(row, f"count_{i}")
+            if row.is_income:
+                summary["income"] += credits
+        if any(getattr(row, f"spend_{i}") for i in range(len(periods))):
+            # Category names aren't unique, so rows are merged by (name, icon) like the breakdowns
+            key = (row.name or "Uncategorized", row.icon_name)
+            totals = categories.setdefault(key, [zero] * len(periods))
+            categories[key] = [total + getattr(row, f"spend_{i}") for i, total in enumerate(totals)]
+
+    def changes(values: list) -> dict:
+        baseline = values[0]
+        return {
+            "change": [round(value - baseline, 2) for value in values],
+            "percent_change": [percent_change(value, baseline) for value in values],
+        }
+
+    category_rows = [
+        {"category": name, "icon_name": icon_name, "spend": [float(total) for total in totals], **changes([float(total) for total in totals])}
+        for (name, icon_name), totals in categories.items()
+    ]
+    category_rows.sort(key=lambda category: (-max(category["spend"]), category["category"]))
+    spend = [float(summary["spend"]) for summary in summaries]
+    return {
+        "periods": [
+            {
+                "period": spec,
+                "start_date": start,
+                "end_date": end - timedelta(days=1),
+                "spend": float(summary["spend"]),
+                "income": float(summary["income"]),
+                "netCashFlow": float(summary["credits"] - summary["spend"]),
+                "transaction_count": summary["transaction_count"],
+            }
+            for spec, (start, end), summary in zip(periods, bounds, summaries)
+        ],
+        "spend": changes(spend),
+        "categories": category_rows,
+    }
+
+
+def get_period_comparison(db: Session, user_id: int, periods: list, include_capital_transfers: bool = False) -> dict:
+    """
+    Spend, income and per-category spend of each period, with every period's change
+    from the first one. Raises ValueError for a bad period or period count.
+    """
+    if not 2 <= len(periods) <= MAX_COMPARISON_PERIODS:
+        raise ValueError(f"Compare between 2 and {MAX_COMPARISON_PERIODS} periods.")
+    for spec in periods:
+        parse_period(spec)
+    key = ("compare", date.today(), tuple(periods), include_capital_transfers)
+    return analytics_cache.get_or_compute(
+        db, user_id, key, lambda: _compare(db, user_id, periods, include_capital_transfers)
+    )
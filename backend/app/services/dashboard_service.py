@@ -4,12 +4,11 @@ from sqlalchemy import func, text
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
 import calendar
-import pandas as pd
 
+from app.core.money import Money
 from app.models.transaction import Transaction
 from app.models.category import Category
-from app.models.tag import Tag
-from app.models.transaction_tag import TransactionTag
+from app.services.analytics_service import excluded_from_analytics
 
 #! CHANGE: Function now requires user_id
 def get_dashboard_data(db: Session, month: str, user_id: int):
@@ -25,10 +24,9 @@ def get_dashboard_data(db: Session, month: str, user_id: int):
     day_number_for_avg = days_in_month if month_start.replace(day=1) != today.replace(day=1) else today.day
 
     # --- CORE EXCLUSION LOGIC (scoped to user) ---
-    exclude_tag = db.query(Tag).filter(Tag.name == "Exclude from Analytics", Tag.user_id == user_id).first()
-    transactions_to_exclude = []
-    if exclude_tag:
-        transactions_to_exclude = [t.transaction_id for t in db.query(TransactionTag.transaction_id).filter(TransactionTag.tag_id == exclude_tag.id).all()]
+    # Probed per row rather than bound as an id list, which can run to hundreds of
+    # thousands of ids re-sent and re-planned in every statement below
+    not_excluded = ~excluded_from_analytics(user_id)
 
     # --- BASE QUERY (scoped to user) ---
     base_query_this_month = db.query(Transaction).filter(
@@ -36,21 +34,29 @@ def get_dashboard_data(db: Session, month: str, user_id: int):
         Transaction.type == "debit",
         Transaction.txn_date >= month_start,
         Transaction.txn_date < next_month_start,
-        Transaction.id.notin_(transactions_to_exclude)
+        not_excluded
     )
 
     # --- CORE METRICS ---
-    total_spent = float(base_query_this_month.with_entities(func.coalesce(func.sum(Transaction.amount), 0)).scalar() or 0)
-    
+    # Spend, cash flow and last month's spend in one pass over both months; income is
+    # credits in is_income categories
     prev_month_start = month_start - relativedelta(months=1)
-    base_query_prev_month = db.query(Transaction).filter(
-        Transaction.user_id == user_id, #! ADDED
-        Transaction.type == "debit",
+    this_month = Transaction.txn_date >= month_start
+    month_totals = db.query(
+        func.coalesce(func.sum(Transaction.amount).filter(this_month, Transaction.type == "debit"), 0).label("spent"),
+        func.coalesce(func.sum(Transaction.amount).filter(this_month, Transaction.type == "credit", Category.is_income.is_(True)), 0).label("income"),
+        func.coalesce(func.sum(Transaction.amount).filter(this_month, Transaction.type == "credit"), 0).label("credits"),
+        func.coalesce(func.sum(Transaction.amount).filter(~this_month, Transaction.type == "debit"), 0).label("prev_spent"),
+    ).outerjoin(Category, Transaction.category_id == Category.id).filter(
+        Transaction.user_id == user_id,
         Transaction.txn_date >= prev_month_start,
-        Transaction.txn_date < month_start,
-        Transaction.id.notin_(transactions_to_exclude)
-    )
-    prev_total_spent = float(base_query_prev_month.with_entities(func.coalesce(func.sum(Transaction.amount), 0)).scalar() or 0)
+        Transaction.txn_date < next_month_start,
+        not_excluded
+    ).one()
+    total_spent = float(month_totals.spent)
+    total_income = float(month_totals.income)
+    net_cash_flow = float(month_totals.credits) - total_spent
+    prev_total_spent = float(month_totals.prev_spent)
 
     percent_change = ((total_spent - prev_total_spent) / prev_total_spent) * 100 if prev_total_spent > 0 else (100.0 if total_spent > 0 else 0.0)
     daily_average_spend = total_spent / day_number_for_avg if day_number_for_avg > 0 else 0
@@ -68,8 +74,12 @@ def get_dashboard_data(db: Session, month: str, user_id: int):
         WITH daily_sums AS (
             SELECT date_trunc('day', txn_date)::date AS day, SUM(amount) AS daily_total
             FROM transactions
-            WHERE user_id = :user_id AND type = 'debit' AND to_char(txn_date, 'YYYY-MM') = :month
-            AND id NOT IN :excluded_ids
+            WHERE user_id = :user_id AND type = 'debit' AND txn_date >= :month_start AND txn_date < :next_month_start
+            AND NOT EXISTS (
+                SELECT 1 FROM transaction_tags tt JOIN tags tg ON tg.id = tt.tag_id
+                WHERE tt.transaction_id = transactions.id AND tt.user_id = :user_id
+                AND tg.user_id = :user_id AND tg.name = 'Exclude from Analytics'
+            )
             GROUP BY 1
         )
         SELECT
@@ -81,26 +91,24 @@ def get_dashboard_data(db: Session, month: str, user_id: int):
             '1 day'::interval
         ) d(day)
         LEFT JOIN daily_sums ds ON d.day = ds.day;
-    """)
+    """).columns(cumulative_total=Money)
     
     cumulative_spend_rows = db.execute(
         cumulative_spend_query, 
         {
             "user_id": user_id, #! PASS user_id to query
             "month_start": month_start.strftime("%Y-%m-%d"), 
-            "today": today.strftime("%Y-%m-%d"), 
-            "month": month,
-            "excluded_ids": tuple(transactions_to_exclude) if transactions_to_exclude else (0,)
+            "next_month_start": next_month_start.strftime("%Y-%m-%d"), 
+            "today": today.strftime("%Y-%m-%d"),
         }
     ).fetchall()
     
-    df = pd.DataFrame(cumulative_spend_rows, columns=['day', 'cumulative_total']).ffill()
-    spending_trend_data = [{"day": row.day.day, "cumulative_spend": float(row.cumulative_total)} for index, row in df.iterrows()]
+    spending_trend_data = [{"day": row.day.day, "cumulative_spend": float(row.cumulative_total)} for row in cumulative_spend_rows]
 
     # --- RECENT TRANSACTIONS (scoped to user) ---
     recent_txns_query = db.query(Transaction).filter(
         Transaction.user_id == user_id, #! ADDED
-        Transaction.id.notin_(transactions_to_exclude)
+        not_excluded
     ).order_by(Transaction.txn_date.desc()).limit(5).all()
     
     recent_transactions = [{"id": txn.id, "description": txn.description, "amount": float(txn.amount), "txn_date": txn.txn_date.isoformat(), "category_id": txn.category_id} for txn in recent_txns_query]
@@ -110,6 +118,9 @@ def get_dashboard_data(db: Session, month: str, user_id: int):
         "percentChangeFromLastMonth": round(percent_change, 2),
         "dailyAverageSpend": round(daily_average_spend, 2),
         "projectedMonthlySpend": round(projected_monthly_spend, 2),
+        "totalIncome": round(total_income, 2),
+        "netCashFlow": round(net_cash_flow, 2),
+        "savingsRate": round((total_income - total_spent) / total_income * 100, 2) if total_income > 0 else None,
         "topSpendingCategories": top_spending_categories,
         "spendingTrend": spending_trend_data,
         "recentTransactions": recent_transactions,
@@ -0,0 +1,196 @@
+# File: app/services/dedup_service.py
+import hashlib
+from collections import Counter
+from datetime import datetime, time, timedelta
+from itertools import groupby
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.money import to_paise, to_rupees
+from app.models.transaction import Transaction
+
+# --- CONTENT FINGERPRINTS ---
+# A statement row is identified by what it says, not where it sits in the export: the
+# same payment exported in a March statement and in a Q1 statement gets the same
+# fingerprint. Identical rows (two equal coffees on a day without a running balance)
+# are told apart by an occurrence counter, 1 for the first copy, 2 for the second, ...
+FINGERPRINT_LENGTH = 64
+
+# Raw-record keys holding the running balance, per bank export (see upload_router).
+BALANCE_COLUMNS = ("Closing Balance", "Balance (INR )")
+
+
+def normalize_description(description: str) -> str:
+    return " ".join(str(description).lower().split())
+
+
+def normalize_balance(value) -> str:
+    """Paise as text, or '' when the export has no usable balance for the row."""
+    if value is None:
+        return ""
+    text_value = str(value).replace(",", "").strip()
+    if text_value.lower() in ("", "nan", "none", "-"):
+        return ""
+    try:
+        return str(to_paise(text_value))
+    except ArithmeticError:
+        return ""
+
+
+def fingerprint_base(account_id: int, txn_date: datetime, amount, txn_type: str, description: str, balance=None) -> str:
+    return "|".join((
+        str(account_id), txn_date.strftime("%Y-%m-%dT%H:%M:%S"), str(to_paise(amount)), txn_type,
+        normalize_description(description), normalize_balance(balance),
+    ))
+
+
+def fingerprint_with_occurrence(base: str, occurrence: int) -> str:
+    return hashlib.sha256(f"{base}|{occurrence}".encode("utf-8")).hexdigest()
+
+
+class FingerprintCounter:
+    """Numbers identical rows in the order they are seen and hashes them."""
+
+    def __init__(self):
+        self._seen = Counter()
+
+    def fingerprint(self, account_id, txn_date, amount, txn_type, description, balance=None) -> str:
+        base = fingerprint_base(account_id, txn_date, amount, txn_type, description, balance)
+        self._seen[base] += 1
+        return fingerprint_with_occurrence(base, self._seen[base])
+
+
+def add_fingerprints(transactions: list) -> list:
+    """
+    Sets 'fingerprint' on parsed statement rows of ONE file, in file order. Returns the
+    same list.
+    """
+    counter = FingerprintCounter()
+    for txn in transactions:
+        txn['fingerprint'] = counter.fingerprint(
+            txn['account_id'], txn['txn_date'], txn['amount'], txn['type'], txn['description'], txn.get('balance')
+        )
+    return transactions
+
+
+# --- CROSS-SOURCE RECONCILIATION ---
+# A UPI payment made from the Paytm app is exported twice: by Paytm, with its UPI ref and
+# exact time, and by the bank of the linked account, whose narration often lacks the ref
+# (parse_generic_statement only looks for one when the narration mentions UPI). Both rows
+# land on the same account, so a Paytm row and a bank row with the same account, type and
+# amount, dated at most RECONCILE_WINDOW_DAYS apart, are one payment unless their refs differ.
+BANK_STATEMENT_SOURCES = ("HDFC", "ICICI")  # `source` of bank statement rows (see upload_router)
+RECONCILE_WINDOW_DAYS = 1
+
+
+def _record(row: dict, stored: bool) -> dict:
+    return {
+        "key": (row["account_id"], row["type"], to_paise(row["amount"])),
+        "day": row["txn_date"].date(), "bank": row["source"] in BANK_STATEMENT_SOURCES,
+        "stored": stored, "row": row,
+    }
+
+
+def _refs_agree(a: dict, b: dict) -> bool:
+    ref_a, ref_b = a["row"].get("upi_ref"), b["row"].get("upi_ref")
+    return not ref_a or not ref_b or str(ref_a) == str(ref_b)
+
+
+def match_cross_source(incoming: list, stored: list) -> list:
+    """
+    Pairs Paytm rows with their bank statement twins, as [(paytm record, bank record)].
+
+    `incoming` are parsed statement rows, `stored` are dicts of rows already saved (same
+    keys, plus 'id'). A sort-merge: records sorted by (account, type, amount, day), then
+    each Paytm row takes the free bank row of its run closest in days, within the window. Every
+    pair has at least one incoming row; no row is in two pairs.
+    """
+    records = sorted(
+        [_record(row, False) for row in incoming] + [_record(row, True) for row in stored],
+        key=lambda r: (r["key"], r["day"], r["row"]["txn_date"]),
+    )
+    window = timedelta(days=RECONCILE_WINDOW_DAYS)
+    pairs = []
+    for _, run in groupby(records, key=lambda r: r["key"]):
+        run = list(run)
+        banks = [r for r in run if r["bank"]]
+        if not banks or len(banks) == len(run):
+            continue
+        start, used = 0, set()
+        for paytm in (r for r in run if not r["bank"]):
+            while start < len(banks) and banks[start]["day"] < paytm["day"] - window:
+                start += 1
+            best = None
+            for j in range(start, len(banks)):
+                bank = banks[j]
+                if bank["day"] > paytm["day"] + window:
+                    break
+                if j in used or (paytm["stored"] and bank["stored"]) or not _refs_agree(paytm, bank):
+                    continue
+                # Bank rows are dated by day only: the same day wins, then the earlier row
+                distance = abs((bank["day"] - paytm["day"]).days)
+                if best is None or distance < best[0]:
+                    best = (distance, j)
+            if best is not None:
+                used.add(best[1])
+                pairs.append((paytm, banks[best[1]]))
+    return pairs
+
+
+def _match_side(record: dict) -> dict:
+    row = record["row"]
+    return {
+        "transaction_id": row.get("id"), "source": row["source"],
+        "txn_date": row["txn_date"], "description": row["description"],
+    }
+
+
+def reconcile_cross_source(db: Session, user_id: int, rows: list) -> tuple:
+    """
+    Drops the rows of an upload that are the other source's copy of a payment.
+
+    Candidates are read with one query over (user_id, amount, txn_date). A match against
+    a saved row keeps the saved row; a match inside the upload keeps the bank row. The
+    kept row inherits the dropped row's UPI ref when it has none, saved rows through one
+    bulk UPDATE, so re-uploading either file is then caught by the ref check.
+    Returns (rows to insert, match reports). Does not commit.
+    """
+    if not rows:
+        return rows, []
+    window = timedelta(days=RECONCILE_WINDOW_DAYS)
+    dates = [row["txn_date"] for row in rows]
+    stored = [dict(row._mapping) for row in db.query(
+        Transaction.id, Transaction.account_id, Transaction.txn_date, Transaction.amount,
+        Transaction.type, Transaction.source, Transaction.upi_ref, Transaction.description,
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.amount.in_({to_rupees(row["amount"]) for row in rows}),
+        Transaction.txn_date >= datetime.combine(min(dates).date() - window, time.min),
+        Transaction.txn_date < datetime.combine(max(dates).date() + window + timedelta(days=1), time.min),
+        Transaction.account_id.in_({row["account_id"] for row in rows}),
+        Transaction.fingerprint.isnot(None),  # imported rows only, never manual entries
+    ).order_by(Transaction.amount, Transaction.txn_date).all()]
+
+    dropped, links, matches = set(), {}, []
+    for paytm, bank in match_cross_source(rows, stored):
+        kept, other = (paytm, bank) if paytm["stored"] else (bank, paytm)
+        dropped.add(id(other["row"]))
+        ref = other["row"].get("upi_ref")
+        if ref and not kept["row"].get("upi_ref"):
+            kept["row"]["upi_ref"] = str(ref)
+            if kept["stored"]:
+                links[kept["row"]["id"]] = str(ref)
+        matches.append({
+            "account_id": kept["row"]["account_id"], "type": kept["row"]["type"],
+            "amount": to_rupees(kept["row"]["amount"]),
+            "kept": _match_side(kept), "suppressed": _match_side(other),
+        })
+
+    if links:
+        db.execute(text("""
+            UPDATE transactions t SET upi_ref = v.upi_ref
+            FROM unnest(CAST(:ids AS INTEGER[]), CAST(:refs AS VARCHAR[])) AS v(id, upi_ref)
+            WHERE t.id = v.id AND t.upi_ref IS NULL
+        """), {"ids": list(links), "refs": list(links.values())})
+    return [row for row in rows if id(row) not in dropped], matches
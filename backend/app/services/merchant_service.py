@@ -0,0 +1,101 @@
+# File: app/services/merchant_service.py
+import re
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.merchant import Merchant
+
+# --- DESCRIPTION NORMALIZATION ---
+# Narrations only name a merchant in a few shapes:
+#   HDFC UPI:  UPI-ZOMATO LTD-zomato.payu@axisbank-UTIB0000001-412345678901-PAYMENT
+#   ICICI UPI: UPI/412345678901/Payment/swiggy.rzp@axisbank/AXIS BANK
+#   Card:      POS 416021XXXXXX1234 DMART AVENUE SUPERMAR POS DEBIT
+# A UPI payee is only treated as a merchant when the VPA is a merchant/QR handle issued
+# by a payment aggregator; person-to-person payments must not turn into merchants.
+_VPA = re.compile(r"[\w.\-]+@[a-z]+", re.IGNORECASE)
+MERCHANT_VPA_PATTERN = re.compile(
+    r"(\.payu|\.rzp|razorpay|paytmqr|paytm-|bharatpe|@fbpe|gpay-|@okbiz|eazypay|pinelabs|ezetap|"
+    r"cashfree|billdesk|merchant|^q\d+@ybl|^mab\.)",
+    re.IGNORECASE,
+)
+_POS_PREFIX = re.compile(r"^POS\s+[\dX*]{6,}\s+", re.IGNORECASE)
+_POS_SUFFIX = re.compile(r"\s+POS\s+DEBIT\s*$", re.IGNORECASE)
+# QR handles that name the aggregator, not the shop (paytmqr281005@paytm, q12345@ybl).
+_AGGREGATOR_HANDLES = {"paytmqr", "paytm", "bharatpe", "gpay", "eazypay", "mab", "q"}
+
+
+def _display_name(raw: str) -> str | None:
+    name = " ".join(raw.replace("_", " ").split()).strip(" -/.")
+    if len(name) < 3 or not any(ch.isalpha() for ch in name):
+        return None
+    return name.title()
+
+
+def normalize_merchant_name(description: str) -> str | None:
+    """
+    The merchant a narration refers to, as a display name ("Dmart Avenue Supermar"),
+    or None when it doesn't identify one (transfers, salary, person-to-person UPI).
+    """
+    narration = description.strip()
+    upper = narration.upper()
+
+    if upper.startswith("POS "):
+        return _display_name(_POS_SUFFIX.sub("", _POS_PREFIX.sub("", narration)))
+
+    if upper.startswith("UPI"):
+        vpa_match = _VPA.search(narration)
+        if not vpa_match or not MERCHANT_VPA_PATTERN.search(vpa_match.group(0)):
+            return None
+        parts = narration.split("-")
+        # HDFC puts the payee name right before the VPA; ICICI only has the VPA,
+        # whose first label names the shop for aggregator handles like swiggy.rzp@...
+        if narration.startswith("UPI-") and len(parts) > 2 and "@" in parts[2]:
+            return _display_name(parts[1])
+        label = re.split(r"[.\-_]", vpa_match.group(0).split("@")[0])[0].rstrip("0123456789")
+        if label.lower() in _AGGREGATOR_HANDLES:
+            return None
+        return _display_name(label)
+    return None
+
+
+# --- BULK RESOLUTION ---
+def resolve_merchants(db: Session, user_id: int, wanted: dict) -> dict:
+    """
+    Maps merchant names to `(id, category_id)` for one user, creating the missing ones.
+
+    `wanted` is {name: category_id for new merchants (or None)}. Names match existing
+    merchants case-insensitively; everything missing is created with ONE multi-row
+    INSERT, whatever the number of names. The result is keyed by lower-cased name.
+    Does not commit.
+    """
+    if not wanted:
+        return {}
+    by_lower = {}
+    for name, category_id in wanted.items():
+        by_lower.setdefault(name.lower(), (name, category_id))
+
+    def _existing(lower_names):
+        rows = db.query(Merchant.id, Merchant.name, Merchant.category_id).filter(
+            Merchant.user_id == user_id, func.lower(Merchant.name).in_(lower_names)
+        ).order_by(Merchant.id).all()
+        found = {}
+        for row in rows:
+            found.setdefault(row.name.lower(), (row.id, row.category_id))
+        return found
+
+    resolved = _existing(list(by_lower))
+    missing = [by_lower[lower] for lower in by_lower if lower not in resolved]
+    if missing:
+        inserted = db.execute(
+            pg_insert(Merchant)
+            .values([{"name": name, "category_id": category_id, "user_id": user_id} for name, category_id in missing])
+            .on_conflict_do_nothing(constraint="_user_id_merchant_name_uc")
+            .returning(Merchant.id, Merchant.name, Merchant.category_id)
+        ).all()
+        for row in inserted:
+            resolved[row.name.lower()] = (row.id, row.category_id)
+        # Names a concurrent upload created between our SELECT and INSERT.
+        raced = [name.lower() for name, _ in missing if name.lower() not in resolved]
+        if raced:
+            resolved.update(_existing(raced))
+    return resolved
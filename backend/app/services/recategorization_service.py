@@ -0,0 +1,174 @@
+# File: app/services/recategorization_service.py
+import argparse
+import sys
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Integer, cast, column, or_, text, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.models.transaction import Transaction
+from app.services.categorizer_service import categorizer_cache
+from app.services.upload_service import assign_merchants_and_categories
+
+# --- HISTORICAL RE-CATEGORIZATION ---
+# Merchant and category are assigned once, at import. After the rules, merchants or
+# categories change, this re-applies the current rules to the imported history:
+#   all            every imported transaction
+#   uncategorized  category_id IS NULL (e.g. after category_crud.delete_category)
+#   miscellaneous  uncategorized plus the "Miscellaneous" fallback
+# Manual entries are never touched. Where the rules have nothing better than the
+# Miscellaneous fallback or a learned guess (categorizer_service), a category the user
+# picked is kept.
+#
+# The API runs at most ROWS_PER_REQUEST rows per call (about a second) and returns a cursor,
+# the (txn_date, id) of the last row scanned, to resume from; the CLI runs to the end.
+RECATEGORIZE_SCOPES = ("all", "uncategorized", "miscellaneous")
+BATCH_SIZE = 5000
+ROWS_PER_REQUEST = 10000
+
+
+def _print_progress(user_id: int, scanned: int, total: int, updated: int) -> None:
+    print(f"ℹ️ Re-categorized {scanned}/{total} transactions for user {user_id} ({updated} changed).")
+
+
+def encode_cursor(key: tuple) -> str:
+    txn_date, txn_id = key
+    return f"{txn_date.isoformat()}_{txn_id}"
+
+
+def parse_cursor(cursor: str) -> tuple:
+    """(txn_date, id) of a cursor from encode_cursor. Raises ValueError."""
+    try:
+        txn_date, txn_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(txn_date), int(txn_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor '{cursor}'.") from None
+
+
+def _sql_int(value) -> str:
+    return "NULL" if value is None else str(int(value))
+
+
+def _apply(db: Session, user_id: int, changes: list) -> None:
+    """One UPDATE ... FROM (VALUES ...) for a batch of (id, txn_date, category_id, merchant_id, predicted)."""
+    # The rows hold only integers, booleans, NULLs and timestamps, so they are rendered inline:
+    # compiling thousands of bound parameters per batch costs more than the UPDATE itself.
+    rows = ", ".join(
+        f"({_sql_int(txn_id)}, TIMESTAMP '{txn_date.isoformat(sep=' ')}', {_sql_int(category_id)}, {_sql_int(merchant_id)}, "
+        f"{'TRUE' if predicted else 'FALSE'})"
+        for txn_id, txn_date, category_id, merchant_id, predicted in changes
+    )
+    batch = text(
+        f"SELECT * FROM (VALUES {rows}) AS v(id, txn_date, category_id, merchant_id, predicted)"
+    ).columns(
+        column("id", Integer), column("txn_date", DateTime), column("category_id", Integer), column("merchant_id", Integer),
+        column("predicted", Boolean),
+    ).subquery("v")
+    db.execute(
+        update(Transaction)
+        .where(Transaction.id == batch.c.id, Transaction.txn_date == batch.c.txn_date, Transaction.user_id == user_id)
+        # The batch's date range lets the planner skip the other monthly partitions
+        .where(Transaction.txn_date.between(changes[0][1], changes[-1][1]))
+        .values(
+            category_id=cast(batch.c.category_id, Integer), merchant_id=cast(batch.c.merchant_id, Integer),
+            category_predicted=batch.c.predicted,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recategorize_transactions(db: Session, user_id: int, scope: str = "all", batch_size: int = BATCH_SIZE,
+                              on_progress=_print_progress, cursor: str | None = None, max_rows: int | None = None) -> dict:
+    """
+    Re-applies the import rules to the user's imported transactions in `scope`, oldest
+    first, `batch_size` rows per UPDATE and commit. Starts after `cursor` and stops after
+    `max_rows` rows when given. `on_progress(user_id, scanned, total, updated)` is called
+    after every batch. Returns {"scope", "scanned", "updated", "remaining", "cursor"};
+    `cursor` is None once the scope is done. Raises ValueError for a bad scope or cursor.
+    """
+    if scope not in RECATEGORIZE_SCOPES:
+        raise ValueError(f"scope must be one of {', '.join(RECATEGORIZE_SCOPES)}")
+    last_key = parse_cursor(cursor) if cursor else None
+    categories_map = {c.name: c.id for c in db.query(Category).filter(Category.user_id == user_id).all()}
+    misc_id = categories_map.get('Miscellaneous')
+
+    query = db.query(Transaction).filter(
+        Transaction.user_id == user_id,
+        or_(Transaction.unique_key.is_(None), Transaction.unique_key.notlike('MANUAL-%')),
+    )
+    if scope == "uncategorized" or (scope == "miscellaneous" and misc_id is None):
+        query = query.filter(Transaction.category_id.is_(None))
+    elif scope == "miscellaneous":
+        query = query.filter(or_(Transaction.category_id.is_(None), Transaction.category_id == misc_id))
+    if last_key is not None:
+        query = query.filter(tuple_(Transaction.txn_date, Transaction.id) > last_key)
+    total = query.count()
+
+    scanned = updated = 0
+    while max_rows is None or scanned < max_rows:
+        # Keyset pagination in (txn_date, id) order: rows leaving the scope as they are
+        # updated don't shift the pages, and every batch spans few monthly partitions.
+        page = query.with_entities(
+            Transaction.id, Transaction.txn_date, Transaction.description, Transaction.category_id,
+            Transaction.merchant_id, Transaction.category_predicted,
+        )
+        if last_key is not None:
+            page = page.filter(tuple_(Transaction.txn_date, Transaction.id) > last_key)
+        limit = batch_size if max_rows is None else min(batch_size, max_rows - scanned)
+        rows = page.order_by(Transaction.txn_date, Transaction.id).limit(limit).all()
+        if not rows:
+            break
+        last_key = (rows[-1].txn_date, rows[-1].id)
+
+        assignments = assign_merchants_and_categories(db, user_id, [row.description for row in rows], categories_map)
+        changes = []
+        for row, (merchant_id, category_id, learned) in zip(rows, assignments):
+            # Only rules override a category; the learned model just fills in unknowns
+            if category_id is None or ((category_id == misc_id or learned) and row.category_id not in (None, misc_id)):
+                category_id, learned = row.category_id, row.category_predicted
+            merchant_id = merchant_id or row.merchant_id
+            if (category_id, merchant_id, learned) != (row.category_id, row.merchant_id, row.category_predicted):
+                changes.append((row.id, row.txn_date, category_id, merchant_id, learned))
+        if changes:
+            _apply(db, user_id, changes)
+        db.commit()
+
+        scanned += len(rows)
+        updated += len(changes)
+        if on_progress:
+            on_progress(user_id, scanned, total, updated)
+    if updated:
+        categorizer_cache.invalidate(user_id)  # retrained from the new history on next use
+    remaining = max(total - scanned, 0)
+    return {
+        "scope": scope,
+        "scanned": scanned,
+        "updated": updated,
+        "remaining": remaining,
+        "cursor": encode_cursor(last_key) if remaining and last_key is not None else None,
+    }
+
+
+def main(argv=None):
+    from app.db.session import SessionLocal
+    from app.models.user import User
+
+    parser = argparse.ArgumentParser(description="Re-apply the categorization rules to imported transactions.")
+    parser.add_argument("--user-id", type=int, default=None, help="Only this user (default: every user).")
+    parser.add_argument("--scope", choices=RECATEGORIZE_SCOPES, default="all")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        user_ids = [args.user_id] if args.user_id else [user_id for (user_id,) in db.query(User.id).order_by(User.id)]
+        for user_id in user_ids:
+            result = recategorize_transactions(db, user_id, args.scope, args.batch_size)
+            print(f"✅ User {user_id}: {result['updated']} of {result['scanned']} transactions changed.", file=sys.stderr)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
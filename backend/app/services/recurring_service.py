@@ -0,0 +1,216 @@
+# File: app/services/recurring_service.py
+import argparse
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import and_, func, or_, text
+from sqlalchemy.orm import Session
+
+from app.core.money import from_paise, to_paise
+from app.models.merchant import Merchant
+from app.models.recurring_payment import CADENCES, RecurringPayment
+from app.models.transaction import Transaction
+from app.services.categorizer_service import narration_words
+
+# --- RECURRING PAYMENT DETECTION ---
+# A user's debits are grouped into series: by merchant when the import found one,
+# otherwise by narration without its reference numbers. A series is recurring when it has
+# MIN_OCCURRENCES payments whose median interval fits a cadence in CADENCES, with at
+# least REGULAR_SHARE of the intervals within the cadence's tolerance of that median and
+# REGULAR_SHARE of the amounts within AMOUNT_TOLERANCE of their median. Two payments on
+# one day make a 0-day interval, so frequent irregular spend (food orders) never qualifies.
+MIN_OCCURRENCES = 3
+REGULAR_SHARE = 0.75
+AMOUNT_TOLERANCE = 0.10
+LOOKBACK_DAYS = 800  # enough history for three yearly payments
+# A series with more payments than this in LOOKBACK_DAYS can't qualify: half its intervals
+# would have to be at least the shortest cadence's minimum. Such series (food orders,
+# fuel) are dropped in the database instead of being read.
+MAX_SERIES_PAYMENTS = 2 * LOOKBACK_DAYS // min(low for low, _, _ in CADENCES.values()) + 1
+
+
+def series_key(merchant_id, description: str) -> str:
+    # The narration part is what narration_key() computes in SQL (app/models/transaction.py)
+    if merchant_id is not None:
+        return f"m:{merchant_id}"
+    return "d:" + " ".join(narration_words(description))
+
+
+def _detect(rows: list) -> list:
+    """
+    Recurring series among `rows` of (key, date, amount in paise, transaction row),
+    sorted by key and date. Intervals and amounts are compared as numpy arrays per series.
+    """
+    import numpy as np  # on first use, not at module load (see parse_generic_statement)
+
+    if not rows:
+        return []
+    days = np.fromiter((r[1].toordinal() for r in rows), dtype=np.int64, count=len(rows))
+    amounts = np.fromiter((r[2] for r in rows), dtype=np.int64, count=len(rows))
+    intervals = np.diff(days)  # across series boundaries too; those entries are never read
+    starts = [0] + [i for i in range(1, len(rows)) if rows[i][0] != rows[i - 1][0]] + [len(rows)]
+
+    detected = []
+    for start, end in zip(starts, starts[1:]):
+        if end - start < MIN_OCCURRENCES:
+            continue
+        gaps = intervals[start:end - 1]
+        median_gap = float(np.median(gaps))
+        cadence = next((name for name, (low, high, _) in CADENCES.items() if low <= median_gap <= high), None)
+        if cadence is None or np.mean(np.abs(gaps - median_gap) <= CADENCES[cadence][2]) < REGULAR_SHARE:
+            continue
+        paid = amounts[start:end]
+        typical = float(np.median(paid))
+        if np.mean(np.abs(paid - typical) <= AMOUNT_TOLERANCE * typical) < REGULAR_SHARE:
+            continue
+        last = rows[end - 1][3]
+        detected.append({
+            "series_key": rows[start][0],
+            "name": last.description,
+            "merchant_id": last.merchant_id,
+            "category_id": last.category_id,
+            "account_id": last.account_id,
+            "cadence": cadence,
+            "interval_days": median_gap,
+            "typical_amount": from_paise(round(typical)),
+            "occurrences": end - start,
+            "first_date": rows[start][1],
+            "last_date": rows[end - 1][1],
+            "next_expected_date": rows[end - 1][1] + timedelta(days=round(median_gap)),
+        })
+    return detected
+
+
+# Counts each requested series through its index, and only up to one past the cap, so a
+# long series (a daily food order) costs no more to rule out than a short one.
+_SHORT_SERIES_SQL = """
+    SELECT k.key FROM unnest(CAST(:keys AS {key_type}[])) AS k(key)
+    CROSS JOIN LATERAL (
+        SELECT count(*) AS payments FROM (
+            SELECT 1 FROM transactions t
+            WHERE t.user_id = :user_id AND {series_match} AND t.type = 'debit' AND t.txn_date >= :since
+            LIMIT :cap
+        ) capped
+    ) c
+    WHERE c.payments BETWEEN 1 AND :max_payments
+"""
+_SHORT_MERCHANT_SERIES = text(_SHORT_SERIES_SQL.format(
+    key_type="INTEGER", series_match="t.merchant_id = k.key",
+))
+_SHORT_NARRATION_SERIES = text(_SHORT_SERIES_SQL.format(
+    key_type="TEXT", series_match="t.merchant_id IS NULL AND narration_key(t.description) = k.key",
+))
+
+
+def _short_series(db: Session, statement, user_id: int, since: date, keys: set) -> list:
+    """The `keys` whose series have 1..MAX_SERIES_PAYMENTS debits since `since`."""
+    if not keys:
+        return []
+    return db.execute(statement, {
+        "keys": sorted(keys), "user_id": user_id, "since": since,
+        "cap": MAX_SERIES_PAYMENTS + 1, "max_payments": MAX_SERIES_PAYMENTS,
+    }).scalars().all()
+
+
+def refresh_recurring_payments(db: Session, user_id: int, series_keys: set | None = None) -> int:
+    """
+    Re-detects the given series (every series when None) from the user's debits of the
+    last LOOKBACK_DAYS and stores the result: new series are added, changed ones updated,
+    ones that stopped qualifying removed. Only the transactions of those series are read.
+    Returns the number of recurring series stored for them. Does not commit.
+    """
+    since = date.today() - timedelta(days=LOOKBACK_DAYS)
+    query = db.query(
+        Transaction.txn_date, Transaction.amount, Transaction.description,
+        Transaction.merchant_id, Transaction.category_id, Transaction.account_id,
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.type == 'debit',
+        Transaction.txn_date >= since,
+    )
+    # Series are counted in the database and the ones too long to qualify never read.
+    # Merchant-less series are matched on narration_key(); both kinds have a partial index.
+    narration_key = func.narration_key(Transaction.description)
+    if series_keys is not None:
+        merchant_ids = _short_series(
+            db, _SHORT_MERCHANT_SERIES, user_id, since, {int(key[2:]) for key in series_keys if key.startswith("m:")},
+        )
+        narration_keys = _short_series(
+            db, _SHORT_NARRATION_SERIES, user_id, since, {key[2:] for key in series_keys if key.startswith("d:")},
+        )
+    else:
+        merchant_ids = [
+            merchant_id for (merchant_id,) in
+            query.with_entities(Transaction.merchant_id).filter(Transaction.merchant_id.isnot(None))
+            .group_by(Transaction.merchant_id).having(func.count() <= MAX_SERIES_PAYMENTS)
+        ]
+        narration_keys = [
+            narration for (narration,) in
+            query.with_entities(narration_key).filter(Transaction.merchant_id.is_(None))
+            .group_by(narration_key).having(func.count() <= MAX_SERIES_PAYMENTS)
+        ]
+    query = query.filter(or_(
+        Transaction.merchant_id.in_(merchant_ids),
+        and_(Transaction.merchant_id.is_(None), narration_key.in_(narration_keys)),
+    ))
+
+    rows = []
+    for txn in query.all():
+        key = series_key(txn.merchant_id, txn.description)
+        if series_keys is None or key in series_keys:
+            rows.append((key, txn.txn_date.date(), to_paise(txn.amount), txn))
+    rows.sort(key=lambda r: (r[0], r[1]))
+    detected = {series["series_key"]: series for series in _detect(rows)}
+    # Merchant series are named after the merchant, the others after their latest narration
+    merchant_ids = {series["merchant_id"] for series in detected.values() if series["merchant_id"] is not None}
+    if merchant_ids:
+        names = dict(db.query(Merchant.id, Merchant.name).filter(Merchant.id.in_(merchant_ids)).all())
+        for series in detected.values():
+            series["name"] = names.get(series["merchant_id"], series["name"])
+
+    stored = db.query(RecurringPayment).filter(RecurringPayment.user_id == user_id)
+    if series_keys is not None:
+        stored = stored.filter(RecurringPayment.series_key.in_(series_keys))
+    stored = {payment.series_key: payment for payment in stored.all()}
+    for key, payment in stored.items():
+        if key not in detected:
+            db.delete(payment)
+    for key, series in detected.items():
+        payment = stored.get(key)
+        if payment is None:
+            db.add(RecurringPayment(user_id=user_id, **series))
+        else:
+            for field, value in series.items():
+                setattr(payment, field, value)
+    return len(detected)
+
+
+def get_recurring_payments(db: Session, user_id: int, include_inactive: bool = False) -> list:
+    payments = db.query(RecurringPayment).filter(
+        RecurringPayment.user_id == user_id
+    ).order_by(RecurringPayment.next_expected_date, RecurringPayment.name).all()
+    return [payment for payment in payments if include_inactive or payment.is_active]
+
+
+def main(argv=None):
+    from app.db.session import SessionLocal
+    import app.models  # noqa: F401
+    from app.models.user import User
+
+    parser = argparse.ArgumentParser(description="Re-detect recurring payments from the transaction history.")
+    parser.add_argument("--user-id", type=int, default=None, help="Only this user (default: every user).")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        user_ids = [args.user_id] if args.user_id else [user_id for (user_id,) in db.query(User.id).order_by(User.id)]
+        for user_id in user_ids:
+            found = refresh_recurring_payments(db, user_id)
+            db.commit()
+            print(f"✅ User {user_id}: {found} recurring payments.", file=sys.stderr)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
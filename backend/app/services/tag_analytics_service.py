@@ -0,0 +1,99 @@
+# File: app/services/tag_analytics_service.py
+from datetime import date
+
+from sqlalchemy import func, true
+from sqlalchemy.orm import Session
+
+from app.core.analytics_cache import analytics_cache
+from app.models.tag import Tag
+from app.models.transaction import Transaction
+from app.models.transaction_tag import TransactionTag
+from app.services.analytics_service import excluded_from_analytics, get_period_bounds, get_period_totals
+
+# --- SPEND BY TAG ---
+# Tags group transactions across categories ("Trip-Goa", "Wedding"). Both views start
+# from transaction_tags through its (user_id, tag_id) index, and are cached per user in
+# analytics_cache: they change only when the user writes.
+
+
+def _tag_summaries(db: Session, user_id: int, time_period: str, include_capital_transfers: bool) -> list:
+    start_date, end_date, _ = get_period_bounds(time_period, date.today())
+    rows = db.query(
+        Tag.id, Tag.name, Transaction.type,
+        func.count(Transaction.id).label('transaction_count'),
+        func.sum(Transaction.amount).label('total'),
+    ).select_from(TransactionTag).join(Tag, Tag.id == TransactionTag.tag_id).join(
+        Transaction, Transaction.id == TransactionTag.transaction_id
+    ).filter(
+        TransactionTag.user_id == user_id,
+        Transaction.user_id == user_id,
+        Transaction.txn_date >= start_date,
+        Transaction.txn_date < end_date,
+        true() if include_capital_transfers else ~excluded_from_analytics(user_id)
+    ).group_by(Tag.id, Tag.name, Transaction.type).all()
+
+    tags = {}
+    for row in rows:
+        tag = tags.setdefault(row.id, {"tag_id": row.id, "tag": row.name, "spend": 0, "credits": 0, "transaction_count": 0})
+        tag["spend" if row.type == 'debit' else "credits"] += row.total
+        tag["transaction_count"] += row.transaction_count
+    summaries = [{**tag, "spend": float(tag["spend"]), "credits": float(tag["credits"])} for tag in tags.values()]
+    return sorted(summaries, key=lambda tag: (-tag["spend"], tag["tag"]))
+
+
+def get_tag_summaries(db: Session, user_id: int, time_period: str = "all", include_capital_transfers: bool = False) -> list:
+    """Spend, credits and transaction count of every tag used in the period, biggest spend first."""
+    key = ("tag-summaries", date.today(), time_period, include_capital_transfers)
+    return analytics_cache.get_or_compute(
+        db, user_id, key, lambda: _tag_summaries(db, user_id, time_period, include_capital_transfers)
+    )
+
+
+def _tag_analytics(db: Session, user_id: int, tag: Tag, time_period: str, include_capital_transfers: bool) -> dict:
+    start_date, end_date, _ = get_period_bounds(time_period, date.today())
+    excluded_ids = [] if include_capital_transfers else None
+    period_rows = get_period_totals(db, start_date, end_date, excluded_ids, user_id, tag_id=tag.id)
+
+    months, categories = {}, {}
+    for row in period_rows:
+        month = months.setdefault(row.month, {"month": row.month, "spend": 0, "credits": 0, "transaction_count": 0})
+        month["spend" if row.type == 'debit' else "credits"] += row.total
+        month["transaction_count"] += row.transaction_count
+        if row.type == 'debit':
+            key = (row.category or "Uncategorized", row.icon_name)
+            count, total = categories.get(key, (0, 0))
+            categories[key] = (count + row.transaction_count, total + row.total)
+
+    monthly = [
+        {**months[month], "spend": float(months[month]["spend"]), "credits": float(months[month]["credits"])}
+        for month in sorted(months)
+    ]
+    total_spend = sum(total for _, total in categories.values())
+    category_breakdown = [
+        {"category": category, "icon_name": icon_name, "spend": float(total), "transaction_count": int(count),
+         "percentage": round(float(total / total_spend) * 100, 2) if total_spend else 0.0}
+        for (category, icon_name), (count, total) in sorted(categories.items(), key=lambda item: (-item[1][1], item[0][0]))
+    ]
+    return {
+        "tag": {"id": tag.id, "name": tag.name},
+        "totals": {
+            "spend": float(sum(m["spend"] for m in months.values())),
+            "credits": float(sum(m["credits"] for m in months.values())),
+            "transaction_count": sum(m["transaction_count"] for m in monthly),
+            "first_month": monthly[0]["month"] if monthly else None,
+            "last_month": monthly[-1]["month"] if monthly else None,
+        },
+        "monthly": monthly,
+        "categoryBreakdown": category_breakdown,
+    }
+
+
+def get_tag_analytics(db: Session, user_id: int, tag_id: int, time_period: str = "all", include_capital_transfers: bool = False) -> dict | None:
+    """Totals, monthly series and category breakdown of one tag, or None if the user has no such tag."""
+    tag = db.query(Tag).filter(Tag.id == tag_id, Tag.user_id == user_id).first()
+    if tag is None:
+        return None
+    key = ("tag", tag_id, date.today(), time_period, include_capital_transfers)
+    return analytics_cache.get_or_compute(
+        db, user_id, key, lambda: _tag_analytics(db, user_id, tag, time_period, include_capital_transfers)
+    )
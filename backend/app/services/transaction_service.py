@@ -1,27 +1,58 @@
 # File: app/services/transaction_service.py
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from collections import defaultdict
 from app.models.transaction import Transaction
+from app.models.tag import Tag
+from app.models.transaction_tag import TransactionTag
 
-def get_filtered_transactions(db: Session, filters: dict, user_id: int):
-    page = filters.get("page", 1)
-    limit = filters.get("limit", 10)
+# Columns a transaction log row can carry. The source CSV row is not one of them: it
+# lives in transaction_raw_records and is served by GET /transactions/{id}/raw.
+TRANSACTION_LOG_FIELDS = (
+    "id", "txn_date", "description", "amount", "type", "source", "account_id",
+    "category_id", "merchant_id", "upi_ref", "unique_key",
+)
+TRANSACTION_LOG_SELECTABLE = TRANSACTION_LOG_FIELDS + ("tags",)
+
+def parse_log_fields(fields: str | None) -> list | None:
+    """
+    Parses a `fields=` projection like "txn_date,amount,tags". Returns None for
+    "everything", otherwise the requested names (id is always included).
+    Raises ValueError on unknown field names.
+    """
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in TRANSACTION_LOG_SELECTABLE]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(TRANSACTION_LOG_SELECTABLE)}")
+    return ["id"] + [f for f in dict.fromkeys(requested) if f != "id"]
+
+def get_tags_for_transactions(db: Session, txn_ids: list) -> dict:
+    """Loads the tags of a whole page of transactions in one query, keyed by transaction id."""
+    tags_by_txn = defaultdict(list)
+    if not txn_ids:
+        return tags_by_txn
+    rows = db.query(TransactionTag.transaction_id, Tag.id, Tag.name, Tag.user_id).join(
+        Tag, Tag.id == TransactionTag.tag_id
+    ).filter(TransactionTag.transaction_id.in_(txn_ids)).order_by(Tag.name).all()
+    for txn_id, tag_id, name, tag_user_id in rows:
+        tags_by_txn[txn_id].append({"id": tag_id, "name": name, "user_id": tag_user_id})
+    return tags_by_txn
+
+def apply_transaction_filters(query, filters: dict):
+    """
+    Applies the transaction log filters (dates, category, account, type, search term)
+    to a query over Transaction. Shared by the log view and the batch mutation API
+    so that "what you see is what you act on".
+    """
     start_date = filters.get("start_date")
     end_date = filters.get("end_date")
     category_id = filters.get("category_id")
     account_id = filters.get("account_id")
     search_term = filters.get("search_term")
     transaction_type = filters.get("type")
-    
-    sort_by = filters.get("sort_by", "txn_date")
-    order = filters.get("order", "desc")
 
-    # ✅ --- THIS IS THE FINAL FIX ---
-    # We must tell `joinedload` to use the REAL relationship (`tags_association`),
-    # not the virtual `association_proxy` (`tags`).
-    # This will eagerly load the data needed for the proxy to work during serialization.
-    query = db.query(Transaction).options(joinedload(Transaction.tags_association)).filter(Transaction.user_id == user_id)
-
-    # Apply all other filters
     if start_date:
         query = query.filter(Transaction.txn_date >= start_date)
     if end_date:
@@ -34,6 +65,24 @@ def get_filtered_transactions(db: Session, filters: dict, user_id: int):
         query = query.filter(Transaction.type == transaction_type)
     if search_term:
         query = query.filter(Transaction.description.ilike(f"%{search_term}%"))
+    return query
+
+def get_filtered_transactions(db: Session, filters: dict, user_id: int, fields: list | None = None):
+    page = filters.get("page", 1)
+    limit = filters.get("limit", 10)
+    
+    sort_by = filters.get("sort_by", "txn_date")
+    order = filters.get("order", "desc")
+
+    # Select plain columns instead of full ORM objects: no identity-map bookkeeping
+    # and no per-row lazy loads through the `tags` association proxy.
+    selected = fields or list(TRANSACTION_LOG_SELECTABLE)
+    columns = [getattr(Transaction, f) for f in selected if f != "tags"]
+    query = db.query(*columns).filter(Transaction.user_id == user_id)
+
+    # Apply all other filters
+    query = apply_transaction_filters(query, filters)
+    total_count = query.with_entities(func.count(Transaction.id)).scalar()
 
     # Sorting logic
     sort_field = getattr(Transaction, sort_by, None)
@@ -42,8 +91,12 @@ def get_filtered_transactions(db: Session, filters: dict, user_id: int):
     else:
         query = query.order_by(Transaction.txn_date.desc())
 
-    total_count = query.count()
-    transactions = query.offset((page - 1) * limit).limit(limit).all()
+    transactions = [row._asdict() for row in query.offset((page - 1) * limit).limit(limit).all()]
+
+    if "tags" in selected:
+        tags_by_txn = get_tags_for_transactions(db, [txn["id"] for txn in transactions])
+        for txn in transactions:
+            txn["tags"] = tags_by_txn.get(txn["id"], [])
 
     return {
         "total_count": total_count,
@@ -1,14 +1,20 @@
 # File: app/services/upload_service.py
-import pandas as pd
 import json
 import re
 from sqlalchemy.orm import Session
 from datetime import datetime
 from app.models.transaction import Transaction
+from app.models.transaction_raw_record import TransactionRawRecord
 from app.models.account import Account
 from app.models.category import Category
 from app.models.merchant import Merchant
 from app.models.tag import Tag
+from app.db.partitions import create_missing_partitions
+from app.services.dedup_service import add_fingerprints, reconcile_cross_source
+from app.services.merchant_service import normalize_merchant_name, resolve_merchants
+from app.services.categorizer_service import MIN_CONFIDENCE, categorizer_cache
+from app.services.recurring_service import refresh_recurring_payments, series_key
+from app.services.balance_service import apply_balance_deltas, balance_deltas, seed_opening_balances
 
 # --- DATA MAPPING RULES (No changes here, they are universal) ---
 TRANSFER_KEYWORDS = {
@@ -38,13 +44,41 @@ MERCHANT_CATEGORY_RULES = {
     'hairtel': ('Hairtel Salon', 'Personal Care'), 'bookmyshow': ('BookMyShow', 'Entertainment'),
     'nova gamin': ('Nova Gaming', 'Entertainment'), 'financewithsharan': ('FinanceWithSharan', 'Education'),
 }
+RULE_MERCHANT_CATEGORIES = {merchant_name: category_name for merchant_name, category_name in MERCHANT_CATEGORY_RULES.values()}
+
+# --- COMPILED RULE MATCHER ---
+# Every keyword with its outcome, flattened once into one tuple in priority order:
+# transfer keywords, then MERCHANT_CATEGORY_RULES in order. One pass of C-level substring
+# checks per narration; a single alternation regex was measured 2x slower in CPython.
+_TRANSFER_RULE = (None, 'Transfers')
+_COMPILED_RULES = tuple((keyword, _TRANSFER_RULE) for keyword in sorted(TRANSFER_KEYWORDS)) + tuple(MERCHANT_CATEGORY_RULES.items())
+
+
+def match_rule(desc_lower: str) -> tuple | None:
+    """(merchant name or None, category name) of the first rule a lower-cased narration matches."""
+    for keyword, rule in _COMPILED_RULES:
+        if keyword in desc_lower:
+            return rule
+    return None
 
 # --- PARSING FUNCTIONS (These do not need user_id as they just process files) ---
 # Note: No changes are needed in the individual parsing functions like `parse_generic_statement`
 # and `parse_paytm_statement`. They simply convert file rows into a dictionary format.
 # The user-scoping happens in `process_and_insert_transactions`.
 
-def parse_generic_statement(file, account_id, source, date_col, desc_col, debit_col, credit_col, ref_col=None, unique_id_col=None):
+def _reference(value) -> str | None:
+    """A usable reference number from a statement cell: blanks, NaN, '-' and all-zero fillers are not."""
+    if value is None or value != value:  # NaN
+        return None
+    ref = str(value).strip()
+    if ref.lower() in ('', 'nan', '-') or set(ref.replace('.', '')) <= {'0'}:
+        return None
+    return ref
+
+def parse_generic_statement(file, account_id, source, date_col, desc_col, debit_col, credit_col, ref_col=None, unique_id_col=None, balance_col=None):
+    # pandas is imported here, not at module load: importing it (and numpy) dominates the
+    # app's cold start, and statement parsing is the only code path that needs it.
+    import pandas as pd
     try:
         df = pd.read_csv(file.file)
         df.columns = [c.strip().replace('.', '') for c in df.columns]
@@ -52,7 +86,7 @@ def parse_generic_statement(file, account_id, source, date_col, desc_col, debit_
         print(f"Pandas could not read the CSV file for {source}. Error: {e}")
         return []
     transactions = []
-    for index, row in df.iterrows():
+    for _, row in df.iterrows():
         if pd.isna(row.get(date_col)): continue
         try:
             withdrawal_amt = pd.to_numeric(row.get(debit_col), errors='coerce')
@@ -74,23 +108,25 @@ def parse_generic_statement(file, account_id, source, date_col, desc_col, debit_
                 if match:
                     upi_ref = match.group(1)
 
-            if unique_id_col and pd.notna(row.get(unique_id_col)):
-                unique_key_part = str(row[unique_id_col])
-            else:
-                unique_key_part = str(row.get(ref_col, '')) if ref_col else f"{description[:10]}-{index}"
-
-            unique_key = f"{source}-{unique_key_part}-{txn_date.strftime('%Y%m%d')}-{amount:.2f}"
+            # A bank-issued id or reference makes the key; rows without one get no key and
+            # are deduplicated by their content fingerprint (add_fingerprints below).
+            unique_key_part = _reference(row.get(unique_id_col)) if unique_id_col else None
+            if unique_key_part is None and ref_col and _reference(row.get(ref_col)) is not None:
+                unique_key_part = str(row.get(ref_col))
+            unique_key = f"{source}-{unique_key_part}-{txn_date.strftime('%Y%m%d')}-{amount:.2f}" if unique_key_part else None
 
             transactions.append({
                 'txn_date': txn_date, 'description': description, 'amount': amount,
                 'type': txn_type, 'account_id': account_id, 'source': source,
-                'upi_ref': upi_ref, 'unique_key': unique_key, 'raw_data': row.to_json(date_format='iso')
+                'upi_ref': upi_ref, 'unique_key': unique_key, 'raw_data': row.to_json(date_format='iso'),
+                'balance': row.get(balance_col) if balance_col else None,
             })
         except Exception as e:
             print(f"Skipping row in {source} file due to error: {e}")
-    return transactions
+    return add_fingerprints(transactions)
 
 def parse_paytm_statement(file, account_map):
+    import pandas as pd
     try:
         df = pd.read_csv(file.file)
         df.columns = [c.strip() for c in df.columns]
@@ -123,57 +159,143 @@ def parse_paytm_statement(file, account_map):
             })
         except Exception as e:
             print(f"Skipping Paytm row due to error: {e}")
-    return transactions
+    return add_fingerprints(transactions)
+
+def detect_merchant_and_category(description: str, categories_map: dict) -> tuple:
+    """
+    (merchant name or None, category id) for one narration: transfer keywords first,
+    then MERCHANT_CATEGORY_RULES, then a merchant named by the narration itself.
+    """
+    rule = match_rule(description.lower())
+    if rule is _TRANSFER_RULE:
+        return None, categories_map.get('Transfers')
+    if rule is not None:
+        merchant_name, category_name = rule
+        return merchant_name, categories_map.get(category_name, categories_map.get('Miscellaneous'))
+    return normalize_merchant_name(description), categories_map.get('Miscellaneous')
+
+def assign_merchants_and_categories(db: Session, user_id: int, descriptions: list, categories_map: dict) -> list:
+    """
+    (merchant id, category id, learned) for each narration, by detect_merchant_and_category.
+    Every merchant is resolved at once; missing ones are created in a single INSERT, with
+    the rule's category (rule merchants) or none (narration-derived). Rows left in the
+    Miscellaneous fallback are then classified in one batch by the user's learned model
+    (`learned` is True where its prediction was used). Does not commit.
+    """
+    detected = [detect_merchant_and_category(description, categories_map) for description in descriptions]
+    wanted_merchants = {
+        merchant_name: categories_map.get(RULE_MERCHANT_CATEGORIES.get(merchant_name))
+        for merchant_name, _ in detected if merchant_name
+    }
+    merchants = resolve_merchants(db, user_id, wanted_merchants)
+
+    assignments = []
+    for merchant_name, category_id in detected:
+        merchant_id, merchant_category_id = merchants.get(merchant_name.lower(), (None, None)) if merchant_name else (None, None)
+        # A merchant the user has already categorized decides over the Miscellaneous fallback
+        if merchant_category_id and category_id == categories_map.get('Miscellaneous'):
+            category_id = merchant_category_id
+        assignments.append((merchant_id, category_id, False))
+
+    unmatched = [i for i, (_, category_id, _) in enumerate(assignments) if category_id == categories_map.get('Miscellaneous')]
+    if unmatched:
+        model = categorizer_cache.get(db, user_id)
+        predictions = model.predict([descriptions[i] for i in unmatched], allowed_category_ids=set(categories_map.values()))
+        for i, prediction in zip(unmatched, predictions):
+            if prediction is not None and prediction[1] >= MIN_CONFIDENCE:
+                assignments[i] = (assignments[i][0], prediction[0], True)
+    return assignments
+
+def _existing_values(db: Session, column, values: set, user_id: int) -> set:
+    """The subset of `values` already stored in `column` for the user."""
+    if not values:
+        return set()
+    return {res[0] for res in db.query(column).filter(Transaction.user_id == user_id, column.in_(values)).all()}
 
 #! CHANGE: Main processing function now requires user_id
-def process_and_insert_transactions(db: Session, transactions: list, user_id: int) -> int:
-    # Fetch existing data ONLY for the current user to prevent duplicates
-    existing_upi_refs = {res[0] for res in db.query(Transaction.upi_ref).filter(Transaction.user_id == user_id, Transaction.upi_ref.isnot(None)).all()}
-    existing_unique_keys = {res[0] for res in db.query(Transaction.unique_key).filter(Transaction.user_id == user_id, Transaction.unique_key.isnot(None)).all()}
+def process_and_insert_transactions(db: Session, transactions: list, user_id: int) -> tuple:
+    """
+    Inserts the new rows of an upload. Returns (inserted count, cross-source matches),
+    the matches being the Paytm/bank pairs reconcile_cross_source collapsed into one row.
+    """
+    # Partitions for the statement's months, committed on their own before this upload
+    # reads or writes anything
+    create_missing_partitions(db, {t['txn_date'] for t in transactions})
+
+    # Look up only the keys this upload carries, each through an index, instead of
+    # loading every key in the user's history
+    existing_upi_refs = _existing_values(db, Transaction.upi_ref, {str(t['upi_ref']) for t in transactions if t.get('upi_ref')}, user_id)
+    existing_unique_keys = _existing_values(db, Transaction.unique_key, {t['unique_key'] for t in transactions if t.get('unique_key')}, user_id)
+    existing_fingerprints = _existing_values(db, Transaction.fingerprint, {t['fingerprint'] for t in transactions if t.get('fingerprint')}, user_id)
     
-    # Fetch maps for merchants and categories that belong to the current user
-    merchants_map = {m.name: m.id for m in db.query(Merchant).filter(Merchant.user_id == user_id).all()}
+    # Fetch the map of categories that belong to the current user
     categories_map = {c.name: c.id for c in db.query(Category).filter(Category.user_id == user_id).all()}
     
-    inserted_count = 0
+    # Pass 1: drop duplicates
+    new_rows = []
     for txn_data in sorted(transactions, key=lambda x: x['txn_date']):
         # Check for duplicates within the user's transaction history
         if (txn_data.get('upi_ref') and str(txn_data['upi_ref']) in existing_upi_refs) or \
-           (txn_data.get('unique_key') and txn_data['unique_key'] in existing_unique_keys):
+           (txn_data.get('unique_key') and txn_data['unique_key'] in existing_unique_keys) or \
+           (txn_data.get('fingerprint') and txn_data['fingerprint'] in existing_fingerprints):
             continue
-            
-        detected_merchant_id, detected_category_id = None, categories_map.get('Miscellaneous')
-        desc_lower = txn_data['description'].lower()
-        if any(keyword in desc_lower for keyword in TRANSFER_KEYWORDS):
-            detected_category_id = categories_map.get('Transfers')
-        else:
-            for keyword, (merchant_name, category_name) in MERCHANT_CATEGORY_RULES.items():
-                if keyword in desc_lower:
-                    detected_merchant_id = merchants_map.get(merchant_name) # This can be extended to auto-create merchants
-                    detected_category_id = categories_map.get(category_name)
-                    if detected_merchant_id or detected_category_id:
-                        break
+        new_rows.append(txn_data)
 
+        # Add the new keys to the set to avoid duplicate insertions within the same batch
+        if txn_data.get('upi_ref'):
+            existing_upi_refs.add(txn_data['upi_ref'])
+        if txn_data.get('unique_key'):
+            existing_unique_keys.add(txn_data['unique_key'])
+        if txn_data.get('fingerprint'):
+            existing_fingerprints.add(txn_data['fingerprint'])
+
+    # A Paytm row and its bank statement twin are one payment: only one of them is kept
+    new_rows, matches = reconcile_cross_source(db, user_id, new_rows)
+
+    # Pass 2: merchant and category for every new row, merchants resolved all at once
+    assignments = assign_merchants_and_categories(db, user_id, [txn_data['description'] for txn_data in new_rows], categories_map)
+
+    inserted_count = 0
+    categorized = []
+    debit_series = set()
+    for txn_data, (merchant_id, category_id, learned) in zip(new_rows, assignments):
         # Create the transaction and assign it to the current user
         txn = Transaction(
-            **txn_data, # Unpack the parsed data
+            **{k: v for k, v in txn_data.items() if k not in ('raw_data', 'balance')}, # Unpack the parsed data
             user_id=user_id,
-            category_id=detected_category_id, 
-            merchant_id=detected_merchant_id,
-            raw_data=json.loads(txn_data.get('raw_data', '{}'))
+            category_id=category_id, 
+            category_predicted=learned,
+            merchant_id=merchant_id,
+            # The source row goes to transaction_raw_records, inserted in the same flush
+            raw_record=TransactionRawRecord(data=json.loads(txn_data.get('raw_data') or '{}'))
         )
         db.add(txn)
+        if not learned:
+            categorized.append((txn_data['description'], category_id))
+        if txn_data['type'] == 'debit':
+            debit_series.add(series_key(merchant_id, txn_data['description']))
         inserted_count += 1
-        
-        # Add the new keys to the set to avoid duplicate insertions within the same batch
-        if txn_data.get('upi_ref'):
-            existing_upi_refs.add(txn_data['upi_ref'])
-        if txn_data.get('unique_key'):
-            existing_unique_keys.add(txn_data['unique_key'])
 
     if inserted_count > 0:
+        # The new rows move their accounts' daily balances, in the same commit
+        apply_balance_deltas(db, user_id, balance_deltas(
+            (t['account_id'], t['txn_date'], t['type'], t['amount']) for t in new_rows
+        ))
+        seed_opening_balances(db, user_id, transactions)
         db.commit()
+        categorizer_cache.record_categorized(user_id, categorized)
         print(f"✅ Committed {inserted_count} new transactions to the database for user {user_id}.")
+        # Only the series the new debits belong to are re-detected
+        if debit_series:
+            found = refresh_recurring_payments(db, user_id, debit_series)
+            db.commit()
+            print(f"ℹ️ Re-detected {len(debit_series)} payment series for user {user_id} ({found} recurring).")
     else:
+        # A statement imported before can still seed an opening balance; UPI refs may
+        # have been linked onto already saved rows
+        if seed_opening_balances(db, user_id, transactions) or matches:
+            db.commit()
         print(f"ℹ️ No new transactions found to insert for user {user_id}.")
-    return inserted_count
\ No newline at end of file
+    if matches:
+        print(f"ℹ️ Skipped {len(matches)} rows already imported from another source for user {user_id}.")
+    return inserted_count, matches
\ No newline at end of file
@@ -0,0 +1,62 @@
+# File: benchmarks/compare.py
+"""
+Compares two run_benchmarks.py result files and flags regressions.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.15
+
+Exits with status 1 if any benchmark's median got slower by more than the threshold
+or issues more SQL statements than before.
+"""
+import argparse
+import json
+import sys
+
+
+def _key(result: dict) -> tuple:
+    return result["scale"], result["benchmark"], json.dumps(result["params"], sort_keys=True)
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> tuple[list, bool]:
+    before = {_key(r): r for r in baseline["results"]}
+    rows, regressed = [], False
+    for result in candidate["results"]:
+        old = before.get(_key(result))
+        if old is None:
+            rows.append((result, None, None, "new"))
+            continue
+        change = (result["median_ms"] - old["median_ms"]) / old["median_ms"] if old["median_ms"] else 0.0
+        status = "ok"
+        if change > threshold or result["statements"] > old["statements"]:
+            status, regressed = "REGRESSION", True
+        elif change < -threshold:
+            status = "faster"
+        rows.append((result, old, change, status))
+    return rows, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative slowdown of the median.")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    rows, regressed = compare(baseline, candidate, args.threshold)
+
+    print(f"baseline {baseline['meta'].get('git_revision')} -> candidate {candidate['meta'].get('git_revision')}")
+    for result, old, change, status in rows:
+        label = f"{result['scale']:>9} {result['benchmark']} {json.dumps(result['params'], sort_keys=True)}"
+        if old is None:
+            print(f"{label}: {result['median_ms']} ms [{status}]")
+        else:
+            print(f"{label}: {old['median_ms']} -> {result['median_ms']} ms ({change:+.1%}), "
+                  f"{old['statements']} -> {result['statements']} statements [{status}]")
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
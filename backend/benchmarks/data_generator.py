@@ -0,0 +1,237 @@
+# File: benchmarks/data_generator.py
+"""
+Seeded synthetic data for benchmarks: users with accounts, categories, merchants,
+tags, monthly budget goals and large volumes of transactions with realistic
+HDFC/ICICI/Paytm style UPI, POS and NEFT narrations.
+
+Transactions are loaded with COPY (explicit ids, sequence bumped afterwards, amounts
+in paise), so millions of rows take seconds instead of minutes. The monthly partitions
+for the generated history are created up front.
+"""
+import csv
+import io
+import json
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.money import to_paise
+from app.core.password_hashing import pwd_context
+from app.db.partitions import ensure_monthly_partitions
+from app.models import Account, Category, Goal, Merchant, Tag
+from app.models.user import User
+from app.services.upload_service import MERCHANT_CATEGORY_RULES, TRANSFER_KEYWORDS
+
+BENCHMARK_PASSWORD = "Benchmark#1"
+EXCLUDE_TAG_NAME = "Exclude from Analytics"
+
+EXPENSE_CATEGORIES = [
+    ("Food", "Utensils"), ("Groceries", "ShoppingCart"), ("Travel", "Bus"), ("Shopping", "ShoppingBag"),
+    ("Services", "Wrench"), ("Rent", "Home"), ("Bills", "Receipt"), ("Health & Wellness", "HeartPulse"),
+    ("Personal Care", "Scissors"), ("Entertainment", "Film"), ("Education", "GraduationCap"),
+    ("Transfers", "ArrowLeftRight"), ("Miscellaneous", "Package"),
+]
+INCOME_CATEGORIES = [("Salary", "Wallet"), ("Interest", "PiggyBank")]
+ACCOUNTS = [("HDFC Bank", "bank", "HDFC"), ("ICICI Bank", "bank", "ICICI"), ("Paytm Wallet", "wallet", "Paytm")]
+EXTRA_TAGS = ["Trip-Goa", "Wedding", "Reimbursable", "Office"]
+UPI_BANKS = ["okhdfcbank", "okicici", "ybl", "paytm", "axl", "ibl"]
+CITIES = ["BANGALORE", "MUMBAI", "CHENNAI", "HYDERABAD", "PUNE"]
+
+# Typical ticket sizes (min, max) in INR per category, used to draw amounts.
+AMOUNT_RANGES = {
+    "Food": (80, 1200), "Groceries": (150, 3500), "Travel": (30, 2500), "Shopping": (300, 6000),
+    "Services": (500, 15000), "Rent": (9000, 22000), "Bills": (119, 1500), "Health & Wellness": (90, 2500),
+    "Personal Care": (150, 1200), "Entertainment": (150, 1800), "Education": (499, 4999),
+}
+
+
+@dataclass
+class GeneratedUser:
+    user_id: int
+    account_ids: list
+    category_ids: dict
+    merchant_ids: dict
+    tag_ids: dict
+    transaction_count: int = 0
+
+
+@dataclass
+class GeneratedDataset:
+    seed: int
+    users: list = field(default_factory=list)
+    transaction_count: int = 0
+
+
+def _upi_ref(rng: random.Random) -> str:
+    return str(rng.randrange(10**11, 10**12))
+
+
+def synthetic_description(rng: random.Random, keyword: str, style: str) -> str:
+    """A bank narration containing `keyword` in one of the formats seen in real statements."""
+    handle = keyword.replace(" ", "").lower()
+    if style == "upi":
+        return (f"UPI-{keyword.upper()}-{handle}@{rng.choice(UPI_BANKS)}-"
+                f"HDFC0{rng.randrange(10**5, 10**6)}-{_upi_ref(rng)}-UPI")
+    if style == "pos":
+        return f"POS 4{rng.randrange(10**14, 10**15)} {keyword.upper()} {rng.choice(CITIES)}"
+    return f"Paid to {keyword.title()} via UPI"
+
+
+def synthetic_transaction(rng: random.Random, txn_date: datetime, account_id: int, category_ids: dict,
+                          merchant_ids: dict, merchant_rules: list) -> dict:
+    """One parsed-statement-like transaction row (the shape the upload pipeline produces)."""
+    roll = rng.random()
+    upi_ref = None
+    merchant_id = None
+    if roll < 0.06:
+        person = rng.choice(sorted(TRANSFER_KEYWORDS))
+        description = synthetic_description(rng, person, "upi")
+        category_id, txn_type = category_ids["Transfers"], "debit"
+        amount = rng.choice([500, 1000, 2000, 5000, 10000])
+    elif roll < 0.09:
+        description = f"NEFT CR-ACME TECHNOLOGIES PVT LTD-SALARY {txn_date:%b %Y}".upper()
+        category_id, txn_type = category_ids["Salary"], "credit"
+        amount = rng.randrange(60000, 120000)
+    elif roll < 0.15:
+        description = f"UPI-{rng.choice(['RAVI', 'PRIYA', 'ANIL', 'DIVYA'])} KUMAR-{_upi_ref(rng)}"
+        category_id, txn_type = category_ids["Miscellaneous"], "debit"
+        amount = rng.randrange(20, 2000)
+    else:
+        keyword, (merchant_name, category_name) = rng.choice(merchant_rules)
+        description = synthetic_description(rng, keyword, rng.choice(["upi", "upi", "pos", "paytm"]))
+        category_id, txn_type = category_ids[category_name], "debit"
+        merchant_id = merchant_ids.get(merchant_name)
+        low, high = AMOUNT_RANGES.get(category_name, (50, 2000))
+        amount = round(rng.uniform(low, high), 2)
+    if "UPI" in description:
+        digits = [part for part in description.split("-") if part.isdigit() and len(part) == 12]
+        upi_ref = digits[0] if digits else None
+    return {
+        "txn_date": txn_date, "description": description, "amount": float(amount), "type": txn_type,
+        "account_id": account_id, "category_id": category_id, "merchant_id": merchant_id, "upi_ref": upi_ref,
+    }
+
+
+def _seed_user(db: Session, index: int, password_hash: str, months: list) -> GeneratedUser:
+    user = User(username=f"bench_user_{index}", email=f"bench_user_{index}@example.com", hashed_password=password_hash)
+    db.add(user)
+    db.flush()
+
+    accounts = [Account(name=n, type=t, provider=p, user_id=user.id) for n, t, p in ACCOUNTS]
+    categories = [Category(name=n, icon_name=i, is_income=False, user_id=user.id) for n, i in EXPENSE_CATEGORIES]
+    categories += [Category(name=n, icon_name=i, is_income=True, user_id=user.id) for n, i in INCOME_CATEGORIES]
+    tags = [Tag(name=name, user_id=user.id) for name in [EXCLUDE_TAG_NAME] + EXTRA_TAGS]
+    db.add_all(accounts + categories + tags)
+    db.flush()
+    category_ids = {c.name: c.id for c in categories}
+
+    merchant_names = {name: category for name, category in MERCHANT_CATEGORY_RULES.values()}
+    merchants = [Merchant(name=name, category_id=category_ids[cat], user_id=user.id) for name, cat in merchant_names.items()]
+    db.add_all(merchants)
+
+    # A budget for the common categories in every generated month.
+    for month in months:
+        for name in ("Food", "Groceries", "Travel", "Shopping", "Bills"):
+            db.add(Goal(category_id=category_ids[name], month=month, limit_amount=AMOUNT_RANGES[name][1] * 6, user_id=user.id))
+    db.flush()
+    return GeneratedUser(
+        user_id=user.id, account_ids=[a.id for a in accounts], category_ids=category_ids,
+        merchant_ids={m.name: m.id for m in merchants}, tag_ids={t.name: t.id for t in tags},
+    )
+
+
+def _copy_rows(db: Session, table: str, columns: list, rows: list) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if v is None else v for v in row])
+    buffer.seek(0)
+    raw_cursor = db.connection().connection.cursor()
+    raw_cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def generate_dataset(db: Session, total_transactions: int, num_users: int = 5, months_of_history: int = 24,
+                     seed: int = 42, with_raw_data: bool = True, end_date: date | None = None) -> GeneratedDataset:
+    """
+    Creates `num_users` users and spreads `total_transactions` over them. The first user is
+    the "heavy" one (half of all rows) that the benchmarks query. Commits when done.
+    """
+    rng = random.Random(seed)
+    end_date = end_date or date.today()
+    start_date = (end_date.replace(day=1) - relativedelta(months=months_of_history - 1))
+    span_seconds = int((datetime.combine(end_date, datetime.max.time()) - datetime.combine(start_date, datetime.min.time())).total_seconds())
+    months = sorted({(start_date + relativedelta(months=i)).strftime("%Y-%m") for i in range(months_of_history)})
+
+    password_hash = pwd_context.hash(BENCHMARK_PASSWORD)
+    dataset = GeneratedDataset(seed=seed)
+    dataset.users = [_seed_user(db, i, password_hash, months) for i in range(num_users)]
+    ensure_monthly_partitions(db.connection(), [start_date + relativedelta(months=i) for i in range(months_of_history)])
+
+    shares = [0.5] + [0.5 / (num_users - 1)] * (num_users - 1) if num_users > 1 else [1.0]
+    next_id = (db.execute(text("SELECT COALESCE(MAX(id), 0) FROM transactions")).scalar() or 0) + 1
+    merchant_rules = sorted(MERCHANT_CATEGORY_RULES.items())
+    txn_columns = ["id", "txn_date", "description", "amount", "type", "source", "account_id", "category_id",
+                   "merchant_id", "user_id", "upi_ref", "unique_key"]
+    tag_columns = ["transaction_id", "tag_id", "user_id"]
+    raw_columns = ["transaction_id", "data"]
+
+    for user, share in zip(dataset.users, shares):
+        count = int(total_transactions * share)
+        user.transaction_count = count
+        batch, tag_batch, raw_batch = [], [], []
+        for _ in range(count):
+            txn_date = datetime.combine(start_date, datetime.min.time()) + timedelta(seconds=rng.randrange(span_seconds))
+            account_id = rng.choice(user.account_ids)
+            txn = synthetic_transaction(rng, txn_date, account_id, user.category_ids, user.merchant_ids, merchant_rules)
+            raw_data = json.dumps({"Date": f"{txn_date:%d/%m/%y}", "Narration": txn["description"],
+                                   "Withdrawal Amt": txn["amount"] if txn["type"] == "debit" else None,
+                                   "Deposit Amt": txn["amount"] if txn["type"] == "credit" else None,
+                                   "Closing Balance": round(rng.uniform(1000, 250000), 2)}) if with_raw_data else None
+            batch.append([next_id, txn_date.isoformat(sep=" "), txn["description"], to_paise(txn["amount"]), txn["type"], "BENCH",
+                          account_id, txn["category_id"], txn["merchant_id"], user.user_id, txn["upi_ref"],
+                          f"BENCH-{next_id}"])
+            if raw_data is not None:
+                raw_batch.append([next_id, raw_data])
+            # Self-transfers are flagged so the exclusion logic is exercised.
+            if txn["category_id"] == user.category_ids["Transfers"] and rng.random() < 0.7:
+                tag_batch.append([next_id, user.tag_ids[EXCLUDE_TAG_NAME], user.user_id])
+            elif rng.random() < 0.02:
+                tag_batch.append([next_id, user.tag_ids[rng.choice(EXTRA_TAGS)], user.user_id])
+            next_id += 1
+            if len(batch) >= 50_000:
+                _copy_rows(db, "transactions", txn_columns, batch)
+                _copy_rows(db, "transaction_raw_records", raw_columns, raw_batch)
+                batch, raw_batch = [], []
+        _copy_rows(db, "transactions", txn_columns, batch)
+        _copy_rows(db, "transaction_raw_records", raw_columns, raw_batch)
+        _copy_rows(db, "transaction_tags", tag_columns, tag_batch)
+        dataset.transaction_count += count
+
+    db.execute(text("SELECT setval(pg_get_serial_sequence('transactions', 'id'), :max_id)"), {"max_id": max(next_id - 1, 1)})
+    db.commit()
+    db.execute(text("ANALYZE"))
+    db.commit()
+    return dataset
+
+
+def synthetic_upload_rows(count: int, account_id: int, seed: int = 7, end_date: date | None = None) -> list:
+    """Rows shaped like the output of upload_service.parse_generic_statement, for ingestion benchmarks."""
+    rng = random.Random(seed)
+    end_date = end_date or date.today()
+    merchant_rules = sorted(MERCHANT_CATEGORY_RULES.items())
+    placeholder_categories = {name: None for name, _ in EXPENSE_CATEGORIES + INCOME_CATEGORIES}
+    rows = []
+    for i in range(count):
+        txn_date = datetime.combine(end_date, datetime.min.time()) - timedelta(minutes=rng.randrange(60 * 24 * 30))
+        txn = synthetic_transaction(rng, txn_date, account_id, placeholder_categories, {}, merchant_rules)
+        rows.append({
+            "txn_date": txn_date, "description": txn["description"], "amount": txn["amount"], "type": txn["type"],
+            "account_id": account_id, "source": "HDFC", "upi_ref": txn["upi_ref"],
+            "unique_key": f"HDFC-BENCHUP{seed}-{i}-{txn_date:%Y%m%d}-{txn['amount']:.2f}",
+            "raw_data": json.dumps({"Narration": txn["description"], "Withdrawal Amt": txn["amount"]}),
+        })
+    return rows
@@ -0,0 +1,349 @@
+# File: benchmarks/load_test.py
+"""
+HTTP load test. Logs in N synthetic users and replays realistic sessions (dashboard,
+analytics, budgets, transaction log paging and search, statement uploads) against a
+running app, then reports throughput, p50/p95/p99 latency per route and error rates.
+
+    cd backend
+    # Seed a dedicated database with 50 users and start 4 uvicorn workers against it:
+    python -m benchmarks.load_test --database-url postgresql+psycopg2://postgres:pw@localhost/finance_bench \
+        --prepare --transactions 500000 --spawn-server --workers 4 --users 50 --duration 120 --output load.json
+    # Or drive an app that is already running (users bench_user_0..N-1 must exist):
+    python -m benchmarks.load_test --base-url http://localhost:8000 --users 50 --duration 60
+
+Only the standard library is used on the client side: one thread and one keep-alive
+connection per virtual user.
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks.data_generator import BENCHMARK_PASSWORD, synthetic_description
+
+ANALYTICS_PERIODS = ("3m", "6m", "1y", "all")
+SEARCH_TERMS = ("zomato", "swiggy", "uber", "amazon", "metro", "salary", "airtel", "bigbasket")
+UPLOAD_KEYWORDS = ("zomato", "swiggy", "uber", "amazon", "zepto", "irctc", "spotify", "bookmyshow")
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LoadStats:
+    """Latency samples and outcomes per route, shared by all virtual users."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.status_codes = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route: str, seconds: float, status: int | None) -> None:
+        with self._lock:
+            self.latencies[route].append(seconds)
+            self.status_codes[route][str(status) if status is not None else "exception"] += 1
+            if status is None or status >= 400:
+                self.errors[route] += 1
+
+    def report(self, elapsed: float) -> dict:
+        with self._lock:
+            routes = {}
+            for route, samples in sorted(self.latencies.items()):
+                ordered = sorted(samples)
+                routes[route] = {
+                    "requests": len(ordered),
+                    "throughput_rps": round(len(ordered) / elapsed, 2),
+                    "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+                    "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+                    "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+                    "max_ms": round(ordered[-1] * 1000, 2),
+                    "error_rate": round(self.errors[route] / len(ordered), 4),
+                    "status_codes": dict(self.status_codes[route]),
+                }
+            total = sum(r["requests"] for r in routes.values())
+            errors = sum(self.errors.values())
+        return {
+            "duration_seconds": round(elapsed, 2),
+            "requests": total,
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "routes": routes,
+        }
+
+
+def synthetic_hdfc_csv(rng: random.Random, rows: int) -> bytes:
+    """A small HDFC-format statement; every upload carries fresh references, so rows are inserted."""
+    lines = ["Date,Narration,Chq/Ref.No.,Value Dt,Withdrawal Amt.,Deposit Amt.,Closing Balance"]
+    today = date.today()
+    for _ in range(rows):
+        day = today - timedelta(days=rng.randrange(30))
+        description = synthetic_description(rng, rng.choice(UPLOAD_KEYWORDS), "upi").replace(",", " ")
+        ref = uuid.uuid4().hex[:16].upper()
+        amount = round(rng.uniform(50, 2500), 2)
+        lines.append(f"{day:%d/%m/%y},{description},{ref},{day:%d/%m/%y},{amount},,{round(rng.uniform(1000, 90000), 2)}")
+    return ("\n".join(lines) + "\n").encode()
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, index: int, base_url: str, stats: LoadStats, deadline: float, think_time: float,
+                 upload_rows: int, seed: int):
+        super().__init__(daemon=True, name=f"vu-{index}")
+        self.username = f"bench_user_{index}"
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.stats = stats
+        self.deadline = deadline
+        self.think_time = think_time
+        self.upload_rows = upload_rows
+        self.rng = random.Random(seed + index)
+        self.conn = None
+        self.token = None
+        self.categories = []
+
+    # --- HTTP ---
+    def _request(self, route: str, method: str, path: str, params: dict | None = None,
+                 body: bytes | None = None, headers: dict | None = None):
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        headers = dict(headers or {})
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        started = time.perf_counter()
+        status, payload = None, None
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            payload = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            # Drop the connection; the next request reconnects.
+            self.conn.close()
+            self.conn = None
+        self.stats.record(route, time.perf_counter() - started, status)
+        if status is not None and status < 400 and payload:
+            try:
+                return json.loads(payload)
+            except ValueError:
+                return None
+        return None
+
+    def _get(self, route: str, path: str, params: dict | None = None):
+        return self._request(route, "GET", path, params)
+
+    def login(self) -> bool:
+        body = urlencode({"username": self.username, "password": BENCHMARK_PASSWORD}).encode()
+        result = self._request("POST /auth/login/password", "POST", "/api/v1/auth/login/password", body=body,
+                               headers={"Content-Type": "application/x-www-form-urlencoded"})
+        if not result:
+            return False
+        self.token = result["access_token"]
+        self.categories = [c["id"] for c in (self._get("GET /categories", "/api/v1/categories") or [])]
+        return True
+
+    # --- Scenarios ---
+    def _month(self) -> str:
+        today = date.today().replace(day=1)
+        return (today - timedelta(days=28 * self.rng.randrange(3))).strftime("%Y-%m")
+
+    def view_dashboard(self):
+        self._get("GET /dashboard", "/api/v1/dashboard", {"month": self._month()})
+
+    def view_analytics(self):
+        period = self.rng.choice(ANALYTICS_PERIODS + (self._month(),))
+        self._get("GET /analytics", "/api/v1/analytics", {"time_period": period})
+
+    def view_budgets(self):
+        self._get("GET /budgets/plan", "/api/v1/budgets/plan", {"month": self._month()})
+
+    def page_transaction_log(self):
+        params = {"limit": 25}
+        if self.categories and self.rng.random() < 0.3:
+            params["category_id"] = self.rng.choice(self.categories)
+        for page in range(1, self.rng.randint(1, 4) + 1):
+            self._get("GET /transactions", "/api/v1/transactions", {**params, "page": page})
+            self.think()
+
+    def search_transactions(self):
+        self._get("GET /transactions?search_term", "/api/v1/transactions",
+                  {"search_term": self.rng.choice(SEARCH_TERMS), "limit": 25})
+
+    def upload_statement(self):
+        boundary = uuid.uuid4().hex
+        content = synthetic_hdfc_csv(self.rng, self.upload_rows)
+        body = (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"files\"; filename=\"hdfc_statement.csv\"\r\n"
+            f"Content-Type: text/csv\r\n\r\n"
+        ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+        self._request("POST /settings/upload-statements", "POST", "/api/v1/settings/upload-statements", body=body,
+                      headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+
+    def think(self):
+        if self.think_time > 0:
+            time.sleep(self.rng.expovariate(1 / self.think_time))
+
+    def session(self):
+        """One visit: land on the dashboard, then browse a few screens."""
+        self.view_dashboard()
+        self.think()
+        screens = [(self.view_analytics, 0.6), (self.view_budgets, 0.4), (self.page_transaction_log, 0.7),
+                   (self.search_transactions, 0.3), (self.upload_statement, 0.05)]
+        for screen, probability in screens:
+            if time.monotonic() >= self.deadline:
+                return
+            if self.rng.random() < probability:
+                screen()
+                self.think()
+
+    def run(self):
+        if not self.login():
+            return
+        while time.monotonic() < self.deadline:
+            self.session()
+        if self.conn is not None:
+            self.conn.close()
+
+
+def _wait_until_ready(base_url: str, timeout: float) -> None:
+    parts = urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=2)
+            conn.request("GET", "/")
+            if conn.getresponse().status < 500:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"server at {base_url} did not become ready in {timeout:.0f}s")
+
+
+def _prepare_database(database_url: str, users: int, transactions: int, seed: int) -> None:
+    from sqlalchemy.orm import Session
+
+    import app.models  # noqa: F401  (registers every table on Base.metadata)
+    import app.models.user  # noqa: F401
+    from app.db.base_class import Base
+    from app.db.session import create_db_engine
+    from benchmarks.data_generator import generate_dataset
+
+    engine = create_db_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        generate_dataset(db, transactions, num_users=users, seed=seed)
+    engine.dispose()
+
+
+def _internal_snapshot(base_url: str, token: str) -> dict:
+    """Pool and cache counters after the run, to size DB pools and workers."""
+    parts = urlsplit(base_url)
+    snapshot = {}
+    for name in ("db-pool", "principal-cache", "password-hashing"):
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+        conn.request("GET", f"/api/v1/internal/{name}", headers={"X-Internal-Token": token})
+        response = conn.getresponse()
+        snapshot[name] = json.loads(response.read()) if response.status == 200 else {"status": response.status}
+    return snapshot
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay concurrent user sessions against the API.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users (bench_user_0..N-1).")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to run after all users logged in.")
+    parser.add_argument("--ramp-up", type=float, default=5, help="Seconds over which users start.")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Mean pause between requests, in seconds.")
+    parser.add_argument("--upload-rows", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=os.getenv("BENCHMARK_DATABASE_URL"),
+                        help="Database for --prepare / --spawn-server.")
+    parser.add_argument("--prepare", action="store_true", help="Reset the database and seed --users users first.")
+    parser.add_argument("--transactions", type=int, default=100_000, help="Total transactions seeded by --prepare.")
+    parser.add_argument("--spawn-server", action="store_true", help="Start uvicorn against --database-url.")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for --spawn-server.")
+    parser.add_argument("--internal-token", default=os.getenv("INTERNAL_API_TOKEN"),
+                        help="If set, pool/cache stats are fetched from the internal endpoints after the run.")
+    parser.add_argument("--output", default=None, help="Write the JSON report here.")
+    args = parser.parse_args(argv)
+
+    if (args.prepare or args.spawn_server) and not args.database_url:
+        parser.error("--prepare and --spawn-server need --database-url or BENCHMARK_DATABASE_URL")
+    if args.prepare:
+        from sqlalchemy.engine import make_url
+        if "bench" not in (make_url(args.database_url).database or ""):
+            parser.error("refusing to reset a database whose name does not contain 'bench'")
+        print(f"Seeding {args.users} users / {args.transactions} transactions...", file=sys.stderr)
+        _prepare_database(args.database_url, args.users, args.transactions, args.seed)
+
+    server = None
+    if args.spawn_server:
+        parts = urlsplit(args.base_url)
+        env = {**os.environ, "DATABASE_URL": args.database_url}
+        if args.internal_token:
+            env["INTERNAL_API_TOKEN"] = args.internal_token
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", parts.hostname, "--port", str(parts.port or 80),
+             "--workers", str(args.workers), "--log-level", "warning"],
+            env=env,
+        )
+    try:
+        _wait_until_ready(args.base_url, timeout=60)
+        stats = LoadStats()
+        # The deadline is pushed back by the ramp-up so every user gets the full duration of overlap.
+        deadline = time.monotonic() + args.ramp_up + args.duration
+        users = [VirtualUser(i, args.base_url, stats, deadline, args.think_time, args.upload_rows, args.seed)
+                 for i in range(args.users)]
+        started = time.monotonic()
+        for vu in users:
+            vu.start()
+            time.sleep(args.ramp_up / max(1, args.users))
+        for vu in users:
+            vu.join()
+        report = stats.report(time.monotonic() - started)
+        report["meta"] = {
+            "recorded_at": datetime.utcnow().isoformat(),
+            "base_url": args.base_url,
+            "users": args.users,
+            "workers": args.workers if args.spawn_server else None,
+            "think_time": args.think_time,
+            "ramp_up": args.ramp_up,
+            "seed": args.seed,
+        }
+        if args.internal_token:
+            report["server"] = _internal_snapshot(args.base_url, args.internal_token)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    print(f"{report['requests']} requests in {report['duration_seconds']}s: "
+          f"{report['throughput_rps']} req/s, error rate {report['error_rate']:.2%}")
+    print(f"{'route':<36} {'reqs':>7} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}")
+    for route, r in report["routes"].items():
+        print(f"{route:<36} {r['requests']:>7} {r['throughput_rps']:>8} {r['p50_ms']:>9} {r['p95_ms']:>9} "
+              f"{r['p99_ms']:>9} {r['error_rate']:>7.2%}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# File: benchmarks/partition_check.py
+"""
+Checks that the month-scoped screen queries get partition pruning on the partitioned
+`transactions` table. Every statement the dashboard, analytics and budget services issue
+is captured, re-planned with EXPLAIN (parameters are inlined by psycopg2, so plan-time
+pruning applies) and the transaction partitions in each plan are counted.
+
+    cd backend
+    BENCHMARK_DATABASE_URL=postgresql+psycopg2://postgres:pw@localhost:5432/finance_bench \
+        python -m benchmarks.partition_check --month 2025-06
+
+Run it against a database filled by `benchmarks.run_benchmarks` (or a migrated copy of
+production). Nothing is written: every service call is rolled back. Exits non-zero if a
+query with a txn_date window scans more partitions than the window needs. Queries without
+one (recent transactions, the all-history monthly average) are reported as "all-time".
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import date
+
+from sqlalchemy import delete, event, select, text
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+import app.models.user  # noqa: F401
+from app.db.partitions import DEFAULT_PARTITION, PARENT_TABLE, existing_partition_months, is_partitioned
+from app.db.session import create_db_engine
+from app.models.alert import Alert
+from app.models.goal import Goal
+from app.services.analytics_service import get_analytics_data
+from app.services.budget_plan_service import get_budget_plan
+from app.services.dashboard_service import get_dashboard_data
+
+# Partitions a month-scoped screen may touch: the month itself plus the month before it
+# (dashboard and budget pacing compare against the previous month).
+MAX_MONTH_PARTITIONS = 2
+# The budget screen's smart empty state (a month without goals) averages the three months
+# before the one opened and reads that month's spend.
+EMPTY_STATE_MAX_PARTITIONS = 4
+_DATE_WINDOW = re.compile(r"txn_date\s*(>=|>|<|BETWEEN)", re.IGNORECASE)
+
+
+def _budget_plan_without_goals(db: Session, month: str, user_id: int):
+    """get_budget_plan on its smart empty state: the month's goals are deleted first (rolled back with the rest)."""
+    goal_ids = select(Goal.id).where(Goal.user_id == user_id, Goal.month == month)
+    db.execute(delete(Alert).where(Alert.goal_id.in_(goal_ids)))
+    db.execute(delete(Goal).where(Goal.id.in_(goal_ids)))
+    return get_budget_plan(db, month, user_id)
+
+
+def _cases(month: str, user_id: int) -> list:
+    """(name, most partitions a windowed statement may scan or None for no limit, callable)."""
+    return [
+        ("get_dashboard_data", MAX_MONTH_PARTITIONS, lambda db: get_dashboard_data(db, month, user_id)),
+        ("get_budget_plan", MAX_MONTH_PARTITIONS, lambda db: get_budget_plan(db, month, user_id)),
+        ("get_budget_plan[empty state]", EMPTY_STATE_MAX_PARTITIONS, lambda db: _budget_plan_without_goals(db, month, user_id)),
+        ("get_analytics_data[month]", MAX_MONTH_PARTITIONS, lambda db: get_analytics_data(db, month, False, user_id)),
+        ("get_analytics_data[3m]", 3, lambda db: get_analytics_data(db, "3m", False, user_id)),
+        ("get_analytics_data[all]", None, lambda db: get_analytics_data(db, "all", False, user_id)),
+    ]
+
+
+def _capture_statements(engine, fn) -> list:
+    statements = []
+
+    def _on_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    try:
+        with engine.connect() as connection:
+            outer = connection.begin()
+            db = Session(bind=connection, join_transaction_mode="create_savepoint")
+            try:
+                fn(db)
+            finally:
+                db.close()
+                outer.rollback()
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_execute)
+    return statements
+
+
+def _scanned_partitions(plan: dict) -> set:
+    found = set()
+    relation = plan.get("Relation Name", "")
+    if relation == DEFAULT_PARTITION or relation.startswith(f"{PARENT_TABLE}_y"):
+        found.add(relation)
+    for child in plan.get("Plans", []):
+        found |= _scanned_partitions(child)
+    return found
+
+
+def _explain(engine, statement: str, parameters) -> dict:
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        return cursor.fetchone()[0][0]["Plan"]
+    finally:
+        raw.close()
+
+
+def check(database_url: str, month: str, user_id: int | None) -> dict:
+    engine = create_db_engine(database_url)
+    with engine.connect() as connection:
+        if not is_partitioned(connection):
+            raise SystemExit("transactions is not partitioned; run `python -m app.db.migrations` first")
+        total_partitions = len(existing_partition_months(connection)) + 1  # + the default partition
+        if user_id is None:
+            user_id = connection.execute(text(
+                "SELECT user_id FROM transactions GROUP BY user_id ORDER BY count(*) DESC LIMIT 1"
+            )).scalar()
+
+    report, failures = [], []
+    for name, max_partitions, fn in _cases(month, user_id):
+        for statement, parameters in _capture_statements(engine, fn):
+            if PARENT_TABLE not in statement:
+                continue
+            scanned = sorted(_scanned_partitions(_explain(engine, statement, parameters)))
+            windowed = bool(_DATE_WINDOW.search(statement))
+            ok = not windowed or max_partitions is None or len(scanned) <= max_partitions
+            entry = {"case": name, "windowed": windowed, "partitions": scanned, "ok": ok,
+                     "statement": " ".join(statement.split())[:160]}
+            report.append(entry)
+            if not ok:
+                failures.append(entry)
+            status = "FAIL" if not ok else ("ok  " if windowed else "all-time")
+            print(f"{status} {name}: {len(scanned)}/{total_partitions} partitions "
+                  f"{', '.join(scanned[:4]) or '(none)'}{' ...' if len(scanned) > 4 else ''}", file=sys.stderr)
+    engine.dispose()
+    return {"month": month, "user_id": user_id, "total_partitions": total_partitions,
+            "statements": report, "failures": len(failures)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check partition pruning of the screen queries.")
+    parser.add_argument("--database-url", default=None, help="Target database (default: $BENCHMARK_DATABASE_URL).")
+    parser.add_argument("--month", default=date.today().strftime("%Y-%m"), help="Month the screens are opened for.")
+    parser.add_argument("--user-id", type=int, default=None, help="Defaults to the user with the most transactions.")
+    parser.add_argument("--output", default=None, help="Also write the report as JSON.")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or os.getenv("BENCHMARK_DATABASE_URL")
+    if not database_url:
+        parser.error("set --database-url or BENCHMARK_DATABASE_URL")
+
+    report = check(database_url, args.month, args.user_id)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if report["failures"]:
+        print(f"{report['failures']} statement(s) scan more partitions than their window needs", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
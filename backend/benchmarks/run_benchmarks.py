@@ -0,0 +1,209 @@
+# File: benchmarks/run_benchmarks.py
+"""
+Service-layer benchmarks. For every data scale the target database is reset, filled
+with the seeded synthetic dataset, and each screen service is timed directly (no HTTP),
+so numbers are comparable across commits. Results are written as JSON.
+
+    cd backend
+    BENCHMARK_DATABASE_URL=postgresql+psycopg2://postgres:pw@localhost:5432/finance_bench \
+        python -m benchmarks.run_benchmarks --scales 10000,100000,1000000 --output bench.json
+    python -m benchmarks.compare baseline.json bench.json
+
+Partitioning is measured at production-like volume with tens of millions of rows (allow
+several GB of disk and `--no-raw-data` to keep generation time down), followed by the
+pruning check on the same database:
+
+    python -m benchmarks.run_benchmarks --scales 10000000,30000000 --no-raw-data --repeat 3
+    python -m benchmarks.partition_check
+
+The target database is DROPPED and re-created: its name must contain "bench" (or pass --force).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+import app.models.user  # noqa: F401
+from app.db.base_class import Base
+from app.db.session import create_db_engine
+from app.services.analytics_service import get_analytics_data
+from app.services.budget_plan_service import get_budget_plan
+from app.services.dashboard_service import get_dashboard_data
+from app.services.transaction_service import get_filtered_transactions
+from app.services.upload_service import process_and_insert_transactions
+
+from benchmarks.data_generator import generate_dataset, synthetic_upload_rows
+
+DEFAULT_SCALES = "10000,100000,1000000"
+ANALYTICS_PERIODS = ("3m", "6m", "1y", "all")
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class StatementCounter:
+    """Counts SQL statements issued on one engine while a benchmark runs."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "after_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def _time_call(engine, counter: StatementCounter, fn, repeat: int, warmup: int) -> dict:
+    """
+    Runs `fn(session)` `warmup + repeat` times. Each call gets a session joined to an
+    outer transaction that is rolled back afterwards, so services that commit (uploads,
+    budget alerts) leave the dataset unchanged for the next run.
+    """
+    timings, statements = [], []
+    for i in range(warmup + repeat):
+        with engine.connect() as connection:
+            outer = connection.begin()
+            db = Session(bind=connection, join_transaction_mode="create_savepoint")
+            try:
+                counter.count = 0
+                started = time.perf_counter()
+                fn(db)
+                elapsed = time.perf_counter() - started
+            finally:
+                db.close()
+                outer.rollback()
+        if i >= warmup:
+            timings.append(elapsed * 1000)
+            statements.append(counter.count)
+    timings.sort()
+    return {
+        "runs_ms": [round(t, 3) for t in timings],
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "statements": max(statements),
+    }
+
+
+def _benchmark_cases(user, month: str, upload_rows: list) -> list:
+    """(name, params, callable) for every service under test, against the heavy user."""
+    user_id = user.user_id
+    cases = [
+        ("get_dashboard_data", {"month": month}, lambda db: get_dashboard_data(db, month, user_id)),
+    ]
+    for period in ANALYTICS_PERIODS + (month,):
+        cases.append((
+            "get_analytics_data", {"time_period": period, "include_capital_transfers": False},
+            lambda db, period=period: get_analytics_data(db, period, False, user_id),
+        ))
+    cases += [
+        ("get_budget_plan", {"month": month}, lambda db: get_budget_plan(db, month, user_id)),
+        ("get_filtered_transactions", {"page": 1, "limit": 10},
+         lambda db: get_filtered_transactions(db, {"page": 1, "limit": 10}, user_id)),
+        ("get_filtered_transactions", {"page": 50, "limit": 50, "search_term": "zomato"},
+         lambda db: get_filtered_transactions(db, {"page": 50, "limit": 50, "search_term": "zomato"}, user_id)),
+        ("get_filtered_transactions", {"page": 1, "limit": 25, "category_id": "Food", "type": "debit"},
+         lambda db: get_filtered_transactions(
+             db, {"page": 1, "limit": 25, "category_id": user.category_ids["Food"], "type": "debit"}, user_id)),
+        ("process_and_insert_transactions", {"rows": len(upload_rows)},
+         lambda db: process_and_insert_transactions(db, [dict(r) for r in upload_rows], user_id)),
+    ]
+    return cases
+
+
+def run(database_url: str, scales: list, num_users: int, repeat: int, warmup: int, seed: int,
+        upload_rows: int, with_raw_data: bool) -> dict:
+    engine = create_db_engine(database_url)
+    counter = StatementCounter(engine)
+    month = date.today().strftime("%Y-%m")
+    results = []
+
+    for scale in scales:
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        started = time.perf_counter()
+        with Session(engine) as db:
+            dataset = generate_dataset(db, scale, num_users=num_users, seed=seed, with_raw_data=with_raw_data)
+        print(f"[scale={scale}] generated {dataset.transaction_count} transactions in {time.perf_counter() - started:.1f}s",
+              file=sys.stderr)
+
+        heavy_user = dataset.users[0]
+        rows = synthetic_upload_rows(upload_rows, heavy_user.account_ids[0], seed=seed)
+        for name, params, fn in _benchmark_cases(heavy_user, month, rows):
+            measured = _time_call(engine, counter, fn, repeat, warmup)
+            results.append({
+                "scale": scale,
+                "user_transactions": heavy_user.transaction_count,
+                "benchmark": name,
+                "params": params,
+                **measured,
+            })
+            print(f"[scale={scale}] {name} {params}: median {measured['median_ms']} ms, "
+                  f"{measured['statements']} statements", file=sys.stderr)
+
+    engine.dispose()
+    return {
+        "meta": {
+            "git_revision": _git_revision(),
+            "recorded_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "users": num_users,
+            "repeat": repeat,
+            "warmup": warmup,
+            "upload_rows": upload_rows,
+            "with_raw_data": with_raw_data,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the screen services against synthetic data.")
+    parser.add_argument("--database-url", default=None,
+                        help="Target database (default: $BENCHMARK_DATABASE_URL). It is dropped and re-created.")
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="Comma-separated total transaction counts.")
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--upload-rows", type=int, default=500, help="Rows per synthetic statement upload.")
+    parser.add_argument("--no-raw-data", action="store_true", help="Generate transactions without raw_data.")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--force", action="store_true", help="Allow a database whose name lacks 'bench'.")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or os.getenv("BENCHMARK_DATABASE_URL")
+    if not database_url:
+        parser.error("set --database-url or BENCHMARK_DATABASE_URL")
+    if "bench" not in (make_url(database_url).database or "") and not args.force:
+        parser.error("refusing to reset a database whose name does not contain 'bench' (use --force)")
+
+    report = run(
+        database_url, [int(s) for s in args.scales.split(",") if s.strip()], args.users,
+        args.repeat, args.warmup, args.seed, args.upload_rows, not args.no_raw_data,
+    )
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"Wrote {len(report['results'])} results to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
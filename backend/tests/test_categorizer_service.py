@@ -0,0 +1,70 @@
+# File: tests/test_categorizer_service.py
+
+from app.services.categorizer_service import MIN_TRAINING_ROWS, NaiveBayesCategorizer
+
+FOOD, TRAVEL, MISC = 1, 2, 3
+
+
+def trained(rows_per_category: int = 12) -> NaiveBayesCategorizer:
+    model = NaiveBayesCategorizer(excluded_category_ids={MISC})
+    for i in range(rows_per_category):
+        model.learn(f"UPI-ZOMATO LTD-zomato.payu@axisbank-UTIB0000001-4123456789{i:02d}-PAYMENT", FOOD)
+        model.learn(f"UBER TRIP {i:02d} BANGALORE", TRAVEL)
+    return model
+
+
+def test_predicts_the_category_of_similar_narrations():
+    predictions = trained().predict(["UPI/412345678999/Payment/zomato.payu@axisbank", "UBER TRIP 77 MUMBAI"])
+    assert [category for category, _ in predictions] == [FOOD, TRAVEL]
+    assert all(probability > 0.9 for _, probability in predictions)
+
+
+def test_character_ngrams_match_joined_words():
+    [(category, _)] = trained().predict(["ZOMATOLTD ORDER"])
+    assert category == FOOD
+
+
+def test_unknown_narration_is_not_predicted():
+    assert trained().predict(["QWERTY XYZ"]) == [None]
+
+
+def test_skewed_prior_alone_does_not_predict():
+    model = NaiveBayesCategorizer()
+    for i in range(90):
+        model.learn(f"UPI-ZOMATO LTD-zomato.payu@axisbank-UTIB0000001-4123456789{i:02d}-PAYMENT", FOOD)
+    for i in range(10):
+        model.learn(f"UBER TRIP {i:02d} BANGALORE", TRAVEL)
+    assert model.predict(["QWERTY XYZ", "NEFT SALARY ACME"]) == [None, None]
+    [(category, probability)] = model.predict(["UBER TRIP 55 MUMBAI"])
+    assert category == TRAVEL and probability > 0.8
+
+
+def test_too_little_training_never_predicts():
+    model = trained(rows_per_category=MIN_TRAINING_ROWS // 2 - 1)
+    assert model.predict(["ZOMATO", "UBER"]) == [None, None]
+
+
+def test_excluded_categories_are_not_learned():
+    model = trained()
+    for _ in range(50):
+        model.learn("ZOMATO UBER", MISC)
+    assert model.trained_rows == 24
+    assert {category for category, _ in model.predict(["ZOMATO", "UBER"])} == {FOOD, TRAVEL}
+
+
+def test_allowed_category_ids_restricts_predictions():
+    model = trained()
+    assert model.predict(["ZOMATO ORDER"], allowed_category_ids={TRAVEL})[0][0] == TRAVEL
+    assert model.predict(["ZOMATO ORDER"], allowed_category_ids={42}) == [None]
+
+
+def test_correct_moves_a_row_to_the_new_category():
+    model = trained()
+    for _ in range(30):
+        model.correct("UBER TRIP 00 BANGALORE", TRAVEL, FOOD)
+    [(category, _)] = model.predict(["UBER TRIP 99 BANGALORE"])
+    assert category == FOOD
+
+
+def test_empty_batch():
+    assert trained().predict([]) == []
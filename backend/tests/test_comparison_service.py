@@ -0,0 +1,41 @@
+# File: tests/test_comparison_service.py
+from datetime import date
+
+import pytest
+
+from app.services.comparison_service import parse_period, percent_change
+
+
+@pytest.mark.parametrize("spec, bounds", [
+    ("2026-10", (date(2026, 10, 1), date(2026, 11, 1))),
+    ("2026-12", (date(2026, 12, 1), date(2027, 1, 1))),
+    ("2026-Q1", (date(2026, 1, 1), date(2026, 4, 1))),
+    ("2026-q4", (date(2026, 10, 1), date(2027, 1, 1))),
+    ("2025", (date(2025, 1, 1), date(2026, 1, 1))),
+    # Custom ranges include their last day
+    ("2026-01-15..2026-02-14", (date(2026, 1, 15), date(2026, 2, 15))),
+    ("2026-03-01..2026-03-01", (date(2026, 3, 1), date(2026, 3, 2))),
+    (" 2026-10 ", (date(2026, 10, 1), date(2026, 11, 1))),
+])
+def test_parse_period(spec, bounds):
+    assert parse_period(spec) == bounds
+
+
+@pytest.mark.parametrize("spec", [
+    "", "bogus", "2026-13", "2026-Q5", "2026-Q0", "26-10", "2026-10-01", "2026-02-30..2026-03-01",
+    "2026-02-01..2026-01-31",
+])
+def test_parse_period_rejects(spec):
+    with pytest.raises(ValueError, match="Invalid period"):
+        parse_period(spec)
+
+
+@pytest.mark.parametrize("current, baseline, change", [
+    (150, 100, 50.0),
+    (50, 100, -50.0),
+    (100, 100, 0.0),
+    (10, 0, 100.0),
+    (0, 0, 0.0),
+])
+def test_percent_change(current, baseline, change):
+    assert percent_change(current, baseline) == change
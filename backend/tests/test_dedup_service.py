@@ -0,0 +1,67 @@
+# File: tests/test_dedup_service.py
+from datetime import datetime
+
+from app.services.dedup_service import match_cross_source
+
+
+def row(source, txn_date, amount=100, upi_ref=None, account_id=1, txn_type="debit", id=None):
+    record = {
+        "source": source, "txn_date": txn_date, "amount": amount, "type": txn_type,
+        "account_id": account_id, "upi_ref": upi_ref, "description": f"{source} payment",
+    }
+    if id is not None:
+        record["id"] = id
+    return record
+
+
+def paired(pairs):
+    return [(paytm["row"], bank["row"]) for paytm, bank in pairs]
+
+
+def test_pairs_with_the_nearest_bank_day_in_the_window():
+    paytm = row("Paytm", datetime(2024, 1, 10, 12, 30))
+    day_before = row("HDFC", datetime(2024, 1, 9))
+    same_day = row("HDFC", datetime(2024, 1, 10))
+    outside = row("HDFC", datetime(2024, 1, 12))
+    assert paired(match_cross_source([paytm, day_before, same_day, outside], [])) == [(paytm, same_day)]
+
+
+def test_bank_row_outside_the_window_is_not_paired():
+    assert match_cross_source([row("Paytm", datetime(2024, 1, 10))], [row("HDFC", datetime(2024, 1, 12), id=1)]) == []
+
+
+def test_only_rows_with_the_same_account_type_and_amount_pair():
+    paytm = row("Paytm", datetime(2024, 1, 10))
+    others = [
+        row("HDFC", datetime(2024, 1, 10), account_id=2),
+        row("HDFC", datetime(2024, 1, 10), txn_type="credit"),
+        row("HDFC", datetime(2024, 1, 10), amount=100.01),
+    ]
+    assert match_cross_source([paytm, *others], []) == []
+
+
+def test_refs_must_agree_when_both_rows_have_one():
+    bank = row("HDFC", datetime(2024, 1, 10), upi_ref="412345678901", id=1)
+    assert match_cross_source([row("Paytm", datetime(2024, 1, 10), upi_ref="499999999999")], [bank]) == []
+    same_ref = row("Paytm", datetime(2024, 1, 10), upi_ref="412345678901")
+    assert paired(match_cross_source([same_ref], [bank])) == [(same_ref, bank)]
+    no_ref = row("Paytm", datetime(2024, 1, 10))
+    assert paired(match_cross_source([no_ref], [bank])) == [(no_ref, bank)]
+
+
+def test_two_stored_rows_never_pair():
+    stored = [row("Paytm", datetime(2024, 1, 10), id=1), row("HDFC", datetime(2024, 1, 10), id=2)]
+    assert match_cross_source([], stored) == []
+
+
+def test_a_bank_row_is_used_at_most_once():
+    first = row("Paytm", datetime(2024, 1, 10, 9))
+    second = row("Paytm", datetime(2024, 1, 10, 18))
+    bank = row("HDFC", datetime(2024, 1, 10), id=1)
+    assert paired(match_cross_source([first, second], [bank])) == [(first, bank)]
+
+
+def test_each_paytm_row_takes_its_own_bank_row():
+    paytm = [row("Paytm", datetime(2024, 1, 10, 9)), row("Paytm", datetime(2024, 1, 11, 9))]
+    banks = [row("HDFC", datetime(2024, 1, 10)), row("ICICI", datetime(2024, 1, 11))]
+    assert paired(match_cross_source(paytm + banks, [])) == list(zip(paytm, banks))
@@ -0,0 +1,34 @@
+# File: tests/test_merchant_service.py
+import pytest
+
+from app.services.merchant_service import normalize_merchant_name
+
+
+@pytest.mark.parametrize("description, merchant", [
+    # HDFC UPI: the payee name before the VPA
+    ("UPI-ZOMATO LTD-zomato.payu@axisbank-UTIB0000001-412345678901-PAYMENT", "Zomato Ltd"),
+    # ICICI UPI: the first label of an aggregator VPA
+    ("UPI/412345678901/Payment/swiggy.rzp@axisbank/AXIS BANK", "Swiggy"),
+    ("UPI/412345678901/Payment/bigbasket-razorpay@icici/ICICI", "Bigbasket"),
+    # Card: between the card number and POS DEBIT
+    ("POS 416021XXXXXX1234 DMART AVENUE SUPERMAR POS DEBIT", "Dmart Avenue Supermar"),
+    ("  pos 416021******1234 cafe_coffee_day  ", "Cafe Coffee Day"),
+])
+def test_merchant_narrations(description, merchant):
+    assert normalize_merchant_name(description) == merchant
+
+
+@pytest.mark.parametrize("description", [
+    # Person-to-person UPI
+    "UPI-JOHN DOE-john.doe@okaxis-SBIN0000001-412345678901-PAYMENT",
+    "UPI/412345678901/Payment/9876543210@ybl/SBI",
+    # QR handles that name the aggregator, not the shop
+    "UPI/412345678901/Payment/paytmqr281005@paytm/PAYTM",
+    "UPI/412345678901/Payment/q12345@ybl/YES BANK",
+    # No merchant at all
+    "NEFT CR-HDFC0000001-ACME CORP-SALARY",
+    "ATM WDL 12345",
+    "POS 416021XXXXXX1234 12 POS DEBIT",
+])
+def test_non_merchant_narrations(description):
+    assert normalize_merchant_name(description) is None
@@ -0,0 +1,36 @@
+# File: tests/test_money.py
+from decimal import Decimal
+
+import pytest
+
+from app.core.money import from_paise, to_paise
+
+
+@pytest.mark.parametrize("value, paise", [
+    (0, 0),
+    (80, 8000),
+    (0.1, 10),  # not 0.1's binary expansion
+    (0.29, 29),
+    ("1234.5", 123450),
+    (Decimal("12.345"), 1235),  # half up
+    ("12.344", 1234),
+    (-1.005, -101),
+])
+def test_to_paise(value, paise):
+    assert to_paise(value) == paise
+    assert isinstance(to_paise(value), int)
+
+
+@pytest.mark.parametrize("paise, rupees", [
+    (8000, "80.00"),
+    (1, "0.01"),
+    (-5, "-0.05"),
+    (Decimal("123456789"), "1234567.89"),  # a SUM over BIGINT comes back as Decimal
+])
+def test_from_paise_keeps_two_places(paise, rupees):
+    assert str(from_paise(paise)) == rupees
+
+
+@pytest.mark.parametrize("rupees", ["0.01", "99.99", "1234567.89", "-42.50"])
+def test_round_trip(rupees):
+    assert from_paise(to_paise(rupees)) == Decimal(rupees)
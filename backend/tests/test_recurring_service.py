@@ -0,0 +1,64 @@
+# File: tests/test_recurring_service.py
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.services.recurring_service import _detect
+
+
+def payments(key, first, every_days, amounts, description="NETFLIX SUBSCRIPTION"):
+    txn = SimpleNamespace(description=description, merchant_id=7, category_id=3, account_id=1)
+    return [(key, first + timedelta(days=every_days * i), paise, txn) for i, paise in enumerate(amounts)]
+
+
+def test_detects_a_monthly_series():
+    rows = payments("m:7", date(2026, 1, 5), 30, [64900] * 4)
+    [series] = _detect(rows)
+    assert series["series_key"] == "m:7"
+    assert series["cadence"] == "monthly"
+    assert series["interval_days"] == 30
+    assert series["typical_amount"] == Decimal("649.00")
+    assert series["occurrences"] == 4
+    assert series["first_date"] == date(2026, 1, 5)
+    assert series["next_expected_date"] == rows[-1][1] + timedelta(days=30)
+    assert series["merchant_id"] == 7
+
+
+def test_cadences():
+    cadences = {"d:gym": 7, "d:rent": 31, "d:insurance": 91, "d:domain": 365}
+    rows = sorted(
+        (row for key, every in cadences.items() for row in payments(key, date(2023, 1, 1), every, [50000] * 3)),
+        key=lambda row: (row[0], row[1]),
+    )
+    detected = {series["series_key"]: series["cadence"] for series in _detect(rows)}
+    assert detected == {"d:gym": "weekly", "d:rent": "monthly", "d:insurance": "quarterly", "d:domain": "yearly"}
+
+
+def test_needs_min_occurrences():
+    assert _detect(payments("m:7", date(2026, 1, 5), 30, [64900] * 2)) == []
+
+
+def test_irregular_intervals_are_not_recurring():
+    dates = [date(2026, 1, 1), date(2026, 1, 3), date(2026, 2, 20), date(2026, 3, 1), date(2026, 5, 30)]
+    txn = SimpleNamespace(description="ZOMATO", merchant_id=1, category_id=1, account_id=1)
+    assert _detect([("m:1", day, 30000, txn) for day in dates]) == []
+
+
+def test_same_day_payments_are_not_recurring():
+    rows = payments("m:1", date(2026, 1, 1), 0, [30000] * 5)
+    assert _detect(rows) == []
+
+
+def test_amounts_must_be_regular():
+    assert _detect(payments("m:7", date(2026, 1, 5), 30, [64900, 120000, 20000, 64900])) == []
+    # One outlier in four is tolerated
+    assert len(_detect(payments("m:7", date(2026, 1, 5), 30, [64900, 64900, 199900, 64900]))) == 1
+
+
+def test_series_are_detected_independently():
+    rows = payments("m:1", date(2026, 1, 1), 30, [10000] * 3) + payments("m:2", date(2026, 1, 1), 30, [10000, 90000, 20000])
+    assert [series["series_key"] for series in _detect(rows)] == ["m:1"]
+
+
+def test_no_rows():
+    assert _detect([]) == []
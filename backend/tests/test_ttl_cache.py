@@ -0,0 +1,50 @@
+# File: tests/test_ttl_cache.py
+
+from app.core.ttl_cache import TTLCache
+
+
+class FakeClockCache(TTLCache):
+    now = 1000.0
+    clock = classmethod(lambda cls: cls.now)
+
+
+def cache(ttl_seconds: float = 10, max_size: int = 2) -> FakeClockCache:
+    FakeClockCache.now = 1000.0
+    return FakeClockCache(ttl_seconds, max_size)
+
+
+def test_serves_entries_until_the_ttl_passes():
+    c = cache()
+    c._store("a", 1)
+    FakeClockCache.now += 10
+    assert c._lookup("a") == 1
+    FakeClockCache.now += 0.5
+    assert c._lookup("a") is None
+    assert c.stats()["size"] == 0
+    assert (c.hits, c.misses) == (1, 1)
+
+
+def test_evicts_the_least_recently_used_entry():
+    c = cache()
+    c._store("a", 1)
+    c._store("b", 2)
+    assert c._lookup("a") == 1
+    c._store("c", 3)
+    assert c._peek("b") is None
+    assert (c._peek("a"), c._peek("c")) == (1, 3)
+    assert c.evictions == 1
+
+
+def test_entries_stored_before_an_invalidating_time_are_dropped():
+    c = cache()
+    c._store("a", 1, stored_at=995.0)
+    assert c._lookup("a", invalidated_at=990.0) == 1
+    assert c._lookup("a", invalidated_at=995.0) is None
+    assert c.invalidations == 1
+
+
+def test_peek_does_not_count_a_lookup():
+    c = cache()
+    c._store("a", 1)
+    assert c._peek("a") == 1 and c._peek("b") is None
+    assert (c.hits, c.misses) == (0, 0)
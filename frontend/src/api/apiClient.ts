@@ -17,6 +17,11 @@ apiClient.interceptors.request.use(config => {
   if (token) {
     config.headers.Authorization = `Bearer ${token}`;
   }
+  // Time of our last write, so the next read sees it whichever server handles it
+  const lastWrite = sessionStorage.getItem('lastWrite');
+  if (lastWrite) {
+    config.headers['X-Last-Write'] = lastWrite;
+  }
   return config;
 }, error => {
   return Promise.reject(error);
@@ -25,7 +30,14 @@ apiClient.interceptors.request.use(config => {
 // //! THIS IS THE FIX: A new response interceptor to handle expired tokens.
 // This function will run for EVERY response from the backend.
 apiClient.interceptors.response.use(
-  (response) => response, // If the response is successful, just pass it through.
+  (response) => {
+    // Responses to requests that saved something carry the time of that write.
+    const lastWrite = response.headers['x-last-write'];
+    if (lastWrite) {
+      sessionStorage.setItem('lastWrite', lastWrite);
+    }
+    return response;
+  },
   (error) => {
     // If the server responds with an error
     if (error.response && error.response.status === 401) {